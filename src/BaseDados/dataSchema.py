@@ -35,9 +35,11 @@ def non_negative_int(value):
 def positive_float(value):
     # Converte para float e garante que é maior que zero.
     # Usado para preços e valores monetários.
+    # "nan" também é rejeitado (as comparações com NaN dão sempre False),
+    # tal como na versão por colunas (_coluna_positive_float).
     try:
         f = float(value)
-        if f <= 0:
+        if not f > 0:
             raise ValueError
         return f
     except:
@@ -48,7 +50,7 @@ def non_negative_float(value):
     # Usado para valores acumulados como total_earned.
     try:
         f = float(value)
-        if f < 0:
+        if not f >= 0:
             raise ValueError
         return f
     except:
@@ -143,4 +145,218 @@ rawSchema = Schema(
             'track_price': positive_float,
         }
     ]
-)
\ No newline at end of file
+)
+
+
+# ====================== VALIDAÇÃO VETORIZADA (raw_tracks) ======================
+#
+# O rawSchema valida um dicionário de cada vez, o que é demasiado lento para uma
+# importação inteira. As funções abaixo aplicam as mesmas regras a colunas
+# inteiras de um DataFrame (pandas), de uma só vez.
+#
+# Cada regra usada no rawSchema (positive_int, valid_date, ...) tem uma versão
+# "de coluna" que devolve uma máscara com True nas linhas inválidas.
+# O pandas só é importado quando a validação é usada.
+
+def _texto(coluna):
+    # Valores da coluna como texto; células vazias (NaN/None) ficam como ''
+    if coluna.hasnans:
+        coluna = coluna.fillna('')
+    return coluna.astype(str)
+
+
+def _e_numerica(coluna):
+    from pandas.api import types
+    return types.is_numeric_dtype(coluna) and not types.is_bool_dtype(coluna)
+
+
+def _int_ou_nan(valor):
+    try:
+        return int(valor)
+    except (ValueError, OverflowError):
+        return float('nan')
+
+
+def _float_ou_nan(valor):
+    try:
+        return float(valor)
+    except ValueError:
+        return float('nan')
+
+
+def _inteiros(coluna):
+    # Como int(value): aceita "12", " 12" ou 12.0 e rejeita "12.5" ou "abc" (ficam NaN).
+    # Os valores só com dígitos são convertidos de uma vez; os restantes (raros)
+    # passam pelo próprio int(), para darem exatamente o mesmo resultado.
+    import numpy as np
+    import pandas as pd
+
+    if _e_numerica(coluna):
+        return np.trunc(coluna.astype(float))
+
+    texto = _texto(coluna)
+    digitos = texto.str.isdecimal()
+
+    valores = pd.Series(np.nan, index=coluna.index)
+    valores[digitos] = texto[digitos].astype(float)
+
+    outros = ~digitos & (texto != '')
+    if outros.any():
+        valores[outros] = texto[outros].map(_int_ou_nan).astype(float)
+    return valores
+
+
+def _reais(coluna):
+    # Como float(value): valores que não são números ficam NaN
+    if _e_numerica(coluna):
+        return coluna.astype(float)
+
+    texto = _texto(coluna)
+    try:
+        return texto.astype(float)
+    except ValueError:
+        # Há valores inválidos na coluna: convertemos um a um
+        return texto.map(_float_ou_nan).astype(float)
+
+
+def _coluna_non_empty_str(coluna):
+    texto = _texto(coluna)
+    return (texto == '') | texto.str.isspace()
+
+
+def _coluna_positive_int(coluna):
+    # As comparações com NaN dão False, por isso os valores inválidos ficam marcados
+    return ~(_inteiros(coluna) > 0)
+
+
+def _coluna_non_negative_int(coluna):
+    return ~(_inteiros(coluna) >= 0)
+
+
+def _coluna_positive_float(coluna):
+    # NaN (valores inválidos ou o texto "nan") fica marcado, como em positive_float
+    return ~(_reais(coluna) > 0)
+
+
+def _coluna_non_negative_float(coluna):
+    return ~(_reais(coluna) >= 0)
+
+
+def _coluna_valid_date(coluna):
+    # Só os valores com 10 caracteres podem ser YYYY-MM-DD; os outros nem passam pela regex
+    texto = _texto(coluna)
+    invalidas = texto.str.len() != 10
+    invalidas[~invalidas] = ~texto[~invalidas].str.fullmatch(r"\d{4}-\d{2}-\d{2}")
+    return invalidas
+
+
+def _coluna_valid_genres(coluna):
+    # Strings: não vazias. Listas (raras): validadas uma a uma com valid_genres.
+    invalidas = _coluna_non_empty_str(coluna)
+
+    if coluna.dtype == object:
+        listas = coluna.map(lambda valor: isinstance(valor, list))
+        if listas.any():
+            invalidas[listas] = ~coluna[listas].map(
+                lambda valor: len(valor) > 0 and all(isinstance(g, str) and g.strip() for g in valor)
+            )
+
+    return invalidas
+
+
+# Regra de uma linha -> mesma regra aplicada a uma coluna
+_REGRAS_COLUNA = {
+    non_empty_str: _coluna_non_empty_str,
+    positive_int: _coluna_positive_int,
+    non_negative_int: _coluna_non_negative_int,
+    positive_float: _coluna_positive_float,
+    non_negative_float: _coluna_non_negative_float,
+    valid_date: _coluna_valid_date,
+    valid_genres: _coluna_valid_genres,
+}
+
+
+def ler_raw_tracks_texto(caminho, tamanho_bloco=None):
+    # Lê o raw_tracks.csv com todas as colunas como texto (sem conversões),
+    # que é o formato que a validação espera de um ficheiro novo.
+    # As colunas repetidas do CSV ficam como "artist_nacionality.1" e "track_price.1".
+    # Com `tamanho_bloco` devolve um iterador de DataFrames com esse número de linhas.
+    import pandas as pd
+    return pd.read_csv(caminho, dtype=str, keep_default_na=False, encoding='utf-8-sig',
+                       chunksize=tamanho_bloco)
+
+
+def colunas_raw_tracks(caminho):
+    # Nomes das colunas de um CSV no formato do raw_tracks.csv (só lê o cabeçalho),
+    # com os mesmos nomes que ler_raw_tracks_texto dá às colunas repetidas.
+    # Um ficheiro vazio ou mal formatado levanta ValueError (erros do pandas).
+    import pandas as pd
+    return list(pd.read_csv(caminho, dtype=str, encoding='utf-8-sig', nrows=0).columns)
+
+
+def validar_raw_tracks(dados, colunas=None):
+    """
+    Valida um DataFrame de raw_tracks (ou o caminho de um CSV) coluna a coluna,
+    com as mesmas regras do rawSchema.
+
+    `colunas` limita a validação a algumas colunas (por omissão, todas as do rawSchema).
+
+    Devolve (erros, resumo):
+    - erros: DataFrame de booleanos com o mesmo índice dos dados e uma coluna por
+      regra (True = valor inválido). erros.any(axis=1) marca as linhas a rejeitar.
+    - resumo: dicionário com o total de linhas, linhas válidas/inválidas,
+      número de erros por coluna e colunas em falta.
+    """
+    import pandas as pd
+
+    if not isinstance(dados, pd.DataFrame):
+        dados = ler_raw_tracks_texto(dados)
+
+    regras = rawSchema.schema[0]
+    if colunas is not None:
+        regras = {coluna: regras[coluna] for coluna in colunas}
+
+    mascaras = {}
+    em_falta = []
+    for coluna, regra in regras.items():
+        if coluna in dados.columns:
+            mascaras[coluna] = _REGRAS_COLUNA[regra](dados[coluna]).astype(bool)
+        else:
+            # Tal como no rawSchema, uma coluna obrigatória em falta invalida todas as linhas
+            em_falta.append(coluna)
+            mascaras[coluna] = pd.Series(True, index=dados.index)
+
+        # Colunas repetidas no CSV ("track_price.1") seguem a mesma regra
+        for repetida in dados.columns:
+            sufixo = repetida[len(coluna) + 1:]
+            if repetida.startswith(coluna + '.') and sufixo.isdigit():
+                mascaras[repetida] = _REGRAS_COLUNA[regra](dados[repetida]).astype(bool)
+
+    erros = pd.DataFrame(mascaras, index=dados.index)
+    invalidas = erros.any(axis=1)
+
+    resumo = {
+        'linhas': len(dados),
+        'linhas_validas': int((~invalidas).sum()),
+        'linhas_invalidas': int(invalidas.sum()),
+        'erros_por_coluna': {coluna: int(erros[coluna].sum()) for coluna in erros.columns},
+        'colunas_em_falta': em_falta,
+    }
+    return erros, resumo
+
+
+def linhas_validas(dados, erros):
+    # Só as linhas sem nenhum erro (rejeição em bloco das restantes)
+    return dados[~erros.any(axis=1)]
+
+
+def mostrar_resumo_validacao(resumo):
+    print("\n=== VALIDAÇÃO DE raw_tracks ===")
+    print(f"Linhas: {resumo['linhas']}  |  Válidas: {resumo['linhas_validas']}  |  Inválidas: {resumo['linhas_invalidas']}")
+
+    for coluna, total in resumo['erros_por_coluna'].items():
+        if total:
+            print(f"  {coluna:<22} {total} valor(es) inválido(s)")
+
+    if resumo['colunas_em_falta']:
+        print("Colunas em falta:", ", ".join(resumo['colunas_em_falta']))
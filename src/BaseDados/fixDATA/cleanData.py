@@ -1,85 +1,100 @@
-
-# ## NACIONALIDADE ##
-# import random
-
-# def atribuir_nacionalidade ():
-#     nacionalidades = [
-#         "Português",
-#         "Brasileiro",
-#         "Espanhol",
-#         "Francês",
-#         "Alemão",
-#         "Italiano",
-#         "Inglês",
-#         "Americano",
-#         "Japonês",
-#         "Chinês",
-#         "Indiano",
-#         "Russo",
-#         "Mexicano",
-#         "Canadiano",
-#         "Australiano"
-#     ]
-
-#     indice = random.randint(0, len(nacionalidades)-1)
-
-#     return nacionalidades[indice]
-# ## ----FIM---- NACIONALIDADE ##
-
-
-
-# ## PREÇO  TRACK ##
-# def atribuir_preco_track():
-#     return round( random.uniform(0.70, 1.4) ,2)
-# ## ----FIM---- PREÇO A TRACK ##
-
-
-
-
-# ## CLEAN DATA ##
-
-# tracksRaw = open('data/raw_tracks.csv', 'r', encoding='utf-8-sig' )
-# tracksRawData = tracksRaw.readlines()
-# tracksRaw.close()
-
-# cleanRawData = []
-
-# campos = tracksRawData[0].replace('\n','').split(',')
-# campos.append('artist_nacionality')
-# campos.append('track_price\n')
-# cleanRawData.append(','.join(campos))
-
-# ## adding clean and formated data to cleanRawData
-# indexOfGenre = campos.index('track_genres')
-
-# for line in tracksRawData[1:]: 
-
-#     try:
-#         int(line[0])
-#     except:
-#         continue
-
-#     line = line.replace('\n','').split(',')
-#     line.append(atribuir_nacionalidade())
-#     line.append(str(atribuir_preco_track()) + '\n')
-
-#     if len(line) < len(campos) or len(line) > len(campos) :
-#         continue
-#     else:
-#         ## finding genre of track
-#         genreCampoArray = line[indexOfGenre].split(',')
-
-#         for item in genreCampoArray:
-#             if 'genre_title' in item:
-#                 line[indexOfGenre] = item[item.find(':') + 3: len(item)-1]
-#         # ## ----FIM---- finding genre of track
-
-
-#         cleanRawData.append(','.join(line))
-
-# ## override clean data to raw_tracks
-# tracksRaw = open('data/raw_tracks.csv', 'w', encoding='utf-8-sig' )
-# tracksRaw.writelines(cleanRawData)
-# tracksRaw.close()
-
-# ## ----FIM---- CLEAN DATA ##
\ No newline at end of file
+"""
+Limpeza das linhas do raw_tracks original (primeira etapa do pipeline.py).
+
+Cada linha válida fica com o género musical simplificado (só o genre_title)
+e com duas colunas novas no fim: artist_nacionality e track_price.
+
+Antes a nacionalidade e o preço eram sorteados com `random` sem semente, por
+isso cada execução dava dados diferentes. Agora são calculados a partir de
+uma semente e do track_id da linha: a mesma semente dá sempre o mesmo
+resultado, seja qual for a ordem ou o número de processos usados.
+"""
+
+import hashlib
+
+NACIONALIDADES = [
+    "Português",
+    "Brasileiro",
+    "Espanhol",
+    "Francês",
+    "Alemão",
+    "Italiano",
+    "Inglês",
+    "Americano",
+    "Japonês",
+    "Chinês",
+    "Indiano",
+    "Russo",
+    "Mexicano",
+    "Canadiano",
+    "Australiano"
+]
+
+# Semente usada quando não é indicada outra
+SEMENTE = 2025
+
+
+## SORTEIO DETERMINÍSTICO ##
+def sorteio(semente, *chaves):
+    # Número "aleatório" entre 0 e 1, sempre o mesmo para a mesma semente e chaves.
+    # (Um hash é muito mais rápido do que criar um random.Random por linha.)
+    texto = ":".join(str(parte) for parte in (semente, *chaves))
+    digest = hashlib.blake2b(texto.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+## ----FIM---- SORTEIO DETERMINÍSTICO ##
+
+
+## NACIONALIDADE ##
+def atribuir_nacionalidade(semente, track_id):
+    indice = int(sorteio(semente, "nacionalidade", track_id) * len(NACIONALIDADES))
+    return NACIONALIDADES[indice]
+## ----FIM---- NACIONALIDADE ##
+
+
+## PREÇO TRACK ##
+def atribuir_preco_track(semente, track_id):
+    # Entre 0.70 e 1.40, com duas casas decimais
+    return round(0.70 + sorteio(semente, "preco", track_id) * 0.70, 2)
+## ----FIM---- PREÇO TRACK ##
+
+
+## DIREITOS AUTOR ##
+def atribuir_direitos(semente, artist_id):
+    # Entre 10 e 50, como o randint(10, 50) original
+    return 10 + int(sorteio(semente, "direitos", artist_id) * 41)
+## ----FIM---- DIREITOS AUTOR ##
+
+
+## CABEÇALHO ##
+def cabecalho_limpo(campos):
+    # O ficheiro limpo tem as colunas originais mais nacionalidade e preço
+    return list(campos) + ['artist_nacionality', 'track_price']
+## ----FIM---- CABEÇALHO ##
+
+
+## CLEAN DATA ##
+def limpar_linha(linha, n_campos, indice_genero, semente=SEMENTE):
+    # Recebe uma linha do raw_tracks original (sem a quebra de linha) e devolve
+    # a lista de campos limpos, ou None se a linha tiver de ser descartada.
+
+    # Só interessam linhas que começam pelo track_id
+    if not linha[:1].isdigit():
+        return None
+
+    campos = linha.split(',')
+
+    # Linhas com colunas a mais ou a menos (ex.: vírgulas dentro de campos) são descartadas
+    if len(campos) != n_campos:
+        return None
+
+    ## finding genre of track
+    for item in campos[indice_genero].split(','):
+        if 'genre_title' in item:
+            campos[indice_genero] = item[item.find(':') + 3: len(item) - 1]
+    ## ----FIM---- finding genre of track
+
+    track_id = campos[0]
+    campos.append(atribuir_nacionalidade(semente, track_id))
+    campos.append(str(atribuir_preco_track(semente, track_id)))
+    return campos
+## ----FIM---- CLEAN DATA ##
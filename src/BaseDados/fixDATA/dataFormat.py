@@ -1,44 +1,109 @@
-# from random import randint
+"""
+Agregação das músicas limpas em autores e álbuns (usada pelo pipeline.py).
 
-# def feedAuthors (authorsDict, line):
-#     authorsDict[int(line['artist_id'])] = {
-#                     'artist_name' : line['artist_name'],
-#                     'artist_nacionality' :line['artist_nacionality'],
-#                     'album_title': [(int(line['album_id']), line['album_title'])],
-#                     'rights_percentage' : randint(10, 50),
-#                     'total_earned' : round(float(line['track_price']) * int(line['track_interest']),2)
-#                 }
+Os dicionários guardam, por author_id / album_id, só os campos de valor único
+da tabela final. As ligações (album_title dos autores e tracks dos álbuns),
+que crescem com o número de músicas, vão para listas à parte que o pipeline
+despeja para disco bloco a bloco (ver organizeData.py), para a memória não
+crescer com o tamanho do ficheiro.
 
+Os valores monetários são somados em cêntimos (inteiros), para que o resultado
+seja exatamente o mesmo qualquer que seja a ordem em que os blocos do ficheiro
+são somados (com floats a ordem mudaria as últimas casas decimais).
 
-# def updateAuthors(authorsDict, line):
-#     authorsDict[int(line['artist_id'])]['album_title'].append((int(line['album_id']), line['album_title']))
-#     authorsDict[int(line['artist_id'])]['total_earned'] += round(float(line['track_price']) * int(line['track_interest']),2)
+authorsDict[artist_id] = [artist_name, artist_nacionality, total_earned_cents]
+albumsDict[album_id]   = [album_title, artist_name, album_genere, album_date, unites_sold, album_price_cents]
+ligacoes = ([(artist_id, album_id, album_title), ...], [(album_id, track_id, track_title), ...])
+"""
 
 
+def cents(valor):
+    return round(valor * 100)
 
-# def feedAlbums (albumsDict, line):
-#     albumsDict[int(line['album_id'])] = {
-#                     'album_title': line['album_title'],
-#                     'artist_name': line['artist_name'],
-#                     'album_genere': line['track_genres'],
-#                     'album_date': line['track_date_recorded'],
-#                     'unites_sold': int(line['track_interest']),
-#                     'album_price': float(line['track_price']),
-#                     'tracks': [(int(line['track_id']),line['track_title'])],
-#                 }
 
+def linha_para_track(line, indices):
+    # Extrai de uma linha (lista de campos) os valores usados nas tabelas.
+    # Devolve None se algum campo numérico for inválido (a linha é descartada).
+    try:
+        return {
+            'track_id': int(line[indices['track_id']]),
+            'album_id': int(line[indices['album_id']]),
+            'artist_id': int(line[indices['artist_id']]),
+            'track_interest': int(line[indices['track_interest']]),
+            'track_price': float(line[indices['track_price']]),
+            'album_title': line[indices['album_title']],
+            'artist_name': line[indices['artist_name']],
+            'artist_nacionality': line[indices['artist_nacionality']],
+            'track_genres': line[indices['track_genres']],
+            'track_date_recorded': line[indices['track_date_recorded']],
+            'track_title': line[indices['track_title']],
+        }
+    except (ValueError, IndexError):
+        return None
 
-# def updateAlbums(albumsDict, line):
 
-#     #update unidades vendidas
-#     albumsDict[int(line['album_id'])]['unites_sold'] += int(line['track_interest'])
+def feedAuthors(authorsDict, track):
+    authorsDict[track['artist_id']] = [
+        track['artist_name'],
+        track['artist_nacionality'],
+        cents(track['track_price'] * track['track_interest']),
+    ]
 
-#     #update preço album
-#     albumsDict[int(line['album_id'])]['album_price'] += float(line['track_price'])
 
-#     #update tracks
-#     albumsDict[int(line['album_id'])]['tracks'].append((int(line['track_id']),line['track_title'])) 
+def updateAuthors(authorsDict, track):
+    authorsDict[track['artist_id']][2] += cents(track['track_price'] * track['track_interest'])
 
 
+def feedAlbums(albumsDict, track):
+    albumsDict[track['album_id']] = [
+        track['album_title'],
+        track['artist_name'],
+        track['track_genres'],
+        track['track_date_recorded'],
+        track['track_interest'],
+        cents(track['track_price']),
+    ]
 
-# # def feedAuthentication():
+
+def updateAlbums(albumsDict, track):
+    album = albumsDict[track['album_id']]
+
+    #update unidades vendidas
+    album[4] += track['track_interest']
+
+    #update preço album
+    album[5] += cents(track['track_price'])
+
+
+def adicionar_track(authorsDict, albumsDict, ligacoes, track):
+    # Adicionar novas entradas OU atualizar entradas existentes
+    if track['artist_id'] not in authorsDict:
+        feedAuthors(authorsDict, track)
+    else:
+        updateAuthors(authorsDict, track)
+
+    if track['album_id'] not in albumsDict:
+        feedAlbums(albumsDict, track)
+    else:
+        updateAlbums(albumsDict, track)
+
+    # Ligações autor -> álbum e álbum -> música (uma por música, pela ordem do ficheiro)
+    ligacoes[0].append((track['artist_id'], track['album_id'], track['album_title']))
+    ligacoes[1].append((track['album_id'], track['track_id'], track['track_title']))
+
+
+def juntar(authorsDict, albumsDict, outrosAutores, outrosAlbuns):
+    # Junta os resultados de um bloco seguinte do ficheiro aos acumulados até agora.
+    # Os campos "da primeira música" (nome, género, data, ...) ficam os do bloco anterior.
+    for artist_id, author in outrosAutores.items():
+        if artist_id not in authorsDict:
+            authorsDict[artist_id] = author
+        else:
+            authorsDict[artist_id][2] += author[2]
+
+    for album_id, album in outrosAlbuns.items():
+        if album_id not in albumsDict:
+            albumsDict[album_id] = album
+        else:
+            albumsDict[album_id][4] += album[4]
+            albumsDict[album_id][5] += album[5]
@@ -1,116 +1,98 @@
-# from csv import DictReader
-# from dataFormat import feedAlbums, updateAlbums, feedAuthors, updateAuthors
-
-# #ORGANIZING DATA IN DICTIONARIES
-# authorsDict = {}
-# albumsDict = {}
-
-# # transforma cada line numa lista
-# tracksUsableFile = open('data/raw_tracks.csv', 'r', encoding='utf-8-sig' )
-# tracksUsableData = list(DictReader(tracksUsableFile.readlines())) 
-# tracksUsableFile.close()
-
-
-# ## organize data into authors and albums tables
-
-# for line in tracksUsableData[1:]:
-
-#     # descartar entradas desnecessárias
-#     try:
-#         artist_id = int(line['artist_id'])
-#         album_id = int(line['album_id'])
-#     except:
-#         continue
-
-
-#     # Inicializar o dicionário
-#     if len(authorsDict) == 0 and len(albumsDict) == 0:
-#         feedAuthors(authorsDict, line)
-#         feedAlbums(albumsDict, line) 
-
-#     # Adicionar novas entradas OU atualizar entradas existentes
-#     if len(authorsDict) > 0 and len(albumsDict) > 0:
-
-#         # Authors
-#         # Adicionar novo Autor
-#         if  artist_id not in authorsDict:
-#             try:
-#                 feedAuthors(authorsDict, line)
-#             except:
-#                 continue
-
-#         # Adicionar dados a autor já existente
-#         elif artist_id in authorsDict:
-#             try:
-#                 updateAuthors(authorsDict, line)
-#             except:
-#                 continue
-
-
-#         # Albums
-#         # Adicionar novo album
-#         if album_id not in albumsDict:
-#             try:
-#                 feedAlbums(albumsDict, line)
-#             except:
-#                 continue
-
-
-#         # Adicionar dados a a album já existente
-#         elif album_id in albumsDict:
-#             try:
-#                 updateAlbums(albumsDict, line)
-#             except:
-#                 continue
-
-# # ----FIM----  ORGANIZING DATA IN DICTIONARIES
-
-
-
-# # MAKING DIFFERENT TABLES
-# authorsData = []
-# albumsData = []
-
-# authorsColumns = list(authorsDict[1].keys())
-# authorsColumns.insert(0, 'author_id')
-# albumsColumns = list(albumsDict[1].keys())
-# albumsColumns.insert(0, 'album_id')
-
-# def dict_2_array (dicionario, lista):
-#     for index in dicionario:
-#         entry = list(dicionario[index].values())
-
-#         for val in range(0,len(entry)):
-#             entry[val] = str(entry[val])
-#         entry.insert(0, str(index))
-#         entry = ','.join(entry) + '\n'
-
-#         lista.append(entry)
-        
-
-# # dict_2_array(authorsDict)
-# dict_2_array(authorsDict, authorsData)
-# dict_2_array(albumsDict, albumsData)
-
-
-# #adding columns to the begining of the array 
-
-# authorsData.insert(0, ','.join(authorsColumns) + '\n')
-# albumsData.insert(0, ','.join(albumsColumns) + '\n')
-
-
-# ## creating authors table
-
-# authorsTable = open('data/authors_table.csv', 'w', encoding='utf-8-sig')
-# authorsTable.writelines(authorsData)
-# authorsTable.close()
-
-
-# ## creating albums table
-
-# albumsTable = open('data/albums_table.csv', 'w', encoding='utf-8-sig')
-# albumsTable.writelines(albumsData)
-# albumsTable.close()
-
-
-# # ----FIM----  MAKING DIFFERENT TABLES
\ No newline at end of file
+"""
+Escrita das tabelas de autores e álbuns (última etapa do pipeline.py).
+
+Recebe os dicionários construídos por dataFormat.py e grava authors_table.csv
+e albums_table.csv no mesmo formato que a aplicação usa (ver crud.py): linhas
+ordenadas pelo ID e listas (id, título) guardadas como texto.
+
+As ligações (uma por música) não ficam em memória: cada bloco é despejado numa
+base de dados SQLite temporária e, na escrita, são lidas já ordenadas por ID
+(e pela ordem do ficheiro dentro de cada ID), uma linha da tabela de cada vez.
+
+Cada tabela é escrita primeiro num ficheiro temporário na mesma pasta e só no
+fim substitui a original (os.replace), para nunca ficar um CSV a meio.
+"""
+
+import csv
+import os
+import sqlite3
+import tempfile
+from itertools import groupby
+from pathlib import Path
+
+AUTHORS_COLUMNS = ['author_id', 'artist_name', 'artist_nacionality', 'album_title', 'rights_percentage', 'total_earned']
+ALBUMS_COLUMNS = ['album_id', 'album_title', 'artist_name', 'album_genere', 'album_date', 'unites_sold', 'album_price', 'tracks']
+
+
+## LIGAÇÕES TEMPORÁRIAS ##
+def abrir_ligacoes(pasta=None):
+    # Base de dados temporária para as ligações; é apagada ao fechar.
+    fd, caminho = tempfile.mkstemp(prefix=".ligacoes.", suffix=".db", dir=pasta)
+    os.close(fd)
+
+    con = sqlite3.connect(caminho)
+    con.execute("PRAGMA journal_mode=OFF")
+    con.execute("PRAGMA synchronous=OFF")
+    # A ordem de inserção (rowid) é a ordem das músicas no ficheiro
+    con.execute("CREATE TABLE autores (id INTEGER, ligado INTEGER, titulo TEXT)")
+    con.execute("CREATE TABLE albuns (id INTEGER, ligado INTEGER, titulo TEXT)")
+    return con, caminho
+
+
+def guardar_ligacoes(con, ligacoes):
+    # Despeja as ligações de um bloco (dataFormat.adicionar_track), pela ordem do ficheiro
+    with con:
+        con.executemany("INSERT INTO autores VALUES (?, ?, ?)", ligacoes[0])
+        con.executemany("INSERT INTO albuns VALUES (?, ?, ?)", ligacoes[1])
+
+
+def fechar_ligacoes(con, caminho):
+    con.close()
+    if os.path.exists(caminho):
+        os.unlink(caminho)
+
+
+def _listas(con, tabela):
+    # (id, [(ligado, titulo), ...]) por ordem de ID, com cada lista pela ordem do ficheiro
+    cursor = con.execute(f"SELECT id, ligado, titulo FROM {tabela} ORDER BY id, rowid")
+    for chave, linhas in groupby(cursor, key=lambda linha: linha[0]):
+        yield chave, [(ligado, titulo) for _, ligado, titulo in linhas]
+## ----FIM---- LIGAÇÕES TEMPORÁRIAS ##
+
+
+def escrever_csv(destino, cabecalho, linhas):
+    # Escreve o CSV num temporário e depois troca-o pelo destino
+    destino = Path(destino)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, temporario = tempfile.mkstemp(prefix=f".{destino.name}.", suffix=".tmp", dir=destino.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8-sig', newline='') as ficheiro:
+            writer = csv.writer(ficheiro)
+            writer.writerow(cabecalho)
+            writer.writerows(linhas)
+        os.replace(temporario, destino)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+
+
+## creating authors table
+def escrever_autores(authorsDict, con, destino, direitos):
+    # `direitos(artist_id)` devolve a percentagem de direitos de cada autor
+    def linhas():
+        for artist_id, albums in _listas(con, "autores"):
+            name, nationality, total_cents = authorsDict[artist_id]
+            yield [artist_id, name, nationality, str(albums), direitos(artist_id), total_cents / 100]
+
+    escrever_csv(destino, AUTHORS_COLUMNS, linhas())
+
+
+## creating albums table
+def escrever_albuns(albumsDict, con, destino):
+    def linhas():
+        for album_id, tracks in _listas(con, "albuns"):
+            title, artist, genre, date, units, price_cents = albumsDict[album_id]
+            yield [album_id, title, artist, genre, date, units, price_cents / 100, str(tracks)]
+
+    escrever_csv(destino, ALBUMS_COLUMNS, linhas())
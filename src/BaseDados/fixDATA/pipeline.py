@@ -0,0 +1,287 @@
+"""
+Pipeline de preparação dos dados: raw_tracks original -> músicas limpas -> autores e álbuns.
+
+Junta num só processo o que antes eram os scripts comentados cleanData.py,
+organizeData.py e dataFormat.py (que agora têm as funções de cada etapa):
+- o ficheiro de origem é lido em blocos de linhas (por intervalos de bytes),
+  sem nunca o carregar inteiro; cada bloco é limpo e escrito numa parte
+  temporária e, ao mesmo tempo, agregado em autores e álbuns;
+- com processos > 1 os blocos são tratados em paralelo (multiprocessing) e os
+  resultados juntados pela ordem do ficheiro, por isso o resultado é igual ao
+  de um só processo;
+- nacionalidades, preços e direitos são calculados a partir de uma semente
+  (ver cleanData.py): a mesma semente dá sempre as mesmas tabelas;
+- os ficheiros finais só substituem os anteriores no fim (os.replace).
+
+A memória usada não depende do tamanho do ficheiro de origem: em memória só
+ficam os campos de cada autor e álbum (um registo por ID) e os blocos em
+curso; as ligações de cada música vão para uma base de dados temporária
+(ver organizeData.py).
+
+Uso (a partir da raiz do projeto):
+    # Gerar de novo authors_table.csv e albums_table.csv a partir de raw_tracks.csv
+    python src/BaseDados/fixDATA/pipeline.py organizar
+
+    # Limpar um raw_tracks original e gerar as três tabelas
+    python src/BaseDados/fixDATA/pipeline.py completo ORIGEM --processos 4
+"""
+
+import argparse
+import csv
+import multiprocessing
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+try:
+    from BaseDados.fixDATA import cleanData, dataFormat, organizeData
+except ImportError:
+    # Executado diretamente (python src/BaseDados/fixDATA/pipeline.py)
+    import cleanData
+    import dataFormat
+    import organizeData
+
+TRACKS_FILE = Path("data/raw_tracks.csv")
+AUTHORS_FILE = Path("data/authors_table.csv")
+ALBUMS_FILE = Path("data/albums_table.csv")
+
+# Tamanho (aproximado) de cada bloco do ficheiro de origem
+TAMANHO_BLOCO = 32 * 1024 * 1024
+
+
+# ====================== LEITURA EM BLOCOS ======================
+
+def _cabecalho(caminho):
+    """Nomes das colunas e posição (em bytes) onde começam os dados."""
+    with open(caminho, 'rb') as ficheiro:
+        linha = ficheiro.readline()
+    return linha.decode('utf-8-sig').rstrip('\r\n').split(','), len(linha)
+
+
+def _blocos(caminho, inicio, tamanho_bloco):
+    """Divide o ficheiro (a partir de `inicio`) em intervalos de bytes que começam sempre no início de uma linha."""
+    fim = os.path.getsize(caminho)
+    limites = [inicio]
+
+    with open(caminho, 'rb') as ficheiro:
+        while limites[-1] + tamanho_bloco < fim:
+            ficheiro.seek(limites[-1] + tamanho_bloco)
+            ficheiro.readline()  # avança até ao fim da linha onde o corte calhou
+            if ficheiro.tell() >= fim:
+                break
+            limites.append(ficheiro.tell())
+
+    limites.append(fim)
+    return list(zip(limites, limites[1:]))
+
+
+def _linhas(ficheiro, inicio, fim):
+    """Linhas (texto, com a quebra de linha) entre as posições `inicio` e `fim`."""
+    ficheiro.seek(inicio)
+    posicao = inicio
+    while posicao < fim:
+        linha = ficheiro.readline()
+        if not linha:
+            break
+        posicao += len(linha)
+        yield linha.decode('utf-8')
+
+
+def _indices(cabecalho):
+    # Nome da coluna -> posição. Nas colunas repetidas fica a última, como no csv.DictReader.
+    return {nome: i for i, nome in enumerate(cabecalho)}
+
+
+# ====================== TRATAMENTO DE UM BLOCO ======================
+
+def _processar_bloco(tarefa):
+    """
+    Trata um bloco do ficheiro (corre num processo do Pool, ou no próprio processo).
+    Com `parte`, limpa as linhas e escreve-as nesse ficheiro; sem `parte`, as
+    linhas já estão limpas e só são agregadas.
+    Devolve (autores, álbuns, ligações, linhas lidas, linhas usadas).
+    """
+    caminho, inicio, fim, cabecalho, semente, parte = tarefa
+
+    authorsDict = {}
+    albumsDict = {}
+    ligacoes = ([], [])
+    contagem = {'lidas': 0, 'usadas': 0}
+
+    with open(caminho, 'rb') as ficheiro:
+        linhas = _linhas(ficheiro, inicio, fim)
+
+        if parte is None:
+            indices = _indices(cabecalho)
+            for campos in csv.reader(linhas):
+                contagem['lidas'] += 1
+                track = dataFormat.linha_para_track(campos, indices)
+                if track is not None:
+                    dataFormat.adicionar_track(authorsDict, albumsDict, ligacoes, track)
+                    contagem['usadas'] += 1
+        else:
+            indices = _indices(cleanData.cabecalho_limpo(cabecalho))
+            indice_genero = cabecalho.index('track_genres')
+
+            with open(parte, 'w', encoding='utf-8', newline='') as saida:
+
+                def limpas():
+                    # Escreve cada linha limpa e passa-a ao csv.reader: tal como
+                    # antes (organizeData lia o ficheiro limpo com DictReader), os
+                    # campos entre aspas são interpretados só na agregação.
+                    for linha in linhas:
+                        contagem['lidas'] += 1
+                        campos = cleanData.limpar_linha(linha.rstrip('\r\n'), len(cabecalho), indice_genero, semente)
+                        if campos is None:
+                            continue
+                        contagem['usadas'] += 1
+                        texto = ','.join(campos) + '\n'
+                        saida.write(texto)
+                        yield texto
+
+                for campos in csv.reader(limpas()):
+                    track = dataFormat.linha_para_track(campos, indices)
+                    if track is not None:
+                        dataFormat.adicionar_track(authorsDict, albumsDict, ligacoes, track)
+
+    return authorsDict, albumsDict, ligacoes, contagem['lidas'], contagem['usadas']
+
+
+def _executar(origem, ligacoes, semente, processos, tamanho_bloco, destino_limpo=None):
+    """
+    Percorre a origem bloco a bloco, guardando as ligações na base de dados
+    temporária `ligacoes`, e devolve (autores, álbuns, lidas, usadas).
+    """
+    cabecalho, inicio = _cabecalho(origem)
+    blocos = _blocos(origem, inicio, tamanho_bloco)
+
+    # Partes temporárias do ficheiro limpo (uma por bloco), na pasta do destino
+    partes = [None] * len(blocos)
+    if destino_limpo is not None:
+        destino_limpo.parent.mkdir(parents=True, exist_ok=True)
+        partes = [
+            tempfile.mkstemp(prefix=f".{destino_limpo.name}.parte{i}.", dir=destino_limpo.parent)
+            for i in range(len(blocos))
+        ]
+        for fd, _ in partes:
+            os.close(fd)
+        partes = [caminho for _, caminho in partes]
+
+    tarefas = [(str(origem), a, b, cabecalho, semente, parte) for (a, b), parte in zip(blocos, partes)]
+
+    authorsDict = {}
+    albumsDict = {}
+    lidas = usadas = 0
+
+    try:
+        if processos > 1 and len(tarefas) > 1:
+            pool = multiprocessing.Pool(processos)
+            # imap devolve os resultados pela ordem dos blocos
+            resultados = pool.imap(_processar_bloco, tarefas)
+        else:
+            pool = None
+            resultados = map(_processar_bloco, tarefas)
+
+        try:
+            for autores, albuns, ligacoes_bloco, n_lidas, n_usadas in resultados:
+                dataFormat.juntar(authorsDict, albumsDict, autores, albuns)
+                organizeData.guardar_ligacoes(ligacoes, ligacoes_bloco)
+                lidas += n_lidas
+                usadas += n_usadas
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+        if destino_limpo is not None:
+            _juntar_partes(partes, cleanData.cabecalho_limpo(cabecalho), destino_limpo)
+    finally:
+        for parte in partes:
+            if parte is not None and os.path.exists(parte):
+                os.unlink(parte)
+
+    return authorsDict, albumsDict, lidas, usadas
+
+
+def _juntar_partes(partes, cabecalho, destino):
+    """Junta as partes limpas (pela ordem) num temporário e substitui o destino."""
+    fd, temporario = tempfile.mkstemp(prefix=f".{destino.name}.", suffix=".tmp", dir=destino.parent)
+    try:
+        with os.fdopen(fd, 'wb') as saida:
+            saida.write((','.join(cabecalho) + '\n').encode('utf-8-sig'))
+            for parte in partes:
+                with open(parte, 'rb') as entrada:
+                    shutil.copyfileobj(entrada, saida, 1024 * 1024)
+        os.replace(temporario, destino)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+
+
+# ====================== ETAPAS ======================
+
+def _gerar(origem, destino_autores, destino_albuns, semente, processos, tamanho_bloco, destino_limpo=None):
+    """Corre o pipeline sobre `origem` e escreve as tabelas. Devolve (autores, álbuns, lidas, usadas)."""
+    destino_autores = Path(destino_autores)
+    destino_autores.parent.mkdir(parents=True, exist_ok=True)
+    ligacoes, caminho_ligacoes = organizeData.abrir_ligacoes(destino_autores.parent)
+
+    try:
+        authorsDict, albumsDict, lidas, usadas = _executar(
+            Path(origem), ligacoes, semente, processos, tamanho_bloco, destino_limpo
+        )
+        organizeData.escrever_autores(
+            authorsDict, ligacoes, destino_autores,
+            lambda artist_id: cleanData.atribuir_direitos(semente, artist_id),
+        )
+        organizeData.escrever_albuns(albumsDict, ligacoes, destino_albuns)
+    finally:
+        organizeData.fechar_ligacoes(ligacoes, caminho_ligacoes)
+
+    return authorsDict, albumsDict, lidas, usadas
+
+
+def organizar(musicas=TRACKS_FILE, destino_autores=AUTHORS_FILE, destino_albuns=ALBUMS_FILE,
+              semente=cleanData.SEMENTE, processos=1, tamanho_bloco=TAMANHO_BLOCO):
+    """Gera authors_table.csv e albums_table.csv a partir de um raw_tracks já limpo."""
+    authorsDict, albumsDict, lidas, usadas = _gerar(
+        musicas, destino_autores, destino_albuns, semente, processos, tamanho_bloco
+    )
+
+    print(f"Linhas lidas: {lidas}  |  Usadas: {usadas}  |  Descartadas: {lidas - usadas}")
+    print(f"Autores: {len(authorsDict)}  |  Álbuns: {len(albumsDict)}")
+
+
+def limpar_e_organizar(origem, destino_musicas=TRACKS_FILE, destino_autores=AUTHORS_FILE,
+                       destino_albuns=ALBUMS_FILE, semente=cleanData.SEMENTE, processos=1,
+                       tamanho_bloco=TAMANHO_BLOCO):
+    """Limpa um raw_tracks original (para `destino_musicas`) e gera as tabelas de autores e álbuns."""
+    authorsDict, albumsDict, lidas, usadas = _gerar(
+        origem, destino_autores, destino_albuns, semente, processos, tamanho_bloco,
+        destino_limpo=Path(destino_musicas),
+    )
+
+    print(f"Linhas lidas: {lidas}  |  Limpas: {usadas}  |  Descartadas: {lidas - usadas}")
+    print(f"Autores: {len(authorsDict)}  |  Álbuns: {len(albumsDict)}")
+
+
+# Execução principal do script.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline de preparação dos CSV da Tocadiscos.")
+    parser.add_argument("etapa", choices=["organizar", "completo"],
+                        help="organizar: só autores e álbuns; completo: limpar a origem e gerar tudo")
+    parser.add_argument("origem", nargs="?", default=str(TRACKS_FILE),
+                        help="raw_tracks original (completo) ou já limpo (organizar)")
+    parser.add_argument("--musicas", default=str(TRACKS_FILE), help="destino das músicas limpas (completo)")
+    parser.add_argument("--autores", default=str(AUTHORS_FILE))
+    parser.add_argument("--albuns", default=str(ALBUMS_FILE))
+    parser.add_argument("--semente", type=int, default=cleanData.SEMENTE)
+    parser.add_argument("--processos", type=int, default=1)
+    parser.add_argument("--bloco-mb", type=int, default=TAMANHO_BLOCO // (1024 * 1024))
+    args = parser.parse_args()
+
+    opcoes = dict(semente=args.semente, processos=args.processos, tamanho_bloco=args.bloco_mb * 1024 * 1024)
+    if args.etapa == "organizar":
+        organizar(args.origem, args.autores, args.albuns, **opcoes)
+    else:
+        limpar_e_organizar(args.origem, args.musicas, args.autores, args.albuns, **opcoes)
@@ -1,4 +1,6 @@
+import os
 import shutil
+import tempfile
 from pathlib import Path
 
 # Caminhos para os ficheiros CSV que queremos corrigir.
@@ -19,11 +21,14 @@ def add_quotes_around_brackets(file_path: Path):
     shutil.copy(file_path, backup)
     print(f"Backup criado: {backup}")
 
-    lines = []          # Lista onde vamos guardar as linhas já tratadas.
     modified_count = 0  # Contador de quantas linhas foram alteradas.
 
+    # As linhas tratadas vão sendo escritas num ficheiro temporário na mesma pasta
+    # (sem guardar o ficheiro todo em memória), que no fim substitui o original.
+    fd, temporario = tempfile.mkstemp(prefix=f".{file_path.name}.", suffix=".tmp", dir=file_path.parent)
+
     # Abrimos o ficheiro original para leitura.
-    with open(file_path, 'r', encoding='utf-8-sig') as f:
+    with open(file_path, 'r', encoding='utf-8-sig') as f, os.fdopen(fd, 'w', encoding='utf-8-sig') as out:
         for line in f:
             original_line = line.rstrip('\n')  # Removemos apenas a quebra de linha.
             new_line = original_line           # Começamos por assumir que a linha não muda.
@@ -50,12 +55,11 @@ def add_quotes_around_brackets(file_path: Path):
                         new_line = before + '"' + content + '"' + after
                         modified_count += 1  # Contamos esta linha como modificada.
 
-            # Guardamos a linha (alterada ou não) na lista final.
-            lines.append(new_line)
+            # Escrevemos a linha (alterada ou não) no ficheiro temporário.
+            out.write(new_line + '\n')
 
-    # Reescrevemos o ficheiro original com as linhas já tratadas.
-    with open(file_path, 'w', encoding='utf-8-sig') as f:
-        f.write('\n'.join(lines) + '\n')
+    # Substituímos o ficheiro original pelo temporário já tratado.
+    os.replace(temporario, file_path)
 
     print(f"Processo concluído!")
     print(f"Linhas modificadas: {modified_count}")
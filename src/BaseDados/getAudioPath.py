@@ -1,23 +1,53 @@
-def getAudioPath(track_id):
-    # Caminho base onde estão guardadas as músicas
-    path = 'data/songs/'
+from functools import lru_cache
 
-    # Convertimos o track_id para string para podermos manipular os dígitos
-    track_id = str(track_id)
+# Pasta onde estão guardadas as músicas e extensão dos ficheiros áudio.
+# Estes valores são lidos em cada chamada (e não quando o módulo é importado):
+# basta alterá-los aqui (ex.: getAudioPath.RAIZ_AUDIO = 'outra/pasta') para
+# os caminhos, o manifesto (manifestoAudio) e o player passarem a usá-los.
+RAIZ_AUDIO = 'data/songs'
+EXTENSAO_AUDIO = '.mp3'
 
-    # O sistema de pastas usa IDs com 6 dígitos.
-    # Se o ID tiver menos de 6 dígitos, adicionamos zeros à esquerda.
-    if len(track_id) < 6:
-        missing = 6 - len(track_id)
-        for x in range(missing):
-            track_id = '0' + track_id
 
+def _prefixo(raiz):
+    # A raiz pode ser indicada com ou sem '/' no fim
+    return raiz.rstrip('/') + '/'
+
+
+# Os mesmos IDs são pedidos muitas vezes (player, manifesto, listagens), por
+# isso os caminhos já calculados ficam guardados (até 65536 diferentes).
+# A chave inclui a raiz e a extensão, por isso mudar a configuração não
+# devolve caminhos antigos.
+@lru_cache(maxsize=65536)
+def _caminho(track_id, raiz, extensao):
     # A estrutura das pastas é:
     #   data/songs/XXX/XXXXXX
     # Onde:
     #   - XXX são os primeiros 3 dígitos do ID
-    #   - XXXXXX é o ID completo com zeros à esquerda
-    path += track_id[0:3] + '/' + track_id[0:len(track_id)]
+    #   - XXXXXX é o ID completo com zeros à esquerda (IDs com menos de 6 dígitos)
+    track_id = str(track_id).zfill(6)
+    return f"{_prefixo(raiz)}{track_id[:3]}/{track_id}{extensao}"
+
+
+def getAudioPath(track_id, raiz=None, extensao=''):
+    # Caminho (sem extensão, por omissão) do áudio de uma música.
+    # Sem `raiz`, usa a RAIZ_AUDIO atual.
+    return _caminho(track_id, RAIZ_AUDIO if raiz is None else raiz, extensao)
+
+
+def getAudioFile(track_id, raiz=None):
+    # Caminho completo do ficheiro áudio, já com a extensão (EXTENSAO_AUDIO).
+    return _caminho(track_id, RAIZ_AUDIO if raiz is None else raiz, EXTENSAO_AUDIO)
+
+
+def getAudioPaths(track_ids, raiz=None, extensao=''):
+    # Caminhos de vários IDs de uma vez (lista, tuplo, range, array numpy, ...),
+    # pela mesma ordem. Faz o mesmo que getAudioPath para cada ID, mas sem
+    # passar pela cache nem pagar uma chamada de função por ID.
+    prefixo = _prefixo(RAIZ_AUDIO if raiz is None else raiz)
+    ids = [str(track_id).zfill(6) for track_id in track_ids]
+    return [f"{prefixo}{track_id[:3]}/{track_id}{extensao}" for track_id in ids]
+
 
-    # Devolvemos o caminho final para o ficheiro áudio
-    return path
\ No newline at end of file
+def getAudioFiles(track_ids, raiz=None):
+    # Como getAudioPaths, mas com a extensão dos ficheiros áudio (EXTENSAO_AUDIO).
+    return getAudioPaths(track_ids, raiz, EXTENSAO_AUDIO)
\ No newline at end of file
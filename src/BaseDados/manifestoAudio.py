@@ -0,0 +1,126 @@
+"""
+Manifesto dos ficheiros de áudio disponíveis em data/songs.
+
+Os ficheiros seguem a estrutura de getAudioPath (data/songs/XXX/XXXXXX.mp3).
+Em vez de verificar com os.path.exists cada música, as pastas são lidas com
+os.scandir e guarda-se o conjunto dos track_id que têm áudio: responder a
+"esta música tem áudio?" passa a ser só uma consulta a um set.
+
+O manifesto é atualizado de forma incremental: só voltam a ser lidas as
+pastas XXX cuja data de modificação (mtime) mudou desde a última leitura
+(adicionar ou apagar um ficheiro muda o mtime da pasta). Essa verificação
+é feita no máximo uma vez a cada INTERVALO_VERIFICACAO segundos.
+
+A pasta e a extensão são as configuradas em getAudioPath (RAIZ_AUDIO e
+EXTENSAO_AUDIO), lidas em cada verificação: se mudarem, o manifesto é
+construído de novo para a nova pasta.
+"""
+
+import os
+import time
+
+import BaseDados.getAudioPath as _caminhos
+
+# Tempo mínimo (segundos) entre duas verificações das pastas
+INTERVALO_VERIFICACAO = 2.0
+
+_pastas = {}        # nome da pasta -> (mtime_ns, frozenset de track_ids)
+_com_audio = set()  # track_ids com ficheiro de áudio (união das pastas)
+_verificado = None  # instante (time.monotonic) da última verificação
+_origem = None      # (pasta, extensão) a que o manifesto corresponde
+
+
+def _ids_da_pasta(caminho, nome, extensao_audio):
+    """track_ids dos ficheiros de uma pasta XXX que getAudioFile encontraria."""
+    ids = set()
+    try:
+        with os.scandir(caminho) as entradas:
+            for entrada in entradas:
+                base, extensao = os.path.splitext(entrada.name)
+                if extensao != extensao_audio or not base.isdigit():
+                    continue
+
+                # Só conta se o nome for exatamente o que getAudioPath gera
+                # (ID com zeros à esquerda até 6 dígitos, na pasta dos 3 primeiros)
+                track_id = int(base)
+                if base != str(track_id).zfill(6) or base[:3] != nome:
+                    continue
+
+                if entrada.is_file():
+                    ids.add(track_id)
+    except OSError:
+        pass
+    return frozenset(ids)
+
+
+def atualizar_manifesto(forcar=False):
+    """
+    Volta a ler as pastas de data/songs que mudaram desde a última vez.
+    Sem `forcar`, não faz nada se a última verificação foi há menos de
+    INTERVALO_VERIFICACAO segundos (a não ser que a pasta configurada tenha mudado).
+    """
+    global _verificado, _origem
+
+    origem = (_caminhos.RAIZ_AUDIO, _caminhos.EXTENSAO_AUDIO)
+    if origem != _origem:
+        descartar_manifesto()
+        _origem = origem
+
+    agora = time.monotonic()
+    if not forcar and _verificado is not None and agora - _verificado < INTERVALO_VERIFICACAO:
+        return
+    _verificado = agora
+
+    raiz, extensao = origem
+    vistas = set()
+    try:
+        with os.scandir(raiz) as entradas:
+            for entrada in entradas:
+                if not entrada.is_dir():
+                    continue
+                try:
+                    mtime = entrada.stat().st_mtime_ns
+                except OSError:
+                    continue
+
+                vistas.add(entrada.name)
+                anterior = _pastas.get(entrada.name)
+                if anterior is not None and anterior[0] == mtime:
+                    continue
+
+                ids = _ids_da_pasta(entrada.path, entrada.name, extensao)
+                if anterior is not None:
+                    _com_audio.difference_update(anterior[1])
+                _com_audio.update(ids)
+                _pastas[entrada.name] = (mtime, ids)
+    except OSError:
+        # Sem pasta de músicas: nenhuma música tem áudio
+        pass
+
+    # Pastas que deixaram de existir
+    for nome in set(_pastas) - vistas:
+        _com_audio.difference_update(_pastas.pop(nome)[1])
+
+
+def tem_audio(track_id) -> bool:
+    """True se existir o ficheiro de áudio desta música."""
+    atualizar_manifesto()
+    try:
+        return int(track_id) in _com_audio
+    except (TypeError, ValueError):
+        return False
+
+
+def ids_com_audio():
+    """Conjunto (só de leitura) dos track_id com ficheiro de áudio."""
+    atualizar_manifesto()
+    return frozenset(_com_audio)
+
+
+def descartar_manifesto():
+    """Esquece o manifesto (a próxima consulta volta a ler todas as pastas)."""
+    global _verificado
+
+    _pastas.clear()
+    _com_audio.clear()
+    _verificado = None
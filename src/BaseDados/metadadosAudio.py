@@ -0,0 +1,328 @@
+"""
+Metadados dos ficheiros de áudio (duração, bitrate e tamanho) das músicas.
+
+Os mp3 de data/songs (ver getAudioFile) são analisados diretamente:
+salta-se a etiqueta ID3 e percorrem-se os cabeçalhos das frames MPEG, somando as amostras de cada
+frame (funciona com ficheiros de bitrate constante ou variável). Um ficheiro
+sem frames válidas, ou com lixo a meio das frames, é marcado como corrompido.
+
+A extração corre em paralelo num Pool de processos e os resultados ficam
+numa cache (CACHE_FILE) com o tamanho e o mtime de cada ficheiro: numa nova
+execução só são analisados os ficheiros novos ou alterados.
+As listagens só leem a cache (ver `metadados` e `resumo_album`).
+"""
+
+import json
+import multiprocessing
+import os
+import tempfile
+
+from BaseDados.getAudioPath import getAudioFiles
+from BaseDados.manifestoAudio import tem_audio
+
+CACHE_FILE = "data/metadados_audio.json"
+
+# Estados de cada música
+OK = "ok"
+CORROMPIDO = "corrompido"
+
+
+# ====================== CABEÇALHOS MPEG ======================
+
+# Bitrates (kbps) por (versão MPEG 1 ou 2, layer); o MPEG 2.5 usa as do MPEG 2
+_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+# Frequências de amostragem por bits da versão (MPEG 1, 2 e 2.5)
+_FREQUENCIAS = {
+    0b11: (44100, 48000, 32000),
+    0b10: (22050, 24000, 16000),
+    0b00: (11025, 12000, 8000),
+}
+
+
+def _frame(dados, posicao):
+    """
+    Lê o cabeçalho da frame em `posicao`.
+    Devolve (tamanho da frame em bytes, amostras, frequência) ou None se não for válido.
+    """
+    if posicao + 4 > len(dados) or dados[posicao] != 0xFF:
+        return None
+
+    cabecalho = int.from_bytes(dados[posicao:posicao + 4], "big")
+    if (cabecalho >> 21) & 0x7FF != 0x7FF:
+        return None
+
+    bits_versao = (cabecalho >> 19) & 0b11
+    bits_layer = (cabecalho >> 17) & 0b11
+    indice_bitrate = (cabecalho >> 12) & 0xF
+    indice_frequencia = (cabecalho >> 10) & 0b11
+    padding = (cabecalho >> 9) & 1
+
+    # Valores reservados (ou bitrate "livre", que não se consegue medir)
+    if bits_versao == 0b01 or bits_layer == 0 or indice_bitrate in (0, 15) or indice_frequencia == 3:
+        return None
+
+    versao = 1 if bits_versao == 0b11 else 2
+    layer = 4 - bits_layer
+    bitrate = _BITRATES[(versao, layer)][indice_bitrate] * 1000
+    frequencia = _FREQUENCIAS[bits_versao][indice_frequencia]
+
+    if layer == 1:
+        amostras = 384
+        tamanho = (12 * bitrate // frequencia + padding) * 4
+    else:
+        amostras = 1152 if layer == 2 or versao == 1 else 576
+        tamanho = amostras // 8 * bitrate // frequencia + padding
+
+    return tamanho, amostras, frequencia
+
+
+def _sincronizar(dados, posicao, fim):
+    """Próxima posição (a partir de `posicao`) onde há duas frames válidas seguidas, ou None."""
+    while True:
+        posicao = dados.find(b"\xff", posicao, fim)
+        if posicao == -1:
+            return None
+
+        frame = _frame(dados, posicao)
+        if frame is not None:
+            seguinte = posicao + frame[0]
+            # A última frame do ficheiro não tem outra a seguir
+            if seguinte >= fim or _frame(dados, seguinte) is not None:
+                return posicao
+        posicao += 1
+
+
+def _inicio_audio(dados):
+    """Posição a seguir à etiqueta ID3v2 (se existir)."""
+    if len(dados) < 10 or dados[:3] != b"ID3":
+        return 0
+
+    # Tamanho em "syncsafe integer" (7 bits por byte), sem contar com os 10 bytes do cabeçalho
+    tamanho = 0
+    for byte in dados[6:10]:
+        tamanho = (tamanho << 7) | (byte & 0x7F)
+    rodape = 10 if dados[5] & 0x10 else 0
+    return 10 + tamanho + rodape
+
+
+def analisar_mp3(dados):
+    """
+    Analisa o conteúdo de um mp3.
+    Devolve (duração em segundos, bitrate médio em kbps, estado).
+    """
+    fim = len(dados)
+    if fim >= 128 and dados[fim - 128:fim - 125] == b"TAG":
+        fim -= 128  # etiqueta ID3v1 no fim
+
+    posicao = _sincronizar(dados, _inicio_audio(dados), fim)
+    if posicao is None:
+        return 0.0, 0, CORROMPIDO
+
+    amostras_total = 0
+    bytes_audio = 0
+    frames = 0
+    lixo = 0
+    frequencia = None
+    primeira = True
+
+    while posicao < fim:
+        frame = _frame(dados, posicao)
+        if frame is None:
+            # Perdeu-se a sincronização: procura a frame seguinte
+            seguinte = _sincronizar(dados, posicao + 1, fim)
+            if seguinte is None:
+                break  # o resto do ficheiro não tem frames (ex.: etiquetas APE)
+            lixo += seguinte - posicao
+            posicao = seguinte
+            continue
+
+        tamanho, amostras, frequencia_frame = frame
+
+        # A primeira frame pode ser só informação do codificador (Xing/Info/VBRI), sem áudio
+        if primeira:
+            primeira = False
+            if any(marca in dados[posicao:posicao + 40] for marca in (b"Xing", b"Info", b"VBRI")):
+                posicao += tamanho
+                continue
+        frames += 1
+
+        if frequencia is None:
+            frequencia = frequencia_frame
+        amostras_total += amostras
+        bytes_audio += min(tamanho, fim - posicao)
+        posicao += tamanho
+
+    if frames == 0:
+        return 0.0, 0, CORROMPIDO
+
+    duracao = amostras_total / frequencia
+    bitrate = round(bytes_audio * 8 / duracao / 1000) if duracao else 0
+    return round(duracao, 3), bitrate, (OK if lixo == 0 else CORROMPIDO)
+
+
+# ====================== EXTRAÇÃO (POOL DE PROCESSOS) ======================
+
+def _analisar(tarefa):
+    """Analisa um ficheiro (corre num processo do Pool). Devolve (track_id, entrada da cache)."""
+    track_id, caminho, tamanho, mtime = tarefa
+    try:
+        with open(caminho, "rb") as ficheiro:
+            dados = ficheiro.read()
+    except OSError:
+        return track_id, None
+
+    duracao, bitrate, estado = analisar_mp3(dados)
+    return track_id, {
+        "caminho": caminho,
+        "tamanho": tamanho,
+        "mtime_ns": mtime,
+        "duracao": duracao,
+        "bitrate": bitrate,
+        "estado": estado,
+    }
+
+
+def _ler_cache(caminho_cache):
+    try:
+        with open(caminho_cache, encoding="utf-8") as ficheiro:
+            return {int(track_id): entrada for track_id, entrada in json.load(ficheiro).items()}
+    except (OSError, ValueError):
+        return {}
+
+
+def _gravar_cache(caminho_cache, cache):
+    # Escreve num temporário e depois troca-o pela cache anterior
+    pasta = os.path.dirname(caminho_cache) or "."
+    os.makedirs(pasta, exist_ok=True)
+
+    fd, temporario = tempfile.mkstemp(prefix=".metadados_audio.", suffix=".tmp", dir=pasta)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as ficheiro:
+            json.dump({str(track_id): cache[track_id] for track_id in sorted(cache)}, ficheiro)
+        os.replace(temporario, caminho_cache)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+
+
+def extrair_metadados(track_ids, processos=None, caminho_cache=CACHE_FILE):
+    """
+    Atualiza a cache de metadados para estas músicas e devolve as entradas
+    delas ({track_id: entrada}; as músicas sem ficheiro não aparecem).
+    Os ficheiros cujo tamanho e mtime não mudaram vêm da cache; os restantes
+    são analisados em paralelo (`processos`, por omissão um por CPU).
+    """
+    cache = _ler_cache(caminho_cache)
+    tarefas = []
+    em_falta = da_cache = 0
+
+    # O manifesto já sabe que ficheiros existem (sem um stat por música em falta)
+    com_audio = []
+    for track_id in map(int, track_ids):
+        if tem_audio(track_id):
+            com_audio.append(track_id)
+        else:
+            cache.pop(track_id, None)
+            em_falta += 1
+
+    for track_id, caminho in zip(com_audio, getAudioFiles(com_audio)):
+        try:
+            info = os.stat(caminho)
+        except OSError:
+            cache.pop(track_id, None)
+            em_falta += 1
+            continue
+
+        entrada = cache.get(track_id)
+        if (entrada is not None and entrada["caminho"] == caminho
+                and entrada["tamanho"] == info.st_size and entrada["mtime_ns"] == info.st_mtime_ns):
+            da_cache += 1
+            continue
+        tarefas.append((track_id, caminho, info.st_size, info.st_mtime_ns))
+
+    processos = processos or os.cpu_count() or 1
+    if processos > 1 and len(tarefas) > 1:
+        with multiprocessing.Pool(processos) as pool:
+            resultados = list(pool.imap_unordered(_analisar, tarefas, chunksize=8))
+    else:
+        resultados = [_analisar(tarefa) for tarefa in tarefas]
+
+    for track_id, entrada in resultados:
+        if entrada is None:
+            cache.pop(track_id, None)
+            em_falta += 1
+        else:
+            cache[track_id] = entrada
+
+    _gravar_cache(caminho_cache, cache)
+
+    # Só as músicas pedidas (a cache tem também as de outras execuções)
+    pedidas = {track_id: cache[track_id] for track_id in com_audio if track_id in cache}
+
+    corrompidos = sum(1 for entrada in pedidas.values() if entrada["estado"] == CORROMPIDO)
+    print(f"Analisados: {len(tarefas)}  |  Da cache: {da_cache}  |  "
+          f"Em falta: {em_falta}  |  Corrompidos: {corrompidos}")
+    return pedidas
+
+
+# ====================== CONSULTA (LISTAGENS) ======================
+
+_cache = None
+_assinatura = None
+
+
+def metadados(caminho_cache=CACHE_FILE):
+    """Conteúdo da cache ({track_id: entrada}), lido de novo só se o ficheiro mudou."""
+    global _cache, _assinatura
+
+    try:
+        info = os.stat(caminho_cache)
+        assinatura = (caminho_cache, info.st_size, info.st_mtime_ns)
+    except OSError:
+        assinatura = None
+
+    if _cache is None or assinatura != _assinatura:
+        _cache = _ler_cache(caminho_cache) if assinatura is not None else {}
+        _assinatura = assinatura
+    return _cache
+
+
+def resumo_album(track_ids):
+    """
+    Duração total e estado dos ficheiros de um álbum:
+    {'duracao', 'em_falta', 'corrompidas', 'sem_dados'} (sem_dados = ainda não analisadas).
+    """
+    cache = metadados()
+    resumo = {"duracao": 0.0, "em_falta": 0, "corrompidas": 0, "sem_dados": 0}
+
+    for track_id in track_ids:
+        if not tem_audio(track_id):
+            resumo["em_falta"] += 1
+            continue
+
+        entrada = cache.get(int(track_id))
+        if entrada is None:
+            resumo["sem_dados"] += 1
+        elif entrada["estado"] == CORROMPIDO:
+            resumo["corrompidas"] += 1
+        else:
+            resumo["duracao"] += entrada["duracao"]
+
+    return resumo
+
+
+def formatar_duracao(segundos):
+    """Duração como "m:ss" (ou "h:mm:ss")."""
+    minutos, segundos = divmod(int(round(segundos)), 60)
+    horas, minutos = divmod(minutos, 60)
+    if horas:
+        return f"{horas}:{minutos:02d}:{segundos:02d}"
+    return f"{minutos}:{segundos:02d}"
@@ -0,0 +1,91 @@
+import ast
+import re
+
+# ====================== LISTAS DE (ID, TÍTULO) ======================
+#
+# As colunas album_title (autores) e tracks (álbuns) guardam listas de tuplos
+# no formato repr do Python, por exemplo:
+#     [(1, 'Father's Day'), (5, "Talk's Cheap")]
+#
+# Em vez de construir uma AST para cada célula (ast.literal_eval), lemos os
+# pares diretamente com uma expressão regular. Isto também aceita títulos com
+# apóstrofos dentro de plicas (como no exemplo acima), que o literal_eval rejeita:
+# o título só termina numa plica seguida de ")" e de ", (" ou do "]" final.
+
+_PAR = re.compile(
+    r"""\((-?\d+),\s*(?:'(.*?)'|"(.*?)")\)(?=,\s*\(|\s*\]$)""",
+    re.DOTALL,
+)
+_SEPARADOR = re.compile(r",\s*")
+_ESCAPE = re.compile(r"\\(x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|.)", re.DOTALL)
+_ESCAPES = {"'": "'", '"': '"', "\\": "\\", "n": "\n", "t": "\t", "r": "\r"}
+
+
+def parse_lista(texto):
+    # Converte uma célula "[(id, 'titulo'), ...]" numa lista de tuplos (int, str).
+    # Células vazias ou inválidas dão lista vazia (tal como antes com literal_eval).
+    if isinstance(texto, list):
+        return texto
+    if texto is None:
+        return []
+
+    texto = str(texto).strip()
+    if not texto.startswith('[') or not texto.endswith(']'):
+        return []
+
+    resultado = []
+    pos = 1
+    fim = len(texto) - 1
+
+    # Saltamos espaços logo a seguir ao "["
+    while pos < fim and texto[pos].isspace():
+        pos += 1
+
+    while pos < fim:
+        par = _PAR.match(texto, pos)
+        if par is None:
+            # Formato inesperado: deixamos o literal_eval decidir
+            return _parse_lento(texto)
+
+        titulo = par.group(2) if par.group(2) is not None else par.group(3)
+        if '\\' in titulo:
+            titulo = _desescapar(titulo)
+
+        resultado.append((int(par.group(1)), titulo))
+        pos = par.end()
+
+        separador = _SEPARADOR.match(texto, pos)
+        if separador:
+            pos = separador.end()
+        else:
+            # Só podem sobrar espaços antes do "]"
+            if texto[pos:fim].strip():
+                return _parse_lento(texto)
+            break
+
+    return resultado
+
+
+def parse_listas(textos):
+    # Versão em bloco: converte uma coluna inteira de uma vez
+    return [parse_lista(texto) for texto in textos]
+
+
+def _desescapar(titulo):
+    # Títulos com escapes vindos do repr do Python (ex.: \' , \n ou \xa0)
+    return _ESCAPE.sub(_escape, titulo)
+
+
+def _escape(m):
+    codigo = m.group(1)
+    if len(codigo) > 1:
+        return chr(int(codigo[1:], 16))
+    return _ESCAPES.get(codigo, m.group(0))
+
+
+def _parse_lento(texto):
+    try:
+        lista = ast.literal_eval(texto)
+        return lista if isinstance(lista, list) else []
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return []
@@ -1,17 +1,27 @@
 """
 Localização e reprodução de ficheiros áudio.
-Usa getAudioPath(track_id) para construir caminhos,
-load_musicas() para obter metadados,
+Usa getAudioFile(track_id) para construir caminhos,
+o manifesto de data/songs (manifestoAudio) para saber que músicas têm áudio,
+o catálogo partilhado (crud.obter_catalogo) para obter metadados,
 e pygame para reprodução de áudio.
+
+O pygame só é importado quando o player é usado pela primeira vez
+(cada função faz o import localmente; depois disso o import é imediato).
+
+Também há uma fila de reprodução (as músicas de um álbum ou de uma pesquisa):
+uma thread em segundo plano lê para memória o ficheiro da música seguinte
+enquanto a atual toca e, quando esta acaba, começa logo a seguinte.
 """
 
+import io
 import os
+import threading
 os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"  
 # Esta linha serve apenas para esconder a mensagem chata do pygame quando inicia.
 
-import pygame
 import crud
-from BaseDados.getAudioPath import getAudioPath
+from BaseDados.getAudioPath import getAudioFile
+from BaseDados.manifestoAudio import tem_audio
 
 
 def encontrar_caminho_musica(titulo_track, titulo_album=None):
@@ -20,29 +30,22 @@ def encontrar_caminho_musica(titulo_track, titulo_album=None):
     Se for passado também o título do álbum, filtra ainda mais a pesquisa.
     """
 
-    # Carregamos todas as músicas já processadas pelo sistema.
-    musicas = crud.load_musicas()
-
-    encontrou_no_csv = False  # Flag para sabermos se a música existe nos dados.
+    # O catálogo já carregado tem um índice título (case-insensitive) -> track_ids,
+    # por isso não percorremos as músicas todas a cada pesquisa.
+    ids = crud.obter_catalogo().procurar_musicas(titulo_track, titulo_album)
 
-    # Percorremos todas as músicas à procura de uma correspondência.
-    for m in musicas:
+    encontrou_no_csv = bool(ids)  # Flag para sabermos se a música existe nos dados.
 
-        # Comparação case-insensitive do título da música.
-        if m["track_title"].strip().lower() == titulo_track.strip().lower():
+    for track_id in ids:
 
-            # Se o utilizador indicou álbum, também verificamos isso.
-            if not titulo_album or m["album_title"].strip().lower() == titulo_album.strip().lower():
+        # Construímos o caminho (com a extensão) usando o track_id.
+        caminho = getAudioFile(track_id)
 
-                # Construímos o caminho usando o track_id e adicionamos a extensão .mp3.
-                caminho = getAudioPath(m["track_id"]) + ".mp3"
-                encontrou_no_csv = True
-
-                # Verificamos se o ficheiro existe mesmo no disco.
-                if os.path.exists(caminho):
-                    return caminho
-                else:
-                    print("Esta música não está adicionada.")
+        # Verificamos se o ficheiro existe mesmo no disco (pelo manifesto, sem um stat por música).
+        if tem_audio(track_id):
+            return caminho
+        else:
+            print("Esta música não está adicionada.")
 
     # Se nunca encontrámos a música no CSV, avisamos o utilizador.
     if not encontrou_no_csv:
@@ -53,12 +56,15 @@ def encontrar_caminho_musica(titulo_track, titulo_album=None):
 
 def init_audio():
     # Inicializa o mixer do pygame apenas se ainda não estiver inicializado.
+    import pygame
     if not pygame.mixer.get_init():
         pygame.mixer.init()
 
 
 def play_music(path):
-    # Carrega e toca a música indicada pelo caminho.
+    # Carrega e toca a música indicada pelo caminho (fora da fila de reprodução).
+    import pygame
+    _fila.parar()
     try:
         pygame.mixer.music.load(path)
         pygame.mixer.music.play()
@@ -68,6 +74,8 @@ def play_music(path):
 
 def pause_music():
     # Pausa a música atual.
+    import pygame
+    _fila.pausar()
     try:
         pygame.mixer.music.pause()
     except:
@@ -76,6 +84,8 @@ def pause_music():
 
 def resume_music():
     # Retoma a música pausada.
+    import pygame
+    _fila.retomar()
     try:
         pygame.mixer.music.unpause()
     except:
@@ -83,7 +93,9 @@ def resume_music():
 
 
 def stop_music():
-    # Para completamente a reprodução.
+    # Para completamente a reprodução (e a fila, se estiver a tocar).
+    import pygame
+    _fila.parar()
     try:
         pygame.mixer.music.stop()
     except:
@@ -92,4 +104,258 @@ def stop_music():
 
 def is_playing():
     # Retorna True se alguma música estiver a tocar.
-    return pygame.mixer.music.get_busy()
\ No newline at end of file
+    import pygame
+    return pygame.mixer.music.get_busy()
+
+
+# ====================== FILA DE REPRODUÇÃO ======================
+
+# De quanto em quanto tempo (segundos) a thread da fila verifica se a música acabou
+INTERVALO_FILA = 0.05
+
+
+def _ler_audio(track_id):
+    """Conteúdo do ficheiro de áudio de uma música (bytes), ou None se não existir."""
+    try:
+        with open(getAudioFile(track_id), "rb") as ficheiro:
+            return ficheiro.read()
+    except OSError:
+        return None
+
+
+class FilaReproducao:
+    """
+    Fila de músicas (track_ids) tocadas uma a seguir à outra.
+
+    Uma thread em segundo plano lê antecipadamente para memória o ficheiro da
+    música seguinte e, quando a atual acaba, carrega-a a partir da memória
+    (sem esperar pelo disco), por isso a passagem é quase imediata.
+    Só ficam em memória os ficheiros da música atual e da seguinte.
+    """
+
+    def __init__(self):
+        self.track_ids = []
+        self.posicao = -1
+        self.ativa = False    # True enquanto a fila controla o player
+        self.pausada = False
+        self._dados = {}      # track_id -> bytes (música atual e seguinte)
+        self._condicao = threading.Condition()
+        self._thread = None
+
+    # ---------------------- controlo (menu) ----------------------
+
+    def definir(self, track_ids):
+        """Substitui a fila e começa a tocar a primeira música."""
+        with self._condicao:
+            self.track_ids = list(track_ids)
+            self._dados.clear()
+            self.posicao = -1
+            self.ativa = False
+            if not self.track_ids:
+                return False
+
+            self._iniciar_thread()
+            return self._tocar_a_partir(0, 1)
+
+    def seguinte(self):
+        with self._condicao:
+            if self.posicao + 1 >= len(self.track_ids):
+                print("Não há mais músicas na fila.")
+                return False
+            return self._tocar_a_partir(self.posicao + 1, 1)
+
+    def anterior(self):
+        with self._condicao:
+            if self.posicao <= 0:
+                print("Já está na primeira música da fila.")
+                return False
+            return self._tocar_a_partir(self.posicao - 1, -1)
+
+    def pausar(self):
+        with self._condicao:
+            self.pausada = True
+
+    def retomar(self):
+        with self._condicao:
+            self.pausada = False
+            self._condicao.notify()
+
+    def parar(self):
+        with self._condicao:
+            self.ativa = False
+            self.pausada = False
+            self._dados.clear()
+
+    def estado(self):
+        """(posição começada em 1, total, track_id atual) ou None se a fila estiver vazia."""
+        with self._condicao:
+            if not self.track_ids or self.posicao < 0:
+                return None
+            return self.posicao + 1, len(self.track_ids), self.track_ids[self.posicao]
+
+    # ---------------------- internos ----------------------
+
+    def _tocar_a_partir(self, posicao, passo):
+        """
+        Toca a música em `posicao` (chamado com a condição adquirida).
+        Se o ficheiro não puder ser lido, avança no sentido de `passo`.
+        """
+        import pygame
+
+        while 0 <= posicao < len(self.track_ids):
+            track_id = self.track_ids[posicao]
+            dados = self._dados.get(track_id)
+            if dados is None:
+                dados = _ler_audio(track_id)
+
+            if dados is not None:
+                try:
+                    # O pygame lê o ficheiro a partir da memória à medida que toca
+                    pygame.mixer.music.load(io.BytesIO(dados), "mp3")
+                    pygame.mixer.music.play()
+                except pygame.error:
+                    dados = None
+
+            if dados is not None:
+                self.posicao = posicao
+                self.ativa = True
+                self.pausada = False
+                self._dados = {track_id: dados}
+                self._condicao.notify()  # a thread pode já ler a seguinte
+                return True
+
+            print(f"Não foi possível tocar a música {track_id}.")
+            posicao += passo
+
+        self.ativa = False
+        return False
+
+    def _iniciar_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._trabalhar, name="fila-audio", daemon=True)
+            self._thread.start()
+
+    def _trabalhar(self):
+        """Thread em segundo plano: lê a música seguinte e avança quando a atual acaba."""
+        import pygame
+
+        while True:
+            with self._condicao:
+                while not self.ativa:
+                    self._condicao.wait()
+
+                seguinte = None
+                if self.posicao + 1 < len(self.track_ids):
+                    seguinte = self.track_ids[self.posicao + 1]
+                    if seguinte in self._dados:
+                        seguinte = None
+
+            # A leitura do disco é feita sem bloquear o menu
+            if seguinte is not None:
+                dados = _ler_audio(seguinte)
+                with self._condicao:
+                    proxima = self.posicao + 1
+                    if dados is not None and proxima < len(self.track_ids) and self.track_ids[proxima] == seguinte:
+                        self._dados[seguinte] = dados
+
+            with self._condicao:
+                if self.ativa and not self.pausada and not pygame.mixer.music.get_busy():
+                    # A música atual acabou: passa à seguinte (ou termina a fila)
+                    if not self._tocar_a_partir(self.posicao + 1, 1):
+                        self.ativa = False
+                self._condicao.wait(INTERVALO_FILA)
+
+
+_fila = FilaReproducao()
+
+
+def albuns_com_titulo(titulo_album):
+    """[(album_id, artista), ...] dos álbuns com este título (sem distinguir maiúsculas)."""
+    catalogo = crud.obter_catalogo()
+    return [(album_id, catalogo.albuns[album_id].get("artist_name"))
+            for album_id in catalogo.procurar_albuns(titulo_album)]
+
+
+def ids_do_album(titulo_album, album_id=None):
+    """
+    track_ids de um álbum (pelo título, sem distinguir maiúsculas), pela ordem das faixas.
+    Há títulos partilhados por vários álbuns: com `album_id` toca só esse; sem ele,
+    junta as músicas de todos (álbum a álbum, por ordem de album_id).
+    """
+    catalogo = crud.obter_catalogo()
+    albuns = catalogo.procurar_albuns(titulo_album)
+    if album_id is not None:
+        albuns = [a for a in albuns if a == album_id]
+
+    ids = []
+    for album in albuns:
+        faixas = catalogo.musicas_do_album(album)
+        ids.extend(sorted(faixas, key=lambda track_id: _numero_faixa(catalogo.musicas[track_id])))
+    return ids
+
+
+def _numero_faixa(musica):
+    try:
+        return int(musica.get("track_number"))
+    except (TypeError, ValueError):
+        return 0
+
+
+def ids_dos_resultados(resultados):
+    """track_ids dos resultados (do tipo "track") de uma pesquisa no índice."""
+    ids = []
+    for r in resultados:
+        if r.get("doc_type") == "track":
+            try:
+                ids.append(int(r["doc_id"].removeprefix("track_")))
+            except ValueError:
+                continue
+    return ids
+
+
+def tocar_fila(track_ids):
+    """
+    Cria a fila com as músicas que têm áudio e começa a tocar.
+    Devolve quantas ficaram na fila (0 se não foi possível começar a tocar).
+    """
+    import pygame
+    try:
+        init_audio()
+    except pygame.error as e:
+        print(f"Não foi possível iniciar o áudio: {e}")
+        return 0
+
+    com_audio = [track_id for track_id in track_ids if tem_audio(track_id)]
+
+    if len(com_audio) < len(track_ids):
+        print(f"{len(track_ids) - len(com_audio)} música(s) sem ficheiro de áudio ficaram de fora.")
+    if not com_audio:
+        print("Nenhuma música para tocar.")
+        return 0
+
+    if not _fila.definir(com_audio):
+        print("Nenhuma música da fila pôde ser tocada.")
+        return 0
+    return len(_fila.track_ids)
+
+
+def proxima_musica():
+    # Passa à música seguinte da fila.
+    return _fila.seguinte()
+
+
+def musica_anterior():
+    # Volta à música anterior da fila.
+    return _fila.anterior()
+
+
+def estado_fila():
+    """Texto com a posição atual na fila ("3/10: título - álbum")."""
+    estado = _fila.estado()
+    if estado is None:
+        return "A fila está vazia."
+
+    posicao, total, track_id = estado
+    musica = crud.obter_catalogo().musicas.get(track_id) or {}
+    situacao = "" if _fila.ativa else " (parada)"
+    return f"{posicao}/{total}: {musica.get('track_title', track_id)} - {musica.get('album_title', '')}{situacao}"
\ No newline at end of file
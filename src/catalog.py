@@ -0,0 +1,188 @@
+"""
+Repositório em memória do catálogo (autores, álbuns e músicas).
+
+Guarda os registos em dicionários indexados pelo respetivo ID e mantém
+índices secundários para que as operações mais comuns não tenham de
+percorrer o catálogo inteiro:
+- nome do artista (casefold) -> author_id
+- artista -> album_ids
+- título do álbum (casefold) -> album_ids (usado pelo player)
+- album_id -> track_ids
+- artista -> track_ids (usado na remoção em cascata)
+- título da música (casefold) -> track_ids (usado pelo player)
+"""
+
+
+def chave_nome(nome) -> str:
+    """Normaliza um nome para comparação (ignora maiúsculas e espaços nas pontas)."""
+    return str(nome or '').strip().casefold()
+
+
+class Catalogo:
+    """
+    Catálogo indexado.
+    Os dicionários `autores`, `albuns` e `musicas` têm o mesmo formato
+    devolvido por `crud.load_autores`, `crud.load_albuns` e `crud.load_musicas`.
+    Todas as alterações devem passar pelos métodos desta classe para
+    manter os índices coerentes.
+    """
+
+    def __init__(self, autores=None, albuns=None, musicas=None):
+        # Os dicionários recebidos são usados diretamente (não são copiados),
+        # tal como o resto da aplicação faz com os devolvidos por `load_*`.
+        self.autores = autores if autores is not None else {}
+        self.albuns = albuns if albuns is not None else {}
+        self.musicas = {}
+
+        # Índices secundários
+        self._autores_por_nome = {}     # nome -> [author_id, ...] (ordem de inserção)
+        self._albuns_por_artista = {}   # nome -> {album_id, ...}
+        self._albuns_por_titulo = {}    # título -> {album_id, ...}
+        self._musicas_por_album = {}    # album_id -> {track_id, ...}
+        self._musicas_por_artista = {}  # nome -> {track_id, ...}
+        self._musicas_por_titulo = {}   # título -> {track_id, ...}
+
+        for author_id, dados in self.autores.items():
+            self._autores_por_nome.setdefault(chave_nome(dados.get('artist_name')), []).append(author_id)
+
+        for album_id, dados in self.albuns.items():
+            self._albuns_por_artista.setdefault(chave_nome(dados.get('artist_name')), set()).add(album_id)
+            self._albuns_por_titulo.setdefault(chave_nome(dados.get('album_title')), set()).add(album_id)
+
+        # As músicas podem vir como lista de linhas (load_musicas) ou já como dicionário
+        if isinstance(musicas, dict):
+            musicas = musicas.values()
+        for musica in musicas or []:
+            self.adicionar_musica(musica)
+
+    # ====================== AUTORES ======================
+
+    def adicionar_autor(self, author_id, dados):
+        """Insere (ou substitui) um autor e atualiza o índice por nome."""
+        if author_id in self.autores:
+            self.remover_autor(author_id)
+
+        self.autores[author_id] = dados
+        self._autores_por_nome.setdefault(chave_nome(dados.get('artist_name')), []).append(author_id)
+
+    def remover_autor(self, author_id):
+        """Remove um autor (sem cascata). Devolve os dados removidos ou None."""
+        dados = self.autores.pop(author_id, None)
+        if dados is None:
+            return None
+
+        chave = chave_nome(dados.get('artist_name'))
+        ids = self._autores_por_nome.get(chave, [])
+        if author_id in ids:
+            ids.remove(author_id)
+        if not ids:
+            self._autores_por_nome.pop(chave, None)
+
+        return dados
+
+    def procurar_autor(self, nome):
+        """Devolve o author_id do autor com este nome, ou None se não existir."""
+        ids = self._autores_por_nome.get(chave_nome(nome))
+        return ids[0] if ids else None
+
+    def existe_autor(self, nome) -> bool:
+        return chave_nome(nome) in self._autores_por_nome
+
+    def proximo_id_autor(self) -> int:
+        return max(self.autores.keys(), default=0) + 1
+
+    # ====================== ÁLBUNS ======================
+
+    def adicionar_album(self, album_id, dados):
+        """Insere (ou substitui) um álbum e atualiza os índices por artista e por título."""
+        if album_id in self.albuns:
+            self.remover_album(album_id)
+
+        self.albuns[album_id] = dados
+        self._albuns_por_artista.setdefault(chave_nome(dados.get('artist_name')), set()).add(album_id)
+        self._albuns_por_titulo.setdefault(chave_nome(dados.get('album_title')), set()).add(album_id)
+
+    def remover_album(self, album_id):
+        """Remove um álbum (sem cascata). Devolve os dados removidos ou None."""
+        dados = self.albuns.pop(album_id, None)
+        if dados is None:
+            return None
+
+        _descartar(self._albuns_por_artista, chave_nome(dados.get('artist_name')), album_id)
+        _descartar(self._albuns_por_titulo, chave_nome(dados.get('album_title')), album_id)
+        return dados
+
+    def albuns_do_artista(self, nome):
+        """IDs dos álbuns de um artista (por ordem crescente)."""
+        return sorted(self._albuns_por_artista.get(chave_nome(nome), ()))
+
+    def procurar_albuns(self, titulo):
+        """IDs dos álbuns com este título (por ordem crescente); o mesmo título pode ter vários álbuns."""
+        return sorted(self._albuns_por_titulo.get(chave_nome(titulo), ()))
+
+    # ====================== MÚSICAS ======================
+
+    def adicionar_musica(self, musica):
+        """Insere (ou substitui) uma música, identificada pelo seu track_id."""
+        track_id = int(musica['track_id'])
+        if track_id in self.musicas:
+            self.remover_musica(track_id)
+
+        self.musicas[track_id] = musica
+        self._musicas_por_album.setdefault(_id_album(musica), set()).add(track_id)
+        self._musicas_por_artista.setdefault(chave_nome(musica.get('artist_name')), set()).add(track_id)
+        self._musicas_por_titulo.setdefault(chave_nome(musica.get('track_title')), set()).add(track_id)
+
+    def remover_musica(self, track_id):
+        """Remove uma música. Devolve a linha removida ou None."""
+        musica = self.musicas.pop(track_id, None)
+        if musica is None:
+            return None
+
+        _descartar(self._musicas_por_album, _id_album(musica), track_id)
+        _descartar(self._musicas_por_artista, chave_nome(musica.get('artist_name')), track_id)
+        _descartar(self._musicas_por_titulo, chave_nome(musica.get('track_title')), track_id)
+        return musica
+
+    def musicas_do_album(self, album_id):
+        """IDs das músicas de um álbum (por ordem crescente)."""
+        return sorted(self._musicas_por_album.get(album_id, ()))
+
+    def musicas_do_artista(self, nome):
+        """IDs das músicas de um artista (por ordem crescente)."""
+        return sorted(self._musicas_por_artista.get(chave_nome(nome), ()))
+
+    def procurar_musicas(self, titulo, titulo_album=None):
+        """
+        IDs das músicas com este título (por ordem crescente), sem percorrer o catálogo.
+        Com `titulo_album`, fica só com as desse álbum.
+        """
+        ids = sorted(self._musicas_por_titulo.get(chave_nome(titulo), ()))
+        if titulo_album:
+            album = chave_nome(titulo_album)
+            ids = [track_id for track_id in ids if chave_nome(self.musicas[track_id].get('album_title')) == album]
+        return ids
+
+    def lista_musicas(self):
+        """Músicas como lista de linhas (por track_id), no formato esperado por `crud.save_musicas`."""
+        return [self.musicas[track_id] for track_id in sorted(self.musicas)]
+
+
+# ====================== FUNÇÕES AUXILIARES ======================
+
+def _descartar(indice, chave, valor):
+    """Retira `valor` do conjunto `indice[chave]`, apagando a chave se ficar vazia."""
+    conjunto = indice.get(chave)
+    if conjunto is None:
+        return
+    conjunto.discard(valor)
+    if not conjunto:
+        del indice[chave]
+
+
+def _id_album(musica):
+    """album_id de uma linha de músicas como inteiro (ou None se for inválido)."""
+    try:
+        return int(musica.get('album_id'))
+    except (TypeError, ValueError):
+        return None
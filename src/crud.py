@@ -2,18 +2,34 @@
 Operações de I/O para os ficheiros CSV autores, álbuns e músicas.
 Implementa carregamento, escrita e operações CRUD com snapshots.
 Validação dos dados é feita por `BaseDados.dataSchema`.
+
+Opcionalmente (ver `usar_sqlite`) os dados podem ser guardados numa base de
+dados SQLite, com as mesmas funções load_*/save_*; nesse caso cada operação
+CRUD grava só as linhas alteradas, numa única transação.
 """
 
 import csv
-import ast
+import copy
+import os
 from pathlib import Path
-import pandas as pd
-from history import salvar_snapshot
+from history import salvar_delta
 from BaseDados import dataSchema as dS  # Usamos os schemas de validação
-from searchEngine import build_unified_index
+from searchEngine import (
+    atualizar_indice,
+    documento_autor,
+    documento_album,
+    documento_musica,
+    doc_id_autor,
+    doc_id_album,
+    doc_id_musica,
+)
+from catalog import Catalogo
+from registos import Autor, Album, Musica
+from BaseDados.parseListas import parse_lista
+import sqliteBackend
 
 # Este módulo é responsável por toda a leitura e escrita dos CSV.
-# Também faz operações CRUD e cria snapshots antes de qualquer alteração.
+# Também faz operações CRUD e regista no histórico as linhas alteradas por cada uma.
 
 
 # Caminhos dos ficheiros CSV usados pela aplicação
@@ -57,19 +73,81 @@ TRACKS_HEADER = [
     'track_price',
 ]
 
-# Estruturas em memória onde guardamos os dados carregados
-autores = {}
-albuns = {}
+# Armazenamento em uso: "csv" (por omissão) ou "sqlite" (ver usar_sqlite)
+BACKEND = "csv"
+
+# Catálogo partilhado pela aplicação (ver obter_catalogo)
+_catalogo = None
+
+# ====================== CACHE DOS DADOS LIDOS ======================
+# Cada tabela lida fica em cache juntamente com a "assinatura" da sua origem:
+#   - identidade do ficheiro (inode, tamanho, mtime), que apanha alterações
+#     feitas fora destas funções (ex.: snapshot reposto, CSV editado à mão);
+#   - geração de escrita da tabela, incrementada por cada gravação feita pela
+#     aplicação (save_* e deltas), mesmo que o mtime não chegue a mudar.
+# Enquanto a assinatura for a mesma, load_* devolve as estruturas já convertidas.
+
+_geracoes = {"autores": 0, "albuns": 0, "musicas": 0}
+_cache = {}  # tabela -> (assinatura, dados)
+
+
+def _identidade(caminho):
+    """(inode, tamanho, mtime) de um ficheiro, ou None se não existir."""
+    try:
+        st = os.stat(caminho)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _assinatura(tabela):
+    """Assinatura atual da origem de uma tabela (ver acima)."""
+    if BACKEND == "sqlite":
+        db = sqliteBackend.DB_FILE
+        origem = (str(db), _identidade(db), _identidade(f"{db}-wal"))
+    else:
+        caminho = {"autores": AUTHORS_FILE, "albuns": ALBUMS_FILE, "musicas": TRACKS_FILE}[tabela]
+        origem = (str(caminho), _identidade(caminho))
+    return (BACKEND, _geracoes[tabela], origem)
+
+
+def _ler_com_cache(tabela, ler):
+    """Devolve os dados da tabela em cache se a origem não mudou; caso contrário lê com `ler()`."""
+    assinatura = _assinatura(tabela)
+    guardado = _cache.get(tabela)
+    if guardado is not None and guardado[0] == assinatura:
+        return guardado[1]
+
+    dados = ler()
+    _cache[tabela] = (assinatura, dados)
+    return dados
+
+
+def invalidar_cache(*tabelas):
+    """Marca as tabelas indicadas (por omissão, todas) como alteradas: a próxima leitura volta à origem."""
+    for tabela in tabelas or _geracoes:
+        _geracoes[tabela] += 1
+        _cache.pop(tabela, None)
+
 
 # ====================== CARREGAMENTO SEGURO ======================
 
 def load_autores():
+    """Carrega os autores do armazenamento em uso (CSV ou SQLite), com cache."""
+    if BACKEND == "sqlite":
+        return _ler_com_cache("autores", sqliteBackend.load_autores)
+    return _ler_com_cache("autores", _load_autores_csv)
+
+
+def _load_autores_csv():
     """
     Carrega os autores do CSV para um dicionário.
     Converte o campo 'album_title' de string para lista.
     Linhas inválidas são ignoradas para evitar crashes.
     """
 
+    autores = {}
+
     if not AUTHORS_FILE.exists():
         return autores
 
@@ -81,26 +159,20 @@ def load_autores():
                 # ID do autor tem de ser inteiro
                 author_id = int(author['author_id'])
 
-                # album_title vem como string, tentamos convertê-lo para lista
-                album_str = author.get('album_title', [])
-                try:
-                    albums_list = ast.literal_eval(album_str)
-                    if not isinstance(albums_list, list):
-                        albums_list = []
-                except (ValueError, SyntaxError):
-                    # Se a string estiver mal formatada, tratamos como lista vazia
-                    albums_list = []
+                # album_title vem como string, convertemos para lista
+                # (se estiver mal formatada, fica uma lista vazia)
+                albums_list = parse_lista(author.get('album_title'))
 
                 author['album_title'] = albums_list
 
                 # Construímos o dicionário final do autor
-                data = {
-                    'artist_name': author['artist_name'].strip(),
-                    'artist_nacionality': author['artist_nacionality'].strip(),
-                    'album_title': albums_list,
-                    'rights_percentage': float(author.get('rights_percentage', 0)),
-                    'total_earned': float(author.get('total_earned', 0.0))
-                }
+                data = Autor(
+                    artist_name=author['artist_name'].strip(),
+                    artist_nacionality=author['artist_nacionality'].strip(),
+                    album_title=albums_list,
+                    rights_percentage=float(author.get('rights_percentage', 0)),
+                    total_earned=float(author.get('total_earned', 0.0)),
+                )
 
                 autores[author_id] = data
 
@@ -112,12 +184,21 @@ def load_autores():
 
 
 def load_albuns():
+    """Carrega os álbuns do armazenamento em uso (CSV ou SQLite), com cache."""
+    if BACKEND == "sqlite":
+        return _ler_com_cache("albuns", sqliteBackend.load_albuns)
+    return _ler_com_cache("albuns", _load_albuns_csv)
+
+
+def _load_albuns_csv():
     """
     Carrega os álbuns do CSV.
     Converte o campo 'tracks' de string para lista.
     Linhas inválidas são ignoradas.
     """
 
+    albuns = {}
+
     if not ALBUMS_FILE.exists():
         return albuns
 
@@ -129,25 +210,20 @@ def load_albuns():
                 album_id = int(album['album_id'])
 
                 # Conversão do campo tracks
-                try:
-                    tracks_list = ast.literal_eval(album['tracks'])
-                    if not isinstance(tracks_list, list):
-                        tracks_list = []
-                except (ValueError, SyntaxError):
-                    tracks_list = []
+                tracks_list = parse_lista(album['tracks'])
 
                 album['tracks'] = tracks_list
 
                 # Construção do dicionário final
-                data = {
-                    'album_title': (album.get('album_title') or '').strip(),
-                    'artist_name': (album.get('artist_name') or '').strip(),
-                    'album_genere': (album.get('album_genere') or '').strip(),
-                    'album_date': (album.get('album_date') or '').strip(),
-                    'unites_sold': int(album.get('unites_sold') or 0),
-                    'album_price': float(album.get('album_price') or 0.0),
-                    'tracks': tracks_list
-                }
+                data = Album(
+                    album_title=(album.get('album_title') or '').strip(),
+                    artist_name=(album.get('artist_name') or '').strip(),
+                    album_genere=(album.get('album_genere') or '').strip(),
+                    album_date=(album.get('album_date') or '').strip(),
+                    unites_sold=int(album.get('unites_sold') or 0),
+                    album_price=float(album.get('album_price') or 0.0),
+                    tracks=tracks_list,
+                )
 
                 albuns[album_id] = data
 
@@ -158,25 +234,203 @@ def load_albuns():
 
 
 def load_musicas():
+    """Carrega as músicas do armazenamento em uso (CSV ou SQLite), com cache."""
+    if BACKEND == "sqlite":
+        return _ler_com_cache("musicas", sqliteBackend.load_musicas)
+    return _ler_com_cache("musicas", _load_musicas_csv)
+
+
+def _load_musicas_csv():
     """
-    Carrega as músicas usando pandas.
-    Retorna uma lista de dicionários.
+    Carrega as músicas do CSV numa única passagem com o módulo csv.
+    Retorna uma lista de registos `Musica` com as mesmas chaves e valores que
+    o pandas dava: colunas repetidas ficam "<coluna>.1" e as colunas numéricas
+    são convertidas.
     """
     if not TRACKS_FILE.exists():
         return []
 
-    df = pd.read_csv(TRACKS_FILE, encoding="utf-8-sig", keep_default_na=False)
-    return df.to_dict(orient="records")
+    with open(TRACKS_FILE, "r", encoding="utf-8-sig", newline='') as tracks_file:
+        reader = csv.reader(tracks_file)
+        cabecalho = _nomes_unicos(next(reader, []))
+        n = len(cabecalho)
+
+        # Linhas com colunas a menos são completadas com '' (colunas a mais são ignoradas)
+        linhas = [linha[:n] + [''] * (n - len(linha)) for linha in reader if linha]
+
+    if not linhas:
+        return []
+
+    colunas = [_converter_coluna(valores) for valores in zip(*linhas)]
+    return [Musica(zip(cabecalho, valores)) for valores in zip(*colunas)]
+
+
+def _nomes_unicos(cabecalho):
+    """Nomes das colunas sem repetições: a segunda "x" passa a "x.1", a terceira a "x.2", ..."""
+    vistos = {}
+    nomes = []
+    for nome in cabecalho:
+        if nome in vistos:
+            vistos[nome] += 1
+            nome = f"{nome}.{vistos[nome]}"
+        else:
+            vistos[nome] = 0
+        nomes.append(nome)
+    return nomes
+
+
+def _converter_coluna(valores):
+    """Converte uma coluna inteira para int ou float se todos os valores o permitirem."""
+    for tipo in (int, float):
+        try:
+            return [tipo(valor) for valor in valores]
+        except ValueError:
+            continue
+    return list(valores)
+
+
+# ====================== LEITURA POR COLUNAS (pandas) ======================
+# Para quem só precisa de algumas colunas das músicas (ex.: track_id e
+# track_title), sem construir um registo por linha: lê-se só o que é pedido,
+# já com tipos próprios, de uma vez ou em blocos de tamanho fixo.
+# As colunas repetidas do CSV têm os mesmos nomes que em load_musicas
+# ("artist_nacionality.1", "track_price.1").
+
+# Tipos das colunas depois da leitura. Inteiros e preços usam os tipos com
+# valores em falta (Int64/Float64): valores inválidos ficam <NA>.
+# Género e nacionalidade repetem poucos valores em milhares de linhas, por
+# isso ficam como category. As restantes colunas são texto.
+TRACKS_DTYPES = {
+    'track_id': 'Int64',
+    'album_id': 'Int64',
+    'artist_id': 'Int64',
+    'track_interest': 'Int64',
+    'track_number': 'Int64',
+    'track_price': 'Float64',
+    'track_price.1': 'Float64',
+    'track_genres': 'category',
+    'artist_nacionality': 'category',
+    'artist_nacionality.1': 'category',
+}
+
+
+def ler_musicas_colunas(colunas=None, tamanho_bloco=None):
+    """
+    Lê as músicas com pandas, só com as `colunas` pedidas (por omissão, todas)
+    e com os tipos de TRACKS_DTYPES.
+
+    Sem `tamanho_bloco` devolve um DataFrame. Com `tamanho_bloco` devolve um
+    iterador de DataFrames com no máximo esse número de linhas, para percorrer
+    ficheiros grandes sem os ter todos em memória.
+    """
+    import pandas as pd
+
+    if BACKEND == "sqlite":
+        # As músicas estão na base de dados (e em cache): projetamos os registos já lidos
+        frame = pd.DataFrame.from_records((dict(m) for m in load_musicas()), columns=colunas)
+        frame = _tipar_musicas(frame.where(frame != ''), colunas)  # células vazias = em falta, como no CSV
+        if tamanho_bloco is None:
+            return frame
+        return (frame.iloc[i:i + tamanho_bloco] for i in range(0, len(frame), tamanho_bloco))
+
+    if not TRACKS_FILE.exists():
+        frame = pd.DataFrame(columns=colunas if colunas is not None else TRACKS_HEADER)
+        return frame if tamanho_bloco is None else iter([frame])
+
+    # Colunas category são lidas logo como category; as numéricas são lidas pelo
+    # parser do pandas e convertidas depois (ver _tipar_musicas).
+    leitura = pd.read_csv(
+        TRACKS_FILE,
+        encoding="utf-8-sig",
+        usecols=colunas,
+        keep_default_na=False,
+        na_values=[''],  # só as células vazias são valores em falta (há títulos como "NaN")
+        dtype={coluna: tipo for coluna, tipo in TRACKS_DTYPES.items() if tipo == 'category'},
+        chunksize=tamanho_bloco,
+    )
+
+    if tamanho_bloco is None:
+        return _tipar_musicas(leitura, colunas)
+    return (_tipar_musicas(bloco, colunas) for bloco in leitura)
+
+
+def _tipar_musicas(frame, colunas=None):
+    """Converte as colunas numéricas para Int64/Float64 e põe as colunas pela ordem pedida."""
+    import pandas as pd
+
+    for coluna, tipo in TRACKS_DTYPES.items():
+        if coluna not in frame.columns:
+            continue
+        if tipo == 'category':
+            if frame[coluna].dtype != 'category':
+                frame[coluna] = frame[coluna].astype('category')
+            continue
+
+        valores = frame[coluna]
+        if not pd.api.types.is_numeric_dtype(valores):
+            valores = pd.to_numeric(valores, errors='coerce')
+        if tipo == 'Int64':
+            # Valores com casas decimais não são inteiros válidos
+            valores = valores.where(valores.isna() | (valores % 1 == 0))
+        frame[coluna] = valores.astype(tipo)
+
+    # O usecols do pandas devolve as colunas pela ordem do ficheiro
+    if colunas is not None:
+        frame = frame[list(colunas)]
+    return frame
+
+
+def load_catalogo(autores=True, albuns=True, musicas=True):
+    """
+    Carrega os dados pedidos para um `Catalogo` indexado.
+    Permite carregar só o necessário (ex.: só autores para adicionar um autor).
+    """
+    return Catalogo(
+        load_autores() if autores else None,
+        load_albuns() if albuns else None,
+        load_musicas() if musicas else None,
+    )
+
+
+def obter_catalogo():
+    """
+    Catálogo completo, lido uma única vez (no arranque) e partilhado por toda a
+    aplicação: índice de pesquisa, listagens, relatórios, áudio e operações CRUD.
+    As operações CRUD alteram-no diretamente, por isso fica coerente com o que
+    foi gravado sem ser preciso voltar a ler os ficheiros.
+    """
+    global _catalogo
+
+    if _catalogo is None:
+        _catalogo = load_catalogo()
+    return _catalogo
+
+
+def descartar_catalogo():
+    """Esquece o catálogo partilhado (ex.: depois de repor os ficheiros); o próximo acesso volta a ler os dados."""
+    global _catalogo
+    _catalogo = None
 
 
 # ====================== GRAVAÇÃO SEGURA ======================
 
 def save_autores(autores):
-    """Grava os autores no CSV, sobrescrevendo o ficheiro."""
+    """Grava os autores no armazenamento em uso, substituindo os existentes."""
     if not autores:
         print("Não existem autores para Salvar")
         return
 
+    if BACKEND == "sqlite":
+        sqliteBackend.save_autores(autores)
+    else:
+        _save_autores_csv(autores)
+
+    invalidar_cache("autores")
+    print("Autores salvos com sucesso")
+
+
+def _save_autores_csv(autores):
+    """Grava os autores no CSV, sobrescrevendo o ficheiro."""
     with open(AUTHORS_FILE, "w", encoding="utf-8-sig", newline='') as authors_file:
         writer = csv.DictWriter(authors_file, fieldnames=AUTHORS_HEADER)
         writer.writeheader()
@@ -191,15 +445,24 @@ def save_autores(autores):
                 'total_earned': data['total_earned'],
             })
 
-    print("Autores salvos com sucesso")
-
 
 def save_albuns(albuns):
-    """Grava os álbuns no CSV."""
+    """Grava os álbuns no armazenamento em uso."""
     if not albuns:
         print('Não existem albuns para salvar')
         return
 
+    if BACKEND == "sqlite":
+        sqliteBackend.save_albuns(albuns)
+    else:
+        _save_albuns_csv(albuns)
+
+    invalidar_cache("albuns")
+    print("Álbuns salvos com sucesso")
+
+
+def _save_albuns_csv(albuns):
+    """Grava os álbuns no CSV."""
     with open(ALBUMS_FILE, "w", encoding="utf-8-sig", newline='') as albums_file:
         writer = csv.DictWriter(albums_file, fieldnames=ALBUMS_HEADER)
         writer.writeheader()
@@ -216,18 +479,216 @@ def save_albuns(albuns):
                 'tracks': str(data['tracks']),
             })
 
-    print("Álbuns salvos com sucesso")
-
 
 def save_musicas(musicas):
-    """Grava músicas no CSV usando pandas."""
+    """Grava as músicas no armazenamento em uso."""
     if not musicas:
         print('Não existem músicas para salvar')
         return
 
+    if BACKEND == "sqlite":
+        sqliteBackend.save_musicas(musicas)
+    else:
+        _save_musicas_csv(musicas)
+
+    invalidar_cache("musicas")
+    print("Músicas salvas com sucesso")
+
+
+def _save_musicas_csv(musicas):
+    """Grava músicas no CSV usando pandas."""
+    import pandas as pd  # import local: o pandas só é preciso para gravar as músicas
+
     df = pd.DataFrame(musicas)
     df.to_csv(TRACKS_FILE, index=False, encoding="utf-8-sig")
-    print("Músicas salvas com sucesso")
+
+
+def _acrescentar_musicas_csv(musicas):
+    """Acrescenta músicas novas ao fim do CSV (pela ordem das colunas do ficheiro), sem o reescrever."""
+    with open(TRACKS_FILE, "r", encoding="utf-8-sig", newline='') as tracks_file:
+        cabecalho = _nomes_unicos(next(csv.reader(tracks_file), []))
+
+    with open(TRACKS_FILE, "rb") as tracks_file:
+        tracks_file.seek(0, os.SEEK_END)
+        termina_em_linha = tracks_file.tell() == 0
+        if not termina_em_linha:
+            tracks_file.seek(-1, os.SEEK_END)
+            termina_em_linha = tracks_file.read(1) in (b"\n", b"\r")
+
+    with open(TRACKS_FILE, "a", encoding="utf-8", newline='') as tracks_file:
+        if not termina_em_linha:
+            tracks_file.write("\n")
+        writer = csv.writer(tracks_file, lineterminator="\n")
+        for musica in musicas:
+            writer.writerow([musica.get(coluna, '') for coluna in cabecalho])
+
+    invalidar_cache("musicas")
+    print("Músicas acrescentadas com sucesso")
+
+
+# ====================== SQLITE (OPCIONAL) ======================
+
+def usar_sqlite(db_file=None):
+    """
+    Passa a usar a base de dados SQLite como armazenamento.
+    Se a base de dados ainda estiver vazia, importa primeiro os CSV atuais.
+    """
+    global BACKEND
+
+    if db_file is not None:
+        sqliteBackend.fechar()
+        sqliteBackend.DB_FILE = Path(db_file)
+
+    BACKEND = "sqlite"
+    descartar_catalogo()
+
+    if not sqliteBackend.tem_dados():
+        importar_csv()
+
+
+def origem_dados():
+    """
+    Identifica a origem atual dos dados (guardada no manifesto do índice de pesquisa):
+    {"backend": "csv"} ou, com SQLite, o ficheiro da base de dados, o seu
+    identificador e a geração dos dados (muda em cada gravação).
+    """
+    if BACKEND == "sqlite":
+        return {"backend": "sqlite", "db": str(Path(sqliteBackend.DB_FILE).resolve()), **sqliteBackend.versao_dados()}
+    return {"backend": "csv"}
+
+
+def importar_csv():
+    """Importa os CSV para a base de dados SQLite (substitui o conteúdo, numa transação)."""
+    sqliteBackend.substituir_tudo(_load_autores_csv(), _load_albuns_csv(), _load_musicas_csv())
+    invalidar_cache()
+    print("CSV importados para a base de dados")
+
+
+def exportar_csv():
+    """Exporta o conteúdo da base de dados SQLite para os ficheiros CSV."""
+    if BACKEND != "sqlite":
+        print("Os dados já estão guardados nos CSV (a base de dados SQLite não está em uso).")
+        return
+
+    _save_autores_csv(sqliteBackend.load_autores())
+    _save_albuns_csv(sqliteBackend.load_albuns())
+    _save_musicas_csv(sqliteBackend.load_musicas())
+    print("Base de dados exportada para CSV")
+
+
+# ====================== DELTAS ======================
+# Cada ação regista no histórico apenas as linhas que alterou (um "delta"):
+#   {"autores": {author_id: (antes, depois)},
+#    "albuns":  {album_id: (antes, depois)},
+#    "musicas": {track_id: (antes, depois)}}
+# `antes` None = linha inserida; `depois` None = linha apagada.
+# Para desfazer uma ação basta repor o `antes` de cada linha (ver aplicar_linhas).
+
+TABELAS = ("autores", "albuns", "musicas")
+
+
+def _documento_autor(author_id, dados):
+    """Documento de pesquisa de um autor, no mesmo formato da linha gravada no CSV."""
+    return documento_autor({'author_id': author_id, **dados})
+
+
+def _documento_album(album_id, dados):
+    """Documento de pesquisa de um álbum, no mesmo formato da linha gravada no CSV."""
+    return documento_album({'album_id': album_id, **dados})
+
+
+def _documentos_delta(delta):
+    """Documentos a (re)indexar e doc_ids a remover para as linhas de um delta."""
+    construtores = {
+        "autores": (_documento_autor, doc_id_autor),
+        "albuns": (_documento_album, doc_id_album),
+        "musicas": (lambda track_id, dados: documento_musica(dados), doc_id_musica),
+    }
+
+    documentos = []
+    remover = []
+    for tabela, (documento, doc_id) in construtores.items():
+        for chave, (_, depois) in delta.get(tabela, {}).items():
+            if depois is None:
+                remover.append(doc_id(chave))
+            else:
+                documentos.append(documento(chave, depois))
+
+    return documentos, remover
+
+
+def _persistir(catalogo, delta, acrescentar_musicas=False):
+    """
+    Grava as alterações do delta e atualiza no índice de pesquisa só os
+    documentos dessas linhas. Com SQLite grava só as linhas alteradas, numa
+    transação; com CSV reescreve apenas as tabelas tocadas.
+    Com `acrescentar_musicas` (o delta só tem músicas novas) as músicas são
+    acrescentadas ao fim do CSV em vez de o reescrever.
+    """
+    if BACKEND == "sqlite":
+        sqliteBackend.aplicar_delta(delta)
+        invalidar_cache(*(tabela for tabela in TABELAS if delta.get(tabela)))
+        print("Alterações gravadas na base de dados")
+    else:
+        if delta.get("autores"):
+            save_autores(catalogo.autores)
+        if delta.get("albuns"):
+            save_albuns(catalogo.albuns)
+        if delta.get("musicas"):
+            if acrescentar_musicas and TRACKS_FILE.exists():
+                _acrescentar_musicas_csv([depois for _, depois in delta["musicas"].values()])
+            else:
+                save_musicas(catalogo.lista_musicas())
+
+    documentos, remover = _documentos_delta(delta)
+    atualizar_indice(documentos, remover)
+
+
+def _linha_de_json(tabela, dados):
+    """
+    Converte uma linha vinda do histórico (JSON) para o formato em memória:
+    o registo da tabela (Autor, Album ou Musica), com as listas (id, título)
+    de novo como tuplos, como em `load_autores`/`load_albuns`.
+    """
+    registo = {"autores": Autor, "albuns": Album, "musicas": Musica}[tabela](dados)
+
+    campo_lista = {"autores": "album_title", "albuns": "tracks"}.get(tabela)
+    if campo_lista and isinstance(registo.get(campo_lista), list):
+        registo[campo_lista] = [tuple(item) if isinstance(item, list) else item for item in registo[campo_lista]]
+    return registo
+
+
+def aplicar_linhas(linhas):
+    """
+    Repõe um conjunto de linhas, usado pelo histórico para desfazer ações.
+    `linhas` = {tabela: {id: dados ou None}}; None apaga a linha.
+    Só as tabelas envolvidas são gravadas.
+    """
+    catalogo = obter_catalogo()
+    operacoes = {
+        "autores": (catalogo.autores, catalogo.adicionar_autor, catalogo.remover_autor),
+        "albuns": (catalogo.albuns, catalogo.adicionar_album, catalogo.remover_album),
+        "musicas": (catalogo.musicas, lambda chave, dados: catalogo.adicionar_musica(dados), catalogo.remover_musica),
+    }
+
+    delta = {}
+    for tabela, (registos, adicionar, remover) in operacoes.items():
+        for chave, dados in linhas.get(tabela, {}).items():
+            chave = int(chave)
+            antes = registos.get(chave)
+
+            if dados is None:
+                if antes is None:
+                    continue
+                remover(chave)
+            else:
+                dados = _linha_de_json(tabela, dados)
+                adicionar(chave, dados)
+
+            delta.setdefault(tabela, {})[chave] = (antes, dados)
+
+    _persistir(catalogo, delta)
+    return delta
 
 
 # ====================== OPERAÇÕES CRUD ======================
@@ -235,10 +696,10 @@ def save_musicas(musicas):
 def adicionar_autor():
     """
     Adiciona um novo autor ao sistema.
-    Faz validação, cria snapshot e atualiza o índice de pesquisa.
+    Faz validação, regista o delta no histórico e atualiza o índice de pesquisa.
     """
 
-    autores = load_autores()
+    catalogo = obter_catalogo()
 
     nome = input("Nome do autor: ").strip()
     if not nome:
@@ -246,7 +707,7 @@ def adicionar_autor():
         return
 
     # Evita duplicados
-    if any(a['artist_name'].lower() == nome.lower() for a in autores.values()):
+    if catalogo.existe_autor(nome):
         print('Autor já existe')
         return
 
@@ -261,7 +722,7 @@ def adicionar_autor():
         print("Percentagem inválida (0-100).")
         return
 
-    novo_id = max(autores.keys(), default=0) + 1
+    novo_id = catalogo.proximo_id_autor()
 
     novo_autor = {
         "artist_name": nome,
@@ -278,11 +739,12 @@ def adicionar_autor():
         print(f"Validação falhou: {e}")
         return
 
-    autores[novo_id] = novo_autor
+    novo_autor = Autor(novo_autor)
+    catalogo.adicionar_autor(novo_id, novo_autor)
+    delta = {"autores": {novo_id: (None, novo_autor)}}
 
-    salvar_snapshot(f"Adicionado autor '{nome}'")
-    save_autores(autores)
-    build_unified_index()
+    salvar_delta(f"Adicionado autor '{nome}'", delta)
+    _persistir(catalogo, delta)
 
     print("Autor adicionado com sucesso!")
 
@@ -291,11 +753,11 @@ def remover_autor(nome):
     """
     Remove um autor pelo nome.
     Faz cascade delete: remove autor, álbuns e músicas associadas.
-    Cria snapshot e atualiza índice.
+    Regista as linhas removidas no histórico e atualiza índice.
     """
 
-    autores = load_autores()
-    chave = next((k for k, a in autores.items() if a["artist_name"].lower() == nome.lower()), None)
+    catalogo = obter_catalogo()
+    chave = catalogo.procurar_autor(nome)
 
     if not chave:
         print("Autor não encontrado")
@@ -306,52 +768,343 @@ def remover_autor(nome):
         print("Operação cancelada")
         return
 
-    del autores[chave]
+    delta = {"autores": {}, "albuns": {}, "musicas": {}}
+    _remover_autor_em(catalogo, chave, delta)
 
-    # Remoção dos álbuns do autor
-    albuns = load_albuns()
-    albuns_to_remove = {k for k, v in albuns.items() if v['artist_name'].lower() == nome.lower()}
-    for alb_id in albuns_to_remove:
-        del albuns[alb_id]
+    salvar_delta(f"Removido autor '{nome}' (ID {chave}) + álbuns e faixas relacionados", delta)
 
-    # Remoção das músicas do autor
-    musicas = load_musicas()
-    musicas = [m for m in musicas if m['artist_name'].lower() != nome.lower()]
+    # Grava as tabelas e retira do índice só os documentos do autor removido
+    _persistir(catalogo, delta)
 
-    salvar_snapshot(f"Removido autor '{nome}' (ID {chave}) + álbuns e faixas relacionados")
+    print(f"Autor '{nome}' removido com sucesso")
 
-    save_autores(autores)
-    save_albuns(albuns)
-    save_musicas(musicas)
 
-    build_unified_index()
+def _remover_autor_em(catalogo, chave, delta):
+    """Retira do catálogo um autor e os seus álbuns e músicas, registando as linhas removidas no delta."""
+    dados = catalogo.remover_autor(chave)
+    delta["autores"][chave] = (dados, None)
+    nome = dados['artist_name']
 
-    print(f"Autor '{nome}' removido com sucesso")
+    # Remoção dos álbuns do autor
+    for alb_id in catalogo.albuns_do_artista(nome):
+        delta["albuns"][alb_id] = (catalogo.remover_album(alb_id), None)
+
+    # Remoção das músicas do autor
+    for track_id in catalogo.musicas_do_artista(nome):
+        delta["musicas"][track_id] = (catalogo.remover_musica(track_id), None)
 
 
 def atualizar_direitos_autor(nome, nova_percentagem):
     """
     Atualiza a percentagem de direitos de um autor.
-    Valida o intervalo e cria snapshot antes de gravar.
+    Valida o intervalo e regista o delta no histórico antes de gravar.
     """
 
-    autores = load_autores()
-    chave = next((k for k, a in autores.items() if a["artist_name"].lower() == nome.lower()), None)
+    catalogo = obter_catalogo()
+    chave = catalogo.procurar_autor(nome)
 
     if not chave:
         print("Autor não encontrado")
         return
 
+    delta = {"autores": {}}
+    if not _alterar_direitos_em(catalogo, chave, nova_percentagem, delta):
+        print("Percentagem inválida (0-100)")
+        return
+
+    salvar_delta(f"Atualizada percentagem de direitos de '{nome}' para {nova_percentagem}%", delta)
+    _persistir(catalogo, delta)
+
+    print(f"Direitos atualizados para {nova_percentagem}%")
+
+
+def _alterar_direitos_em(catalogo, chave, nova_percentagem, delta):
+    """Altera a percentagem de direitos de um autor no catálogo e regista-a no delta. False se for inválida."""
     try:
         if not 0 <= nova_percentagem <= 100:
             raise ValueError
-        autores[chave]['rights_percentage'] = nova_percentagem
-    except ValueError:
-        print("Percentagem inválida (0-100)")
-        return
+    except (TypeError, ValueError):
+        return False
+
+    # Se o autor já foi alterado neste delta, o "antes" continua a ser o original
+    antes = delta["autores"][chave][0] if chave in delta["autores"] else copy.deepcopy(catalogo.autores[chave])
+    catalogo.autores[chave]['rights_percentage'] = nova_percentagem
+    delta["autores"][chave] = (antes, catalogo.autores[chave])
+    return True
+
+
+# ====================== OPERAÇÕES EM LOTE ======================
+# Variantes das operações acima para muitos autores de uma vez: todas as
+# alterações são feitas no catálogo em memória e no fim há um único snapshot,
+# uma única gravação e uma única atualização do índice.
+
+def _procurar_autor_ref(catalogo, ref):
+    """author_id de um autor indicado pelo nome ou pelo ID (o nome tem prioridade). None se não existir."""
+    chave = catalogo.procurar_autor(ref)
+    if chave is None and str(ref).strip().isdigit() and int(ref) in catalogo.autores:
+        chave = int(ref)
+    return chave
+
+
+def remover_autores(refs, confirmar=True):
+    """
+    Remove vários autores (nomes ou IDs), cada um com os seus álbuns e músicas.
+    Devolve o delta aplicado ({} se nada foi removido).
+    """
+    catalogo = obter_catalogo()
+
+    chaves = []
+    for ref in refs:
+        chave = _procurar_autor_ref(catalogo, ref)
+        if chave is None:
+            print(f"Autor não encontrado: {ref}")
+        elif chave not in chaves:
+            chaves.append(chave)
+
+    if not chaves:
+        print("Nenhum autor para remover")
+        return {}
+
+    if confirmar:
+        confirm = input(f"Confirma remoção de {len(chaves)} autor(es) e respetivos álbuns e faixas (s/n): ").lower()
+        if confirm != 's':
+            print("Operação cancelada")
+            return {}
+
+    delta = {"autores": {}, "albuns": {}, "musicas": {}}
+    for chave in chaves:
+        _remover_autor_em(catalogo, chave, delta)
+
+    salvar_delta(
+        f"Removidos {len(chaves)} autor(es) + {len(delta['albuns'])} álbuns e {len(delta['musicas'])} faixas relacionados",
+        delta,
+    )
+    _persistir(catalogo, delta)
+
+    print(f"{len(chaves)} autor(es) removido(s) com sucesso")
+    return delta
+
+
+def atualizar_direitos_autores(alteracoes):
+    """
+    Atualiza a percentagem de direitos de vários autores.
+    `alteracoes` = {nome ou ID: nova percentagem} (ou uma lista de pares).
+    Entradas inválidas são indicadas e ignoradas. Devolve o delta aplicado.
+    """
+    catalogo = obter_catalogo()
+    if isinstance(alteracoes, dict):
+        alteracoes = alteracoes.items()
+
+    delta = {"autores": {}}
+    for ref, nova_percentagem in alteracoes:
+        chave = _procurar_autor_ref(catalogo, ref)
+        if chave is None:
+            print(f"Autor não encontrado: {ref}")
+        elif not _alterar_direitos_em(catalogo, chave, nova_percentagem, delta):
+            print(f"Percentagem inválida (0-100) para '{ref}': {nova_percentagem}")
+
+    if not delta["autores"]:
+        print("Nenhum direito alterado")
+        return {}
+
+    salvar_delta(f"Atualizadas percentagens de direitos de {len(delta['autores'])} autor(es)", delta)
+    _persistir(catalogo, delta)
+
+    print(f"Direitos atualizados para {len(delta['autores'])} autor(es)")
+    return delta
+
+
+def ler_alteracoes_direitos(caminho):
+    """
+    Lê um CSV de alterações de direitos, uma por linha: autor (nome ou ID), percentagem.
+    Um cabeçalho (ou qualquer linha cuja percentagem não seja um número) é ignorado.
+    Devolve uma lista de pares (autor, percentagem).
+    """
+    alteracoes = []
+    with open(caminho, "r", encoding="utf-8-sig", newline='') as ficheiro:
+        for numero, linha in enumerate(csv.reader(ficheiro), start=1):
+            if len(linha) < 2 or not linha[0].strip():
+                continue
+            try:
+                alteracoes.append((linha[0].strip(), float(linha[1])))
+            except ValueError:
+                if numero > 1:
+                    print(f"Linha {numero} ignorada: percentagem inválida ({linha[1]})")
+    return alteracoes
+
+# ====================== INGESTÃO DE LOTES DE MÚSICAS ======================
+# Um lote é um CSV no formato de raw_tracks.csv com músicas novas. O ficheiro
+# é lido em blocos, validado, e as músicas são acrescentadas ao catálogo.
+# Autores e álbuns são atualizados como na construção original das tabelas
+# (fixDATA/organizeData.py e dataFormat.py), mas só os afetados pelo lote:
+#   - autor (artist_id): total_earned += preço * interesse; album_title += (album_id, título)
+#   - álbum (album_id):  unites_sold += interesse; album_price += preço; tracks += (track_id, título)
+# Tal como nessa construção, preço e nacionalidade vêm da última das colunas
+# repetidas ("track_price.1", "artist_nacionality.1"), se existirem.
+# Todo o lote fica num único snapshot, numa gravação e numa atualização do índice.
+
+# Regras do rawSchema usadas na ingestão. A data fica de fora: no dataset as
+# datas estão em MM/DD/YYYY (ou vazias), que o valid_date não aceita.
+COLUNAS_INGESTAO = tuple(coluna for coluna in TRACKS_HEADER if coluna != 'track_date_recorded')
+
+# Percentagem de direitos dos autores criados por um lote
+# (pode ser alterada depois com atualizar_direitos_autor)
+DIREITOS_NOVOS_AUTORES = 0.0
+
+
+def _ultima(linha, coluna):
+    """Valor da última das colunas repetidas do CSV ("<coluna>.1"), ou da própria coluna."""
+    return linha.get(f"{coluna}.1") or linha.get(coluna)
+
+
+def ingerir_musicas(caminho, tamanho_bloco=5000):
+    """
+    Ingere um lote de músicas novas a partir de um CSV no formato de raw_tracks.csv.
+    Linhas inválidas ou com track_id já existente são rejeitadas (e contadas).
+    Se o ficheiro não puder ser lido até ao fim, nada é ingerido.
+    Devolve o delta aplicado ({} se nada foi ingerido).
+    """
+    caminho = Path(caminho)
+    if not caminho.exists():
+        print(f"Ficheiro não encontrado: {caminho}")
+        return {}
+
+    # O cabeçalho é verificado antes de alterar o catálogo
+    # (os erros de leitura do pandas são ValueError: ficheiro vazio, CSV mal formatado, ...)
+    try:
+        em_falta = [coluna for coluna in COLUNAS_INGESTAO if coluna not in dS.colunas_raw_tracks(caminho)]
+    except (OSError, ValueError) as e:
+        print(f"Não foi possível ler o lote '{caminho}': {e}")
+        return {}
+    if em_falta:
+        print("Colunas em falta no lote:", ", ".join(em_falta))
+        return {}
+
+    catalogo = obter_catalogo()
+    delta = {"autores": {}, "albuns": {}, "musicas": {}}
+    rejeitadas = 0
+
+    try:
+        for bloco in dS.ler_raw_tracks_texto(caminho, tamanho_bloco):
+            erros, resumo = dS.validar_raw_tracks(bloco, colunas=COLUNAS_INGESTAO)
+            rejeitadas += resumo['linhas_invalidas']
+
+            validas = dS.linhas_validas(bloco, erros)
+            if validas.empty:
+                continue
+
+            # Mesmos tipos que em load_musicas (colunas numéricas convertidas)
+            cabecalho = list(validas.columns)
+            colunas = [_converter_coluna(validas[coluna].tolist()) for coluna in cabecalho]
+
+            for valores in zip(*colunas):
+                musica = Musica(zip(cabecalho, valores))
+                track_id = int(musica['track_id'])
+
+                if track_id in catalogo.musicas:
+                    rejeitadas += 1
+                    continue
+
+                _ingerir_musica(catalogo, delta, musica)
+                delta["musicas"][track_id] = (None, musica)
+    except (OSError, ValueError) as e:
+        # Os blocos anteriores já alteraram o catálogo em memória, mas nada foi gravado:
+        # o catálogo é descartado para voltar a ser lido tal como está gravado
+        descartar_catalogo()
+        print(f"Erro ao ler o lote '{caminho}': {e}")
+        print("Nenhuma música foi ingerida.")
+        return {}
+
+    _mostrar_resumo_ingestao(delta, rejeitadas)
+    if not delta["musicas"]:
+        return {}
+
+    salvar_delta(f"Ingerido lote '{caminho.name}' ({len(delta['musicas'])} músicas)", delta)
+    _persistir(catalogo, delta, acrescentar_musicas=True)
+    return delta
+
+
+def _ingerir_musica(catalogo, delta, musica):
+    """Acrescenta uma música ao catálogo e atualiza o seu autor e o seu álbum (guardando o "antes" no delta)."""
+    track_id = int(musica['track_id'])
+    album_id = int(musica['album_id'])
+    titulo_album = str(musica['album_title']).strip()
+    interesse = int(musica['track_interest'])
+    preco = float(_ultima(musica, 'track_price'))
+
+    catalogo.adicionar_musica(musica)
+
+    # Autor: pelo artist_id ou, se for novo, por um autor com o mesmo nome
+    author_id = int(musica['artist_id'])
+    if author_id not in catalogo.autores:
+        author_id = catalogo.procurar_autor(musica['artist_name']) or author_id
+
+    autor = _registo_editavel(catalogo.autores, delta["autores"], author_id)
+    if autor is None:
+        autor = Autor(
+            artist_name=str(musica['artist_name']).strip(),
+            artist_nacionality=str(_ultima(musica, 'artist_nacionality')).strip(),
+            album_title=[],
+            rights_percentage=DIREITOS_NOVOS_AUTORES,
+            total_earned=0.0,
+        )
+        delta["autores"][author_id] = (None, autor)
+        catalogo.adicionar_autor(author_id, autor)
+
+    autor['album_title'].append((album_id, titulo_album))
+    autor['total_earned'] = _somar_cents(autor['total_earned'], preco * interesse)
+
+    # Álbum
+    album = _registo_editavel(catalogo.albuns, delta["albuns"], album_id)
+    if album is None:
+        album = Album(
+            album_title=titulo_album,
+            artist_name=str(musica['artist_name']).strip(),
+            album_genere=str(musica['track_genres']).strip(),
+            album_date=str(musica['track_date_recorded']).strip(),
+            unites_sold=0,
+            album_price=0.0,
+            tracks=[],
+        )
+        delta["albuns"][album_id] = (None, album)
+        catalogo.adicionar_album(album_id, album)
+
+    album['unites_sold'] += interesse
+    album['album_price'] = _somar_cents(album['album_price'], preco)
+    album['tracks'].append((track_id, str(musica['track_title']).strip()))
+
+
+def _somar_cents(valor, parcela):
+    """
+    valor + parcela, somados em cêntimos (inteiros) como no pipeline de fixDATA
+    (dataFormat.cents): evita resultados como 7.220000000000001 nos CSV.
+    """
+    return (round(float(valor) * 100) + round(parcela * 100)) / 100
+
+
+def _registo_editavel(registos, alteracoes, chave):
+    """
+    Registo que o lote pode alterar: na primeira vez que uma linha é tocada,
+    passa a ser uma cópia (o original fica como "antes" no delta).
+    Devolve None se a linha não existir.
+    """
+    if chave in alteracoes:
+        return alteracoes[chave][1]
+
+    antes = registos.get(chave)
+    if antes is None:
+        return None
+
+    depois = copy.deepcopy(antes)
+    registos[chave] = depois
+    alteracoes[chave] = (antes, depois)
+    return depois
+
 
-    salvar_snapshot(f"Atualizada percentagem de direitos de '{nome}' para {nova_percentagem}%")
-    save_autores(autores)
-    build_unified_index()
+def _mostrar_resumo_ingestao(delta, rejeitadas):
+    novos = lambda tabela: sum(1 for antes, _ in delta[tabela].values() if antes is None)
 
-    print(f"Direitos atualizados para {nova_percentagem}%")
\ No newline at end of file
+    print("\n=== INGESTÃO DO LOTE ===")
+    print(f"Músicas acrescentadas: {len(delta['musicas'])}  |  Linhas rejeitadas: {rejeitadas}")
+    print(f"Autores: {novos('autores')} novo(s), {len(delta['autores']) - novos('autores')} atualizado(s)")
+    print(f"Álbuns:  {novos('albuns')} novo(s), {len(delta['albuns']) - novos('albuns')} atualizado(s)")
\ No newline at end of file
@@ -5,10 +5,19 @@ Este módulo permite guardar cópias de segurança dos ficheiros CSV sempre que
 (adicionar autor, remover autor, atualizar direitos, etc.). Cada snapshot fica numa pasta com timestamp
 e descrição da ação, acompanhado de um meta.json com metadados.
 
+Os CSV não são copiados para cada snapshot: são divididos em blocos (conjuntos de linhas) guardados uma
+única vez na pasta 'objects', identificados pelo hash do conteúdo. O meta.json de cada snapshot é só um
+manifesto com a lista de blocos de cada ficheiro, por isso um snapshot ocupa espaço proporcional ao que
+mudou desde o anterior.
+
+As operações CRUD não precisam de snapshot completo: registam um delta com as linhas que inseriram, apagaram
+ou alteraram. Reverter reaplica o estado anterior dessas linhas, em vez de copiar ficheiros inteiros.
+
 Funcionalidades:
-- salvar_snapshot(acao): cria um novo snapshot
+- salvar_snapshot(acao): cria um novo snapshot completo
+- salvar_delta(acao, delta): regista só as linhas alteradas por uma ação
 - ver_historico(): lista todos os snapshots disponíveis
-- reverter_snapshot(nome): restaura os CSV a partir de um snapshot específico
+- reverter_snapshot(nome): restaura o estado anterior a um snapshot específico
 - desfazer_ultima_acao(): funcionalidade extra que reverte automaticamente a última alteração (com confirmação)
 
 Tudo isto é uma funcionalidade adicional que implementei para tornar a aplicação mais robusta
@@ -18,13 +27,44 @@ e permitir recuperar de erros ou alterações indesejadas.
 import os
 import shutil
 import datetime
+import hashlib
 import json
-from searchEngine import build_unified_index
+import re
+import zlib
+from collections.abc import Mapping
+from searchEngine import ler_documentos, sincronizar_indice
 
 # Pasta onde ficam guardados todos os snapshots.
-# Cada snapshot é uma pasta com os CSV copiados e um ficheiro meta.json.
+# Cada snapshot é uma pasta com um ficheiro meta.json (manifesto dos blocos).
+# Snapshots antigos podem ainda ter os CSV copiados diretamente na pasta.
 HIST_DIR = "data/history"
 
+# Pasta com os blocos de conteúdo partilhados por todos os snapshots.
+OBJ_NOME = "objects"
+OBJ_DIR = os.path.join(HIST_DIR, OBJ_NOME)
+
+# Cache com o último manifesto de cada ficheiro (tamanho + mtime -> blocos),
+# para não voltar a ler ficheiros que não mudaram desde o snapshot anterior.
+CACHE_FILE = os.path.join(OBJ_DIR, "cache.json")
+
+# Um bloco termina numa linha cujo crc32 seja múltiplo de _DIVISOR_BLOCO
+# (em média 64 linhas), ou quando ultrapassa _MAX_BLOCO bytes. Como os cortes
+# dependem do conteúdo das linhas, inserir ou apagar uma linha só altera o bloco
+# onde ela está, e não todos os blocos seguintes.
+_DIVISOR_BLOCO = 64
+_MAX_BLOCO = 1 << 18
+
+# Registo append-only com uma linha JSON por evento:
+#   {"evento": "snapshot", "nome", "data", "acao", "tipo", "tamanho"}
+#   {"evento": "revertido", "nome"}
+# Listar o histórico, paginar e encontrar o último snapshot leem só este
+# ficheiro, sem abrir a pasta nem os meta.json de cada snapshot.
+LOG_FILE = os.path.join(HIST_DIR, "log.jsonl")
+
+# Número máximo de caracteres da ação no nome da pasta de um snapshot
+# (os nomes de ficheiros estão limitados a 255 bytes na maioria dos sistemas)
+_MAX_NOME_ACAO = 80
+
 # Lista dos ficheiros que queremos incluir em cada snapshot.
 FILES = [
     "data/authors_table.csv",
@@ -38,101 +78,470 @@ def _cria_pasta():
     os.makedirs(HIST_DIR, exist_ok=True)
 
 
+# ====================== ARMAZÉM DE BLOCOS ======================
+
+def _blocos(caminho):
+    """Divide um ficheiro em blocos de linhas completas (ver _DIVISOR_BLOCO)."""
+    bloco = []
+    tamanho = 0
+
+    with open(caminho, "rb") as f:
+        for linha in f:
+            bloco.append(linha)
+            tamanho += len(linha)
+
+            if zlib.crc32(linha) % _DIVISOR_BLOCO == 0 or tamanho >= _MAX_BLOCO:
+                yield b"".join(bloco)
+                bloco = []
+                tamanho = 0
+
+    if bloco:
+        yield b"".join(bloco)
+
+
+def _caminho_blob(h):
+    return os.path.join(OBJ_DIR, h[:2], h)
+
+
+def _guardar_blob(dados):
+    """
+    Guarda um bloco (comprimido) identificado pelo seu SHA-256.
+    Se já existir, não escreve nada. Devolve (hash, bytes escritos).
+    """
+    h = hashlib.sha256(dados).hexdigest()
+    caminho = _caminho_blob(h)
+
+    if os.path.exists(caminho):
+        return h, 0
+
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    comprimido = zlib.compress(dados)
+
+    # Escrita atómica: um blob nunca fica a meio
+    temporario = caminho + ".tmp"
+    with open(temporario, "wb") as f:
+        f.write(comprimido)
+    os.replace(temporario, caminho)
+
+    return h, len(comprimido)
+
+
+def _ler_blob(h):
+    with open(_caminho_blob(h), "rb") as f:
+        return zlib.decompress(f.read())
+
+
+def _ler_cache():
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _gravar_cache(cache):
+    with open(CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+
+
+def _guardar_ficheiro(ficheiro, cache):
+    """
+    Guarda um ficheiro no armazém de blocos e devolve o seu manifesto
+    ({"tamanho", "blocos"}) e o nº de bytes novos escritos.
+    Se o ficheiro não mudou desde o último snapshot (tamanho + mtime),
+    reaproveita o manifesto anterior sem o voltar a ler.
+    """
+    st = os.stat(ficheiro)
+    anterior = cache.get(ficheiro)
+
+    if anterior and anterior["tamanho"] == st.st_size and anterior["mtime_ns"] == st.st_mtime_ns:
+        return {"tamanho": anterior["tamanho"], "blocos": anterior["blocos"]}, 0
+
+    blocos = []
+    bytes_novos = 0
+    for bloco in _blocos(ficheiro):
+        h, escritos = _guardar_blob(bloco)
+        blocos.append(h)
+        bytes_novos += escritos
+
+    cache[ficheiro] = {"tamanho": st.st_size, "mtime_ns": st.st_mtime_ns, "blocos": blocos}
+    return {"tamanho": st.st_size, "blocos": blocos}, bytes_novos
+
+
+def _restaurar_ficheiro(manifesto, destino):
+    """Reconstrói um ficheiro a partir dos blocos do manifesto (escrita atómica)."""
+    temporario = destino + ".tmp"
+    with open(temporario, "wb") as f:
+        for h in manifesto["blocos"]:
+            f.write(_ler_blob(h))
+    os.replace(temporario, destino)
+
+
+# ====================== REGISTO (LOG) ======================
+
+def _registar(evento):
+    """Acrescenta um evento ao registo do histórico."""
+    with open(LOG_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(evento, ensure_ascii=False) + "\n")
+
+
+def _evento_snapshot(nome, meta, tamanho):
+    return {
+        "evento": "snapshot",
+        "nome": nome,
+        "data": meta.get("data", "desconhecida"),
+        "acao": meta.get("acao", "desconhecida"),
+        "tipo": meta.get("tipo", "completo"),
+        "tamanho": tamanho
+    }
+
+
+def _ler_meta(nome):
+    """Lê o meta.json de um snapshot (valores por defeito se estiver ausente ou corrompido)."""
+    meta_path = os.path.join(HIST_DIR, nome, "meta.json")
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except:
+        return {"acao": "desconhecida", "data": "desconhecida"}
+
+
+def _garantir_log():
+    """
+    Cria o registo a partir das pastas existentes, se ainda não existir
+    (histórico criado antes de haver registo). Só acontece uma vez.
+    """
+    _cria_pasta()
+    if os.path.exists(LOG_FILE):
+        return
+
+    linhas = []
+    for entrada in sorted(os.listdir(HIST_DIR)):
+        caminho = os.path.join(HIST_DIR, entrada)
+        if entrada == OBJ_NOME or not os.path.isdir(caminho):
+            continue
+
+        meta = _ler_meta(entrada)
+        tamanho = sum(
+            os.path.getsize(os.path.join(caminho, f))
+            for f in os.listdir(caminho)
+            if os.path.isfile(os.path.join(caminho, f))
+        ) + meta.get("bytes_novos", 0)
+
+        linhas.append(_evento_snapshot(entrada, meta, tamanho))
+        if meta.get("revertido"):
+            linhas.append({"evento": "revertido", "nome": entrada})
+
+    temporario = LOG_FILE + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        for evento in linhas:
+            f.write(json.dumps(evento, ensure_ascii=False) + "\n")
+    os.replace(temporario, LOG_FILE)
+
+
+def _eventos():
+    """Eventos do registo, por ordem (linhas corrompidas são ignoradas)."""
+    _garantir_log()
+    with open(LOG_FILE, "r", encoding="utf-8") as f:
+        for linha in f:
+            try:
+                yield json.loads(linha)
+            except ValueError:
+                continue
+
+
+def _eventos_do_fim(tamanho_bloco=1 << 16):
+    """Eventos do registo do último para o primeiro, lendo o ficheiro por blocos a partir do fim."""
+    _garantir_log()
+    with open(LOG_FILE, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        posicao = f.tell()
+        resto = b""
+
+        while posicao > 0:
+            ler = min(tamanho_bloco, posicao)
+            posicao -= ler
+            f.seek(posicao)
+            partes = (f.read(ler) + resto).split(b"\n")
+
+            # A primeira parte pode ser uma linha incompleta: fica para o bloco seguinte
+            resto = partes[0]
+            for linha in reversed(partes[1:]):
+                if linha.strip():
+                    try:
+                        yield json.loads(linha)
+                    except ValueError:
+                        continue
+
+        if resto.strip():
+            try:
+                yield json.loads(resto)
+            except ValueError:
+                pass
+
+
+def _ultimo_snapshot():
+    """Snapshot mais recente ainda não revertido (ou None), lido a partir do fim do registo."""
+    revertidos = set()
+    for evento in _eventos_do_fim():
+        if evento.get("evento") == "revertido":
+            revertidos.add(evento.get("nome"))
+        elif evento.get("evento") == "snapshot" and evento.get("nome") not in revertidos:
+            return _resumo(evento, False)
+    return None
+
+
+def _resumo(evento, revertido):
+    """Formato devolvido por ver_historico: nome + metadados resumidos."""
+    meta = {chave: evento.get(chave) for chave in ("acao", "data", "tipo", "tamanho")}
+    meta["revertido"] = revertido
+    return {"nome": evento["nome"], "meta": meta}
+
+
+# ====================== SNAPSHOTS ======================
+
+def _nova_pasta(acao):
+    """
+    Cria a pasta de um novo snapshot e devolve (timestamp, caminho).
+    O nome da pasta inclui os microssegundos para que ações feitas no mesmo
+    segundo fiquem ordenadas pela ordem em que aconteceram.
+    """
+    agora = datetime.datetime.now()
+    ts = agora.strftime("%Y%m%d_%H%M%S")
+
+    # Nome da pasta inclui timestamp + ação. A ação leva nomes de autores, álbuns
+    # e músicas (ex.: "Rok/Paper/Disco"): tudo o que não seja letra, dígito, "-" ou
+    # "." passa a "_", para o nome nunca criar subpastas. A ação completa fica no meta.json.
+    descricao = re.sub(r"[^\w.-]+", "_", acao).strip("._")[:_MAX_NOME_ACAO]
+    nome_pasta = f"{ts}_{agora.microsecond:06d}_{descricao}"
+    pasta = os.path.join(HIST_DIR, nome_pasta)
+    os.makedirs(pasta, exist_ok=True)
+
+    return ts, pasta
+
+
+def _gravar_meta(pasta, meta):
+    """Grava o meta.json de um snapshot e devolve o tamanho do ficheiro em bytes."""
+    meta_path = os.path.join(pasta, "meta.json")
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2, default=_para_json)
+    return os.path.getsize(meta_path)
+
+
+def _para_json(valor):
+    """Valores que o json não conhece: registos do catálogo (ver registos.py) viram dicionários."""
+    if isinstance(valor, Mapping):
+        return dict(valor)
+    return str(valor)
+
+
 def salvar_snapshot(acao: str) -> str:
     """
     Cria um snapshot completo do estado atual dos CSV.
 
     - Gera uma pasta com timestamp + descrição da ação.
-    - Copia os ficheiros CSV para essa pasta.
-    - Cria um meta.json com informação sobre a ação e a data.
+    - Guarda no armazém de blocos apenas os blocos dos CSV que ainda não existem.
+    - Cria um meta.json com a ação, a data e a lista de blocos de cada ficheiro.
+    - Com SQLite, exporta primeiro a base de dados para os CSV (são eles que ficam guardados).
 
     Retorna o caminho da pasta criada.
     """
-    _cria_pasta()
+    import crud  # import local: crud também importa este módulo
 
-    # Criamos um timestamp único para identificar o snapshot.
-    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Com SQLite os CSV só têm os dados atuais depois de exportados
+    # (reverter este snapshot volta a importá-los para a base de dados)
+    if crud.BACKEND == "sqlite":
+        crud.exportar_csv()
 
-    # Nome da pasta inclui timestamp + ação (com espaços substituídos por underscores).
-    nome_pasta = f"{ts}_{acao.replace(' ', '_')}"
-    pasta = os.path.join(HIST_DIR, nome_pasta)
-    os.makedirs(pasta, exist_ok=True)
+    _garantir_log()
+    os.makedirs(OBJ_DIR, exist_ok=True)
+
+    ts, pasta = _nova_pasta(acao)
 
-    # Copiamos cada ficheiro CSV para dentro da pasta do snapshot.
+    # Guardamos cada ficheiro CSV no armazém de blocos.
+    cache = _ler_cache()
+    ficheiros = {}
+    bytes_novos = 0
     for ficheiro in FILES:
         if os.path.exists(ficheiro):
-            shutil.copy(ficheiro, pasta)
+            manifesto, escritos = _guardar_ficheiro(ficheiro, cache)
+            ficheiros[os.path.basename(ficheiro)] = manifesto
+            bytes_novos += escritos
+    _gravar_cache(cache)
+
+    # Guardamos metadados úteis para consulta posterior, mais o manifesto dos blocos.
+    meta = {
+        "acao": acao,
+        "data": ts,
+        "tipo": "completo",
+        "bytes_novos": bytes_novos,
+        "ficheiros": ficheiros
+    }
+    tamanho = _gravar_meta(pasta, meta) + bytes_novos
+    _registar(_evento_snapshot(os.path.relpath(pasta, HIST_DIR), meta, tamanho))
+
+    print(f"Snapshot salvo: {pasta}")
+    return pasta
+
+
+def salvar_delta(acao: str, delta: dict) -> str:
+    """
+    Regista uma ação como delta de linhas, sem copiar os CSV.
+
+    `delta` tem o formato {tabela: {id: (antes, depois)}} (ver crud.py),
+    com tabela em "autores", "albuns" ou "musicas".
+    Retorna o caminho da pasta criada.
+    """
+    _garantir_log()
+
+    ts, pasta = _nova_pasta(acao)
 
-    # Guardamos metadados úteis para consulta posterior.
     meta = {
         "acao": acao,
-        "data": ts
+        "data": ts,
+        "tipo": "delta",
+        "delta": {tabela: linhas for tabela, linhas in delta.items() if linhas}
     }
-    with open(os.path.join(pasta, "meta.json"), "w", encoding="utf-8") as f:
-        json.dump(meta, f, ensure_ascii=False, indent=2)
+    tamanho = _gravar_meta(pasta, meta)
+    _registar(_evento_snapshot(os.path.relpath(pasta, HIST_DIR), meta, tamanho))
 
     print(f"Snapshot salvo: {pasta}")
     return pasta
 
 
-def ver_historico():
+def _listar_snapshots():
+    """Snapshots do registo (nome + metadados resumidos), por ordem cronológica."""
+    snapshots = {}
+
+    for evento in _eventos():
+        if evento.get("evento") == "snapshot":
+            snapshots[evento["nome"]] = _resumo(evento, False)
+        elif evento.get("evento") == "revertido" and evento.get("nome") in snapshots:
+            snapshots[evento["nome"]]["meta"]["revertido"] = True
+
+    return list(snapshots.values())
+
+
+def ver_historico(pagina=None, por_pagina=20):
     """
-    Lista todos os snapshots existentes na pasta 'history'.
+    Lista os snapshots registados no histórico.
 
-    Para cada snapshot:
-    - lê o meta.json (se existir)
-    - devolve nome + metadados
+    Para cada snapshot devolve nome + metadados (ação, data, tipo, tamanho
+    e se já foi revertido), lidos do registo log.jsonl.
+    Com `pagina` (a começar em 1) devolve só essa página, do mais recente
+    para o mais antigo.
 
     Retorna uma lista de dicionários.
     """
-    _cria_pasta()
-    snapshots = []
+    snapshots = _listar_snapshots()
 
-    for entrada in os.listdir(HIST_DIR):
-        caminho = os.path.join(HIST_DIR, entrada)
+    print(f"Encontrei {len(snapshots)} snapshot(s) no histórico.")
 
-        # Só consideramos pastas (cada snapshot é uma pasta)
-        if os.path.isdir(caminho):
-            meta_path = os.path.join(caminho, "meta.json")
+    if pagina is None:
+        return snapshots
 
-            # Valores por defeito caso o meta.json esteja ausente ou corrompido
-            meta = {"acao": "desconhecida", "data": "desconhecida"}
+    recentes = snapshots[::-1]
+    inicio = (max(pagina, 1) - 1) * por_pagina
+    return recentes[inicio:inicio + por_pagina]
 
-            if os.path.exists(meta_path):
-                try:
-                    with open(meta_path, "r", encoding="utf-8") as f:
-                        meta = json.load(f)
-                except:
-                    pass  # Se o JSON estiver corrompido, usamos os valores padrão
 
-            snapshots.append({"nome": entrada, "meta": meta})
+def _restaurar_completo(nome):
+    """Repõe os CSV guardados num snapshot completo (blocos ou cópia antiga dos ficheiros)."""
+    caminho_snapshot = os.path.join(HIST_DIR, nome)
 
-    print(f"Encontrei {len(snapshots)} snapshot(s) no histórico.")
-    return snapshots
+    manifestos = {}
+    meta_path = os.path.join(caminho_snapshot, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            manifestos = json.load(f).get("ficheiros", {})
+
+    for ficheiro in FILES:
+        manifesto = manifestos.get(os.path.basename(ficheiro))
+        if manifesto is not None:
+            # Reconstruímos o ficheiro a partir dos blocos do snapshot
+            _restaurar_ficheiro(manifesto, ficheiro)
+        else:
+            # Snapshots antigos: os CSV estão copiados na pasta do snapshot
+            origem = os.path.join(caminho_snapshot, os.path.basename(ficheiro))
+            if os.path.exists(origem):
+                shutil.copy(origem, ficheiro)
+
+
+def _linhas_anteriores(deltas):
+    """
+    Junta vários deltas (do mais recente para o mais antigo) nas linhas a repor:
+    para cada linha fica o `antes` do delta mais antigo que a alterou.
+    """
+    linhas = {}
+    for delta in deltas:
+        for tabela, alteracoes in delta.items():
+            for chave, (antes, _) in alteracoes.items():
+                linhas.setdefault(tabela, {})[chave] = antes
+    return linhas
 
 
 def reverter_snapshot(nome: str) -> bool:
     """
-    Restaura o estado da aplicação para o snapshot indicado.
+    Restaura o estado da aplicação para o snapshot indicado, ou seja,
+    o estado antes da ação que o criou.
 
-    - Copia os CSV do snapshot de volta para a pasta data/
-    - Rebuilda o índice de pesquisa
+    - Desfaz, da mais recente para a indicada, todas as ações ainda não revertidas
+    - Deltas: repõe só as linhas alteradas (uma única gravação no fim)
+    - Snapshots completos: reconstrói os CSV a partir dos blocos
+    - Atualiza no índice de pesquisa só os documentos que mudaram
     - Retorna True se tudo correu bem
     """
-    caminho_snapshot = os.path.join(HIST_DIR, nome)
+    import crud  # import local: crud também importa este módulo
 
-    if not os.path.isdir(caminho_snapshot):
+    snapshots = _listar_snapshots()
+    nomes = [snap["nome"] for snap in snapshots]
+
+    if nome not in nomes:
         print("Snapshot não encontrado.")
         return False
 
-    # Copiamos os ficheiros do snapshot para a pasta original
-    for ficheiro in FILES:
-        origem = os.path.join(caminho_snapshot, os.path.basename(ficheiro))
-        if os.path.exists(origem):
-            shutil.copy(origem, ficheiro)
-
-    # Atualizamos o índice de pesquisa para refletir os dados revertidos
-    build_unified_index()
+    # Ações a desfazer: da indicada até à mais recente (ordem cronológica)
+    a_desfazer = [snap for snap in snapshots[nomes.index(nome):] if not snap["meta"].get("revertido")]
+
+    # Um snapshot completo repõe o estado inteiro: as ações mais recentes
+    # do que o snapshot completo mais antigo deixam de interessar.
+    completos = [i for i, snap in enumerate(a_desfazer) if snap["meta"].get("tipo") != "delta"]
+    deltas = a_desfazer[:completos[0]] if completos else a_desfazer
+
+    # O conteúdo de cada delta só está no meta.json do respetivo snapshot: se faltar
+    # algum, não se altera nada (senão a ação ficava marcada como desfeita sem o ser)
+    conteudos = []
+    for snap in deltas:
+        meta = _ler_meta(snap["nome"])
+        if not isinstance(meta.get("delta"), dict):
+            print(f"Não é possível reverter: o snapshot {snap['nome']} não tem as linhas alteradas "
+                  "(meta.json em falta ou corrompido).")
+            return False
+        conteudos.append(meta["delta"])
+
+    if completos:
+        completo = a_desfazer[completos[0]]
+
+        # Estado atual, para depois só reindexar o que o snapshot alterar
+        documentos_antes = ler_documentos(catalogo=crud.obter_catalogo())
+        _restaurar_completo(completo["nome"])
+
+        # Com SQLite, os CSV repostos passam a ser o conteúdo da base de dados
+        if crud.BACKEND == "sqlite":
+            crud.importar_csv()
+
+        # O catálogo em memória deixou de corresponder aos ficheiros: voltamos a lê-lo
+        crud.descartar_catalogo()
+        sincronizar_indice(documentos_antes, ler_documentos(catalogo=crud.obter_catalogo()))
+
+    # Repomos as linhas alteradas pelos deltas restantes, do mais recente para o mais antigo
+    linhas = _linhas_anteriores(reversed(conteudos))
+    if linhas:
+        crud.aplicar_linhas(linhas)
+
+    # Marcamos as ações desfeitas para não voltarem a ser desfeitas
+    for snap in a_desfazer:
+        _registar({"evento": "revertido", "nome": snap["nome"]})
 
     print(f"Estado revertido com sucesso para o snapshot: {nome}")
     return True
@@ -146,16 +555,13 @@ def desfazer_ultima_acao() -> bool:
     - Pede confirmação
     - Reverte se o utilizador aceitar
     """
-    snapshots = ver_historico()
+    # Último snapshot ainda não revertido, lido do fim do registo
+    ultimo = _ultimo_snapshot()
 
-    if not snapshots:
+    if ultimo is None:
         print("Não há snapshots para reverter.")
         return False
 
-    # Ordenamos por nome (timestamp no início -> mais recente primeiro)
-    snapshots.sort(key=lambda x: x['nome'], reverse=True)
-    ultimo = snapshots[0]
-
     print("\n=== DESFAZER ÚLTIMA AÇÃO ===")
     print(f"Ação: {ultimo['meta'].get('acao', 'desconhecida')}")
     print(f"Data/Hora: {ultimo['meta'].get('data', 'desconhecida')}")
@@ -166,15 +572,5 @@ def desfazer_ultima_acao() -> bool:
         print("Operação cancelada.")
         return False
 
-    sucesso = reverter_snapshot(ultimo['nome'])
-
-    if sucesso:
-        # Rebuild do índice após reverter
-        try:
-            from searchEngine import build_unified_index
-            build_unified_index()
-            print("Índice de pesquisa atualizado.")
-        except Exception as e:
-            print(f"Aviso: não consegui rebuildar o índice: {e}")
-
-    return sucesso
\ No newline at end of file
+    # reverter_snapshot já atualiza o índice de pesquisa com as diferenças
+    return reverter_snapshot(ultimo['nome'])
\ No newline at end of file
@@ -1,21 +1,48 @@
+import sys
+
+# Com --medir-imports mostramos quanto custa importar cada módulo
+# (tem de ser ativado antes dos restantes imports; o resumo aparece à saída).
+if "--medir-imports" in sys.argv:
+    import tempoImports
+    tempoImports.ativar()
+
+# Estes módulos são leves: pandas, pygame, whoosh e tabulate só são
+# importados quando a funcionalidade que os usa é chamada pela primeira vez.
 import menu
 import crud
 import history
 import management
 import reports
 import audio
-import ast
 from searchEngine import search, build_unified_index
+from BaseDados.parseListas import parse_lista
+from BaseDados.manifestoAudio import tem_audio
+from BaseDados import metadadosAudio
+
+
+def arrancar():
+    """Prepara os dados da aplicação antes de mostrar o menu."""
 
-# Ao iniciar o programa, reconstruímos o índice de pesquisa
-# para garantir que está sincronizado com os CSV.
-build_unified_index()
+    # Com --sqlite os dados passam a ser guardados em data/tocadiscos.db
+    # (na primeira vez, os CSV são importados para a base de dados).
+    if "--sqlite" in sys.argv:
+        crud.usar_sqlite()
 
-# Carregamos os dados iniciais do sistema (autores, álbuns, músicas)
-management.carregar_dados_sistema()
+    # Lemos os dados uma única vez para o catálogo partilhado; o índice de pesquisa,
+    # as listagens, os relatórios e o player usam todos este mesmo catálogo.
+    catalogo = crud.obter_catalogo()
+
+    # Ao iniciar o programa, garantimos que o índice de pesquisa está sincronizado
+    # com os CSV. Só é reconstruído se os CSV mudaram (ou com --reindexar).
+    build_unified_index(forcar="--reindexar" in sys.argv, catalogo=catalogo)
+
+    # Carregamos os dados iniciais do sistema (administradores)
+    management.carregar_dados_sistema()
 
 
 def main():
+    arrancar()
+
     # Loop principal da aplicação — mantém o programa a correr até o utilizador escolher sair.
     while True:
         escolha_menu_principal = menu.menu_principal()
@@ -52,7 +79,7 @@ def main():
 
                     # O campo track_list vem como string -> converter para lista real
                     album_tracks = resultados[0]['track_list']
-                    track_list = ast.literal_eval(album_tracks)
+                    track_list = parse_lista(album_tracks)
 
                     # Mostra informação do álbum
                     for r in resultados:
@@ -64,9 +91,13 @@ def main():
                             f"Vendido: {r.get('unites_sold', 'N/A')} unidades"
                         )
 
-                    # Lista as músicas do álbum
-                    nomes_musicas = [track[1] for track in track_list]
+                    # Lista as músicas do álbum (♪ = tem ficheiro de áudio)
+                    nomes_musicas = [
+                        f"{track[1]} ♪" if tem_audio(track[0]) else track[1]
+                        for track in track_list
+                    ]
                     print("Músicas:", ", ".join(nomes_musicas))
+                    print("Duração:", management.descrever_duracao(track_list))
 
                 # Pesquisa por música
                 elif escolha_menu_pesquisa == "4":
@@ -76,8 +107,11 @@ def main():
                         print("\nNenhuma música ou autor encontrado.")
                         input("Pressione ENTER para continuar...")
                         break
+                    # ♪ = tem ficheiro de áudio (pode ser tocada no player)
                     for r in resultados:
-                        print(r["track_title"], "-", r["album_title"], "by", r["artist_name"])
+                        track_id = r["doc_id"].removeprefix("track_")
+                        marca = " ♪" if tem_audio(track_id) else ""
+                        print(r["track_title"], "-", r["album_title"], "by", r["artist_name"] + marca)
 
                 elif escolha_menu_pesquisa == "0":
                     break  # volta ao menu principal
@@ -110,6 +144,34 @@ def main():
                     autor = input("Autor que deseja remover: ")
                     crud.remover_autor(autor)
 
+                # Importar um lote de músicas novas (CSV no formato de raw_tracks.csv)
+                elif escolha_menu_administrador == "5":
+                    caminho = input("Caminho do ficheiro do lote: ").strip()
+                    crud.ingerir_musicas(caminho)
+
+                # Remover vários autores de uma vez (nomes ou IDs separados por ";")
+                elif escolha_menu_administrador == "6":
+                    autores = input("Autores que deseja remover (separados por ';'): ")
+                    crud.remover_autores([a.strip() for a in autores.split(";") if a.strip()])
+
+                # Atualizar direitos de vários autores a partir de um CSV (autor, percentagem)
+                elif escolha_menu_administrador == "7":
+                    caminho = input("Caminho do ficheiro com os direitos (autor,percentagem): ").strip()
+                    try:
+                        alteracoes = crud.ler_alteracoes_direitos(caminho)
+                    except OSError:
+                        print(f"Ficheiro não encontrado: {caminho}")
+                    else:
+                        crud.atualizar_direitos_autores(alteracoes)
+
+                # Extrair duração/bitrate dos ficheiros de áudio (só os novos ou alterados)
+                elif escolha_menu_administrador == "8":
+                    metadadosAudio.extrair_metadados(sorted(crud.obter_catalogo().musicas))
+
+                # Com --sqlite, os CSV só voltam a ter os dados atuais quando são exportados
+                elif escolha_menu_administrador == "9":
+                    crud.exportar_csv()
+
                 elif escolha_menu_administrador == "0":
                     break
 
@@ -140,6 +202,47 @@ def main():
                     audio.stop_music()
                     print("\nMúsica parada")
 
+                # Tocar todas as músicas de um álbum, por ordem
+                elif escolha_menu_player == "5":
+                    album = input("Qual álbum deseja tocar: ")
+                    album_id = None
+                    albuns = audio.albuns_com_titulo(album)
+                    # Vários artistas podem ter um álbum com este título
+                    if len(albuns) > 1:
+                        print("\nHá vários álbuns com este título:")
+                        for a_id, artista in albuns:
+                            print(f"{a_id} - {artista}")
+                        escolha = input("ID do álbum (Enter para tocar todos): ").strip()
+                        if escolha:
+                            album_id = int(escolha) if escolha.isdigit() else -1
+                    ids = audio.ids_do_album(album, album_id)
+                    if not ids:
+                        print("Álbum não existe.")
+                    elif audio.tocar_fila(ids):
+                        print(audio.estado_fila())
+
+                # Tocar as músicas encontradas numa pesquisa
+                elif escolha_menu_player == "6":
+                    termo = input("Pesquisar música: ")
+                    ids = audio.ids_dos_resultados(search(termo, filter_type="track"))
+                    if not ids:
+                        print("\nNenhuma música encontrada.")
+                    elif audio.tocar_fila(ids):
+                        print(audio.estado_fila())
+
+                # Música seguinte / anterior da fila
+                elif escolha_menu_player == "7":
+                    if audio.proxima_musica():
+                        print(audio.estado_fila())
+
+                elif escolha_menu_player == "8":
+                    if audio.musica_anterior():
+                        print(audio.estado_fila())
+
+                # Posição atual na fila
+                elif escolha_menu_player == "9":
+                    print(audio.estado_fila())
+
                 elif escolha_menu_player == "0":
                     break
 
@@ -157,6 +260,12 @@ def main():
                     nome = input("Nome do snapshot para reverter: ")
                     history.reverter_snapshot(nome)
 
+                # Snapshot completo do estado atual: reverter este snapshot
+                # desfaz de uma vez todas as ações feitas depois dele
+                elif escolha_menu_historico == "3":
+                    descricao = input("Descrição do ponto de restauro: ").strip()
+                    history.salvar_snapshot(f"Ponto de restauro: {descricao}" if descricao else "Ponto de restauro")
+
                 elif escolha_menu_historico == "0":
                     break
 
@@ -1,38 +1,28 @@
 import csv
-import ast
-from tabulate import tabulate
+from crud import obter_catalogo
+from BaseDados.manifestoAudio import ids_com_audio
+from BaseDados.metadadosAudio import resumo_album, formatar_duracao
 
-# Estas listas funcionam como "cache" em memória.
-# São carregadas no arranque e usadas pelo resto da aplicação.
-lista_admins = []      # utilizadores autorizados (login)
-lista_albuns = []      # catálogo de álbuns
-lista_autores = []     # autores representados
-lista_musicas = []     # músicas individuais
+# Administradores autorizados (login), carregados no arranque.
+# Autores, álbuns e músicas vêm do catálogo partilhado (crud.obter_catalogo),
+# lido uma única vez e já com os tipos convertidos.
+lista_admins = []
 
 
 def carregar_dados_sistema():
     """
-    Carrega todos os dados dos ficheiros CSV para a memória.
+    Carrega os dados do sistema para a memória: os administradores e o
+    catálogo partilhado (se ainda não tiver sido lido no arranque).
     Isto evita estar sempre a abrir ficheiros durante a execução.
     """
-    global lista_admins, lista_albuns, lista_autores, lista_musicas
+    global lista_admins
 
     try:
         # Carrega administradores
         with open("data/admins.csv", mode="r", encoding="utf-8") as f:
             lista_admins = list(csv.DictReader(f))
 
-        # Carrega álbuns
-        with open("data/albums_table.csv", mode="r", encoding="utf-8") as f:
-            lista_albuns = list(csv.DictReader(f))
-
-        # Carrega autores
-        with open("data/authors_table.csv", mode="r", encoding="utf-8") as f:
-            lista_autores = list(csv.DictReader(f))
-
-        # Carrega músicas
-        with open("data/raw_tracks.csv", mode="r", encoding="utf-8") as f:
-            lista_musicas = list(csv.DictReader(f))
+        obter_catalogo()
 
         print("Dados carregados para a memória.")
 
@@ -66,7 +56,9 @@ def listar_autores(autenticado):
     Também trata casos em que o autor não tem álbuns registados.
     """
 
-    if not lista_autores:
+    autores = obter_catalogo().autores
+
+    if not autores:
         print("\nNenhum autor registado.")
         return
 
@@ -82,29 +74,23 @@ def listar_autores(autenticado):
     ultimo_artista = None
     ultima_nacionalidade = None
 
-    for autor in lista_autores:
-        nome = autor.get("artist_name", "N/A").strip() or "N/A"
-        nacionalidade = autor.get("artist_nacionality", "N/A").strip() or "N/A"
+    for autor in autores.values():
+        nome = str(autor.get("artist_name") or "").strip() or "N/A"
+        nacionalidade = str(autor.get("artist_nacionality") or "").strip() or "N/A"
 
         # === EXTRAÇÃO SEGURA DO ÁLBUM ===
-        album_raw = autor.get("album_title", "")
-
-        if not album_raw or album_raw.strip() in ("", "N/A", "[]"):
-            album = "Sem álbum registado"
+        # album_title já vem convertido para lista de tuplos (id, nome)
+        albums_list = autor.get("album_title") or []
+
+        if albums_list:
+            primeiro = albums_list[0]
+            # Se for tuplo (id, nome), usa o nome
+            if isinstance(primeiro, tuple) and len(primeiro) >= 2:
+                album = str(primeiro[1]).strip()
+            else:
+                album = str(primeiro).strip()
         else:
-            try:
-                albums_list = ast.literal_eval(album_raw.strip())
-                if isinstance(albums_list, list) and len(albums_list) > 0:
-                    primeiro = albums_list[0]
-                    # Se for tuplo (id, nome), usa o nome
-                    if isinstance(primeiro, tuple) and len(primeiro) >= 2:
-                        album = str(primeiro[1]).strip()
-                    else:
-                        album = str(primeiro).strip()
-                else:
-                    album = "Sem álbum registado"
-            except Exception:
-                album = "Sem álbum registado"
+            album = "Sem álbum registado"
 
         # === DIREITOS EDITORIAIS (visíveis só para utilizadores autenticados) ===
         if autenticado:
@@ -140,13 +126,18 @@ def listar_albuns():
     """
     Lista todos os álbuns com as suas informações principais.
     """
-    if not lista_albuns:
+    albuns = obter_catalogo().albuns
+
+    if not albuns:
         print("\nNenhum álbum registado.")
         return
 
+    # Músicas com ficheiro de áudio (uma só leitura do manifesto para a listagem toda)
+    com_audio = ids_com_audio()
+
     print("\n--- CATÁLOGO DE ÁLBUNS ---")
 
-    for alb in lista_albuns:
+    for alb in albuns.values():
         title = alb.get("album_title", "Sem título")
         genero = alb.get("album_genere", "N/A")
         data_lanc = alb.get("album_date", "N/A")
@@ -160,9 +151,42 @@ def listar_albuns():
         print("  Unidades vendidas:", unidades_vend)
         print("  Preço:", preco, "€")
         print("  Músicas:", tracks)
+        if isinstance(tracks, list):
+            tocaveis = sum(1 for track in tracks if _id_track(track) in com_audio)
+            print(f"  Com áudio: {tocaveis} de {len(tracks)}")
+            if tocaveis:
+                print("  Duração:", descrever_duracao(tracks))
         print("-" * 60)
 
 
+def descrever_duracao(tracks):
+    """
+    Duração total das músicas (lista de (id, título)) a partir da cache de metadados,
+    com as que faltam ou estão corrompidas assinaladas: "32:10 (1 em falta, 1 corrompida)".
+    """
+    ids = [track_id for track_id in dict.fromkeys(_id_track(track) for track in tracks) if track_id is not None]
+    resumo = resumo_album(ids)
+
+    avisos = []
+    if resumo["em_falta"]:
+        avisos.append(f"{resumo['em_falta']} em falta")
+    if resumo["corrompidas"]:
+        avisos.append(f"{resumo['corrompidas']} corrompida(s)")
+    if resumo["sem_dados"]:
+        avisos.append(f"{resumo['sem_dados']} por analisar")
+
+    texto = formatar_duracao(resumo["duracao"])
+    return f"{texto} ({', '.join(avisos)})" if avisos else texto
+
+
+def _id_track(track):
+    # track_id de um elemento (id, título) da lista de músicas de um álbum
+    try:
+        return int(track[0])
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
 def gerar_relatorio_financeiro(autenticado):
     """
     Gera o relatório financeiro completo da editora.
@@ -192,8 +216,10 @@ def gerar_relatorio_financeiro(autenticado):
         text = str(text)
         return text if len(text) <= max_len else text[:max_len - 3] + "..."
 
+    catalogo = obter_catalogo()
+
     # Primeiro percorremos os álbuns para somar unidades e contar quantos álbuns cada autor tem
-    for album in lista_albuns:
+    for album in catalogo.albuns.values():
         try:
             autor = album["artist_name"]
             unidades = int(album["unites_sold"])
@@ -206,13 +232,13 @@ def gerar_relatorio_financeiro(autenticado):
             continue
 
     # Agora percorremos os autores para calcular direitos e receita
-    for autor in lista_autores:
+    for autor in catalogo.autores.values():
         try:
             nome = autor["artist_name"]
 
             # Percentagem de direitos
-            percent_raw = autor.get("rights_percentage", "0")
-            percentagem = float(percent_raw.replace("%", ""))
+            percent_raw = autor.get("rights_percentage", 0)
+            percentagem = float(str(percent_raw).replace("%", ""))
 
             # Receita total acumulada (mock data)
             receita = float(autor["total_earned"])
@@ -250,6 +276,8 @@ def gerar_relatorio_financeiro(autenticado):
     })
 
     # Impressão em formato tabular bonito
+    from tabulate import tabulate  # import local: só este relatório usa o tabulate
+
     print(
         tabulate(
             dados,
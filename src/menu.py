@@ -48,7 +48,7 @@ def menu_pesquisa():
 
 def menu_administrador():
     # Submenu reservado a utilizadores autenticados
-    opcoes_validas = {"1", "2", "3", "4", "0"}
+    opcoes_validas = {"1", "2", "3", "4", "5", "6", "7", "8", "9", "0"}
 
     while True:
         print("\n" + "-" * 38)
@@ -58,6 +58,11 @@ def menu_administrador():
         print("2 - Relatório Geral")
         print("3 - Adicionar novo autor")
         print("4 - Deletar autor")
+        print("5 - Importar lote de músicas (CSV)")
+        print("6 - Deletar vários autores")
+        print("7 - Atualizar direitos em lote (CSV)")
+        print("8 - Analisar ficheiros de áudio (duração)")
+        print("9 - Exportar base de dados para CSV (--sqlite)")
         print("0 - Voltar")
         print("-" * 38)
 
@@ -71,7 +76,7 @@ def menu_administrador():
 
 def menu_player():
     # Submenu do player de áudio
-    opcoes_validas = {"1", "2", "3", "4", "0"}
+    opcoes_validas = {"1", "2", "3", "4", "5", "6", "7", "8", "9", "0"}
 
     while True:
         print("\n" + "-" * 30)
@@ -81,6 +86,11 @@ def menu_player():
         print("2 - Pausar")
         print("3 - Continuar")
         print("4 - Parar")
+        print("5 - Tocar álbum (fila)")
+        print("6 - Tocar resultados de pesquisa (fila)")
+        print("7 - Música seguinte")
+        print("8 - Música anterior")
+        print("9 - Posição na fila")
         print("0 - Voltar")
         print("-" * 30)
 
@@ -94,7 +104,7 @@ def menu_player():
 
 def menu_historico():
     # Submenu do sistema de snapshots
-    opcoes_validas = {"1", "2", "0"}
+    opcoes_validas = {"1", "2", "3", "0"}
 
     while True:
         print("\n" + "-" * 34)
@@ -102,6 +112,7 @@ def menu_historico():
         print("-" * 34)
         print("1 - Ver histórico")
         print("2 - Desfazer última ação")
+        print("3 - Criar ponto de restauro")
         print("0 - Voltar")
         print("-" * 34)
 
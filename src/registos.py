@@ -0,0 +1,176 @@
+"""
+Registos compactos do catálogo: Autor, Album e Musica.
+
+Cada registo guarda os campos em __slots__ (sem um dicionário por objeto), o
+que reduz bastante a memória ocupada por cada linha quando o catálogo tem
+muitas músicas. Para o resto da aplicação continuam a comportar-se como os
+dicionários devolvidos por `load_*`: registo['artist_name'], .get(), .items(),
+dict(registo), {**registo}, comparação com dicionários, etc.
+
+Os textos que se repetem muito (nome do artista, nacionalidade, género,
+título do álbum, ...) são "internados" com sys.intern, por isso todas as
+linhas com o mesmo valor partilham a mesma string em memória.
+"""
+
+import sys
+from collections.abc import Mapping, MutableMapping
+
+
+def _atributo(campo):
+    """Nome do atributo (slot) de uma coluna: "track_price.1" -> "track_price_1"."""
+    return campo.replace('.', '_')
+
+
+class Registo(MutableMapping):
+    """
+    Base dos registos.
+    Cada subclasse define CAMPOS (nomes das colunas, guardados em slots) e
+    INTERNAR (colunas de texto com valores repetidos). Colunas que não estejam
+    em CAMPOS ficam num pequeno dicionário à parte, criado só se for preciso.
+    """
+
+    CAMPOS = ()
+    INTERNAR = frozenset()
+    __slots__ = ("_extra",)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._ATRIBUTOS = {campo: _atributo(campo) for campo in cls.CAMPOS}
+
+    def __init__(self, dados=(), **campos):
+        self._extra = None
+
+        # `dados` pode ser um dicionário (ou outro registo) ou uma sequência de pares
+        if isinstance(dados, Mapping):
+            dados = dados.items()
+
+        # O mesmo que self[chave] = valor, sem uma chamada a __setitem__ por campo
+        # (é aqui que se passa quase todo o tempo ao carregar o catálogo)
+        atributos = self._ATRIBUTOS
+        internar = self.INTERNAR
+        for pares in (dados, campos.items()):
+            for chave, valor in pares:
+                atributo = atributos.get(chave)
+                if atributo is None:
+                    self[chave] = valor
+                    continue
+                if chave in internar and type(valor) is str:
+                    valor = sys.intern(valor)
+                setattr(self, atributo, valor)
+
+    # ====================== PROTOCOLO DE DICIONÁRIO ======================
+
+    def __getitem__(self, chave):
+        atributo = self._ATRIBUTOS.get(chave)
+        if atributo is not None:
+            try:
+                return getattr(self, atributo)
+            except AttributeError:
+                raise KeyError(chave) from None
+
+        if self._extra is not None and chave in self._extra:
+            return self._extra[chave]
+        raise KeyError(chave)
+
+    def __setitem__(self, chave, valor):
+        if chave in self.INTERNAR and type(valor) is str:
+            valor = sys.intern(valor)
+
+        atributo = self._ATRIBUTOS.get(chave)
+        if atributo is not None:
+            setattr(self, atributo, valor)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[chave] = valor
+
+    def __delitem__(self, chave):
+        atributo = self._ATRIBUTOS.get(chave)
+        if atributo is not None:
+            try:
+                delattr(self, atributo)
+            except AttributeError:
+                raise KeyError(chave) from None
+        elif self._extra is not None and chave in self._extra:
+            del self._extra[chave]
+        else:
+            raise KeyError(chave)
+
+    def __iter__(self):
+        for campo, atributo in self._ATRIBUTOS.items():
+            if hasattr(self, atributo):
+                yield campo
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class Autor(Registo):
+    """Linha de authors_table.csv (sem o author_id, que é a chave no catálogo)."""
+
+    CAMPOS = (
+        'artist_name',
+        'artist_nacionality',
+        'album_title',
+        'rights_percentage',
+        'total_earned',
+    )
+    INTERNAR = frozenset({'artist_name', 'artist_nacionality'})
+    __slots__ = tuple(_atributo(campo) for campo in CAMPOS)
+
+
+class Album(Registo):
+    """Linha de albums_table.csv (sem o album_id, que é a chave no catálogo)."""
+
+    CAMPOS = (
+        'album_title',
+        'artist_name',
+        'album_genere',
+        'album_date',
+        'unites_sold',
+        'album_price',
+        'tracks',
+    )
+    INTERNAR = frozenset({'album_title', 'artist_name', 'album_genere', 'album_date'})
+    __slots__ = tuple(_atributo(campo) for campo in CAMPOS)
+
+
+class Musica(Registo):
+    """
+    Linha de raw_tracks.csv (incluindo o track_id).
+    As colunas repetidas do CSV aparecem como "artist_nacionality.1" e
+    "track_price.1", tal como em `crud.load_musicas`.
+    """
+
+    CAMPOS = (
+        'track_id',
+        'album_id',
+        'album_title',
+        'artist_id',
+        'artist_name',
+        'track_date_recorded',
+        'track_genres',
+        'track_interest',
+        'track_number',
+        'track_title',
+        'artist_nacionality',
+        'track_price',
+        'artist_nacionality.1',
+        'track_price.1',
+    )
+    INTERNAR = frozenset({
+        'album_id',
+        'album_title',
+        'artist_id',
+        'artist_name',
+        'track_date_recorded',
+        'track_genres',
+        'artist_nacionality',
+        'artist_nacionality.1',
+    })
+    __slots__ = tuple(_atributo(campo) for campo in CAMPOS)
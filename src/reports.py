@@ -8,61 +8,85 @@ Relatórios de Direitos Editoriais
 """
 
 import management
-from crud import autores, albuns
-from crud import load_autores, load_albuns
+from catalog import chave_nome
+from crud import obter_catalogo
 
 
-def calcular_direitos_por_autor(nome_autor: str):
+def agregar_direitos(albuns, catalogo=None):
     """
-    Calcula estatísticas financeiras de um autor específico.
-    Aqui reunimos:
+    Motor de agregação dos relatórios.
+    Percorre os álbuns recebidos uma única vez e agrupa-os por artista, calculando
+    para cada um:
       - número de álbuns publicados
       - unidades vendidas no total
       - receita total (unidades * preço)
       - direitos editoriais aplicando a percentagem do autor
 
-    Esta função é usada tanto no relatório geral como no individual.
+    As percentagens vêm dos autores do `catalogo` (por omissão, o catálogo
+    partilhado, ver crud.obter_catalogo).
+
+    Devolve um dicionário {nome do artista (casefold): estatísticas}.
     """
 
-    nome_lower = nome_autor.lower()
+    if catalogo is None:
+        catalogo = obter_catalogo()
 
-    # Filtra todos os álbuns pertencentes ao autor
-    autor_albuns = [
-        alb for alb in albuns.values()
-        if alb.get("artist_name", "").lower() == nome_lower
-    ]
+    grupos = {}
 
-    # Número total de álbuns
-    num_albuns = len(autor_albuns)
+    for alb in albuns:
+        chave = chave_nome(alb.get("artist_name"))
+        grupo = grupos.get(chave)
+        if grupo is None:
+            grupo = grupos[chave] = {
+                "num_albuns": 0,
+                "unidades_total": 0,
+                "receita_total": 0,
+                "direitos_total": 0.0
+            }
+
+        unidades = int(alb.get("unites_sold", 0))
+        grupo["num_albuns"] += 1
+        grupo["unidades_total"] += unidades
+        grupo["receita_total"] += unidades * float(alb.get("album_price", 0.0))
+
+    # Aplica a percentagem de direitos de cada autor (lookup direto pelo índice)
+    for chave, grupo in grupos.items():
+        autor_rights_percentage = 0
+        autor_id = catalogo.procurar_autor(chave)
+        if autor_id is not None:
+            autor_rights_percentage = catalogo.autores[autor_id]["rights_percentage"]
+
+        grupo["direitos_total"] = grupo["receita_total"] * (float(autor_rights_percentage) / 100)
+
+    return grupos
 
-    # Soma das unidades vendidas em todos os álbuns
-    unidades_total = sum(
-        int(alb.get("unites_sold", 0))
-        for alb in autor_albuns
-    )
 
-    # Receita total = unidades vendidas * preço do álbum
-    receita_total = sum(
-        int(alb.get("unites_sold", 0)) *
-        float(alb.get("album_price", 0.0))
-        for alb in autor_albuns
+def calcular_direitos_por_autor(nome_autor: str, catalogo=None):
+    """
+    Calcula estatísticas financeiras de um autor específico.
+    Usa o mesmo motor de agregação do relatório geral, mas só sobre
+    os álbuns do autor (obtidos pelo índice por artista).
+    """
+
+    if catalogo is None:
+        catalogo = obter_catalogo()
+
+    autor_albuns = (
+        catalogo.albuns[album_id]
+        for album_id in catalogo.albuns_do_artista(nome_autor)
     )
+    grupos = agregar_direitos(autor_albuns, catalogo)
 
-    # Procura a percentagem de direitos do autor
-    autor_rights_percentage = 0
-    for autor_data in autores.values():
-        if autor_data['artist_name'].lower() == nome_autor.lower():
-            autor_rights_percentage = autor_data["rights_percentage"]
-            break
+    return grupos.get(chave_nome(nome_autor), _estatisticas_vazias())
 
-    # Cálculo final dos direitos editoriais
-    direitos_total = receita_total * (float(autor_rights_percentage) / 100)
 
+def _estatisticas_vazias():
+    """Estatísticas de um autor sem álbuns."""
     return {
-        "num_albuns": num_albuns,
-        "unidades_total": unidades_total,
-        "receita_total": receita_total,
-        "direitos_total": direitos_total
+        "num_albuns": 0,
+        "unidades_total": 0,
+        "receita_total": 0,
+        "direitos_total": 0.0
     }
 
 
@@ -78,9 +102,7 @@ def gerar_relatorio(ordenar_por="autor"):
     O acesso deveria ser restrito por palavra‑passe (já preparado no código).
     """
 
-    global autores, albuns
-    autores = load_autores()
-    albuns = load_albuns()
+    catalogo = obter_catalogo()
 
     linhas = []          # linhas do relatório
     total_albuns = 0
@@ -88,12 +110,15 @@ def gerar_relatorio(ordenar_por="autor"):
     total_receita = 0.0
     total_direitos = 0.0
 
-    # Para cada autor, calcula os valores financeiros
-    for autor_id, autor_data in autores.items():
+    # Agrega todos os álbuns por artista numa única passagem
+    grupos = agregar_direitos(catalogo.albuns.values(), catalogo)
+
+    # Para cada autor, obtém os valores financeiros já agregados
+    for autor_id, autor_data in catalogo.autores.items():
         nome = autor_data.get("artist_name", "N/A").strip()
         percentagem = autor_data.get("rights_percentage", 0)
 
-        calc = calcular_direitos_por_autor(nome)
+        calc = grupos.get(chave_nome(nome)) or _estatisticas_vazias()
 
         linhas.append([
             nome,
@@ -167,23 +192,20 @@ def gerar_relatorio_autor(nome_autor: str):
       - direitos editoriais
     """
 
-    global autores, albuns
-    autores = load_autores()
-    albuns = load_albuns()
+    catalogo = obter_catalogo()
 
     # Procura o autor na base de dados
     autor_encontrado = None
-    for autor_data in autores.values():
-        if autor_data['artist_name'].lower() == nome_autor.lower():
-            autor_encontrado = autor_data
-            break
+    autor_id = catalogo.procurar_autor(nome_autor)
+    if autor_id is not None:
+        autor_encontrado = catalogo.autores[autor_id]
 
     if not autor_encontrado:
         print(f"Autor '{nome_autor}' não encontrado")
         return ""
 
     percentagem = f"{autor_encontrado['rights_percentage']:.1f}%"
-    calc = calcular_direitos_por_autor(nome_autor)
+    calc = calcular_direitos_por_autor(nome_autor, catalogo)
 
     # Impressão formatada (estilo igual ao relatório geral)
     print("\n" + "=" * 160)
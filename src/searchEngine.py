@@ -1,49 +1,385 @@
 import csv
+import hashlib
+import json
 import os
 import shutil
 from pathlib import Path
 
-from whoosh.index import create_in, open_dir, exists_in
-from whoosh.fields import Schema, TEXT, ID, STORED, KEYWORD
-from whoosh.qparser import MultifieldParser
-
 # Este módulo é responsável por criar e gerir um índice de pesquisa unificado
 # usando a biblioteca Whoosh. O objetivo é acelerar pesquisas por texto
 # (autor, álbum, música) sem ter de percorrer os CSV manualmente.
+#
+# O Whoosh só é importado quando o índice é mesmo usado (construção,
+# atualização ou pesquisa): verificar no arranque que o índice está
+# atualizado não precisa dele.
 
 # O schema define a estrutura dos documentos que vão ser indexados.
 # Cada documento pode ser de 3 tipos: track, album ou artist.
-unified_schema = Schema(
-    doc_type=KEYWORD(stored=True),   # tipo do documento (track/album/artist)
-    doc_id=ID(stored=True, unique=True),  # identificador único no índice
+# Cada campo é descrito como (nome, tipo de campo do Whoosh, opções);
+# o Schema do Whoosh é criado a partir daqui por `_schema()`.
+CAMPOS_SCHEMA = (
+    ("doc_type", "KEYWORD", {"stored": True}),           # tipo do documento (track/album/artist)
+    ("doc_id", "ID", {"stored": True, "unique": True}),  # identificador único no índice
 
     # Campos pesquisáveis
-    title=TEXT(stored=True),
-    artist_name=TEXT(stored=True),
-    genres=TEXT(stored=True),
-    nationality=TEXT(stored=True),
+    ("title", "TEXT", {"stored": True}),
+    ("artist_name", "TEXT", {"stored": True}),
+    ("genres", "TEXT", {"stored": True}),
+    ("nationality", "TEXT", {"stored": True}),
 
     # Campos adicionais guardados apenas para consulta (não pesquisáveis)
-    album_title=STORED(),
-    track_title=STORED(),
-    total_earned=STORED(),
-    unites_sold=STORED(),
-    album_price=STORED(),
-    track_price=STORED(),
-    rights_percentage=STORED(),
-    album_date=STORED(),
-    track_list=STORED(),
-    album_list=STORED(),
+    ("album_title", "STORED", {}),
+    ("track_title", "STORED", {}),
+    ("total_earned", "STORED", {}),
+    ("unites_sold", "STORED", {}),
+    ("album_price", "STORED", {}),
+    ("track_price", "STORED", {}),
+    ("rights_percentage", "STORED", {}),
+    ("album_date", "STORED", {}),
+    ("track_list", "STORED", {}),
+    ("album_list", "STORED", {}),
 )
 
+# Nomes dos campos (guardados no manifesto do índice)
+NOMES_CAMPOS = sorted(nome for nome, _, _ in CAMPOS_SCHEMA)
+
+_unified_schema = None
+
+
+def _schema():
+    """Schema Whoosh do índice unificado (criado na primeira utilização)."""
+    global _unified_schema
+
+    if _unified_schema is None:
+        from whoosh import fields
+        _unified_schema = fields.Schema(**{
+            nome: getattr(fields, tipo)(**opcoes) for nome, tipo, opcoes in CAMPOS_SCHEMA
+        })
+    return _unified_schema
+
+
+def __getattr__(nome):
+    # `searchEngine.unified_schema` continua disponível, mas só é criado quando é pedido
+    if nome == "unified_schema":
+        return _schema()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
 # Diretório onde o índice Whoosh será guardado
 INDEX_DIR = "unified_music_index"
 
+# Manifesto (dentro do INDEX_DIR) com a assinatura dos CSV usados no índice
+MANIFEST_FILE = "manifest.json"
+
+
+# Nomes dos ficheiros usados por omissão (os mesmos de crud.py)
+TRACKS_FILE = "data/raw_tracks.csv"
+ALBUMS_FILE = "data/albums_table.csv"
+AUTHORS_FILE = "data/authors_table.csv"
+
+
+# =========================== Documentos ===========================
+# Cada função recebe uma linha no formato do respetivo CSV (incluindo o ID)
+# e devolve o documento Whoosh correspondente. São usadas tanto na
+# construção completa do índice como nas atualizações incrementais.
+
+def _texto(valor):
+    """Converte um valor para string (None/vazio -> '')."""
+    if valor is None:
+        return ''
+    return str(valor)
+
+
+def doc_id_musica(track_id):
+    return f"track_{track_id}"
+
+
+def doc_id_album(album_id):
+    return f"album_{album_id}"
+
+
+def doc_id_autor(author_id):
+    return f"artist_{author_id}"
+
+
+def documento_musica(row):
+    """Documento do tipo "track" a partir de uma linha de raw_tracks.csv."""
+    # raw_tracks.csv repete as colunas artist_nacionality e track_price: o
+    # csv.DictReader fica com a última, o pandas chama-lhe "<coluna>.1".
+    # Alguns CSV podem ainda ter espaços extra nos nomes das colunas.
+    nationality = (row.get('artist_nacionality.1') or row.get('artist_nacionality')
+                   or row.get('artist_nacionality ') or '')
+    price = (row.get('track_price.1') or row.get('track_price') or row.get('track_price ') or '')
+
+    return dict(
+        doc_type="track",
+        doc_id=doc_id_musica(_texto(row.get('track_id', ''))),
+        title=_texto(row.get('track_title')),
+        artist_name=_texto(row.get('artist_name')),
+        genres=_texto(row.get('track_genres')),
+        nationality=_texto(nationality),
+
+        album_title=_texto(row.get('album_title')),
+        track_title=_texto(row.get('track_title')),
+        track_price=_texto(price),
+    )
+
+
+def documento_album(row):
+    """Documento do tipo "album" a partir de uma linha de albums_table.csv."""
+    return dict(
+        doc_type="album",
+        doc_id=doc_id_album(_texto(row.get('album_id', ''))),
+        title=_texto(row.get('album_title')),
+        artist_name=_texto(row.get('artist_name')),
+        genres=_texto(row.get('album_genere')),
+        nationality='',  # álbuns não têm nacionalidade
+
+        album_title=_texto(row.get('album_title')),
+        unites_sold=_texto(row.get('unites_sold')),
+        album_price=_texto(row.get('album_price')),
+        album_date=_texto(row.get('album_date')),
+        track_list=_texto(row.get('tracks')),
+    )
+
+
+def documento_autor(row):
+    """Documento do tipo "artist" a partir de uma linha de authors_table.csv."""
+    return dict(
+        doc_type="artist",
+        doc_id=doc_id_autor(_texto(row.get('author_id', ''))),
+        title=_texto(row.get('artist_name')),
+        artist_name=_texto(row.get('artist_name')),
+        genres='',
+        nationality=_texto(row.get('artist_nacionality')),
+
+        total_earned=_texto(row.get('total_earned')),
+        rights_percentage=_texto(row.get('rights_percentage')),
+        album_list=_texto(row.get('album_title')),
+    )
+
+
+def _ler_linhas(ficheiro, descricao):
+    """
+    Lê as linhas de um CSV com csv.DictReader (nomes de colunas sem espaços).
+    Se o ficheiro não existir ou não tiver cabeçalho, avisa e não devolve nada.
+    """
+    caminho = Path(ficheiro)
+    if not caminho.exists():
+        print(f"Aviso: Ficheiro de {descricao} não encontrado: {ficheiro}")
+        return
+
+    with open(caminho, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+
+        # Verificação básica de integridade do CSV
+        if reader.fieldnames is None:
+            print(f"Erro: Sem cabeçalho em {ficheiro}")
+            return
+
+        # Remove espaços nos nomes das colunas
+        reader.fieldnames = [name.strip() for name in reader.fieldnames]
+        yield from reader
+
+
+# Para cada tipo: (chave do ficheiro, descrição do ficheiro, descrição da linha,
+#                  coluna do ID, construtor do documento)
+_FONTES = (
+    ("tracks", "tracks", "track", 'track_id', documento_musica),
+    ("albums", "álbuns", "álbum", 'album_id', documento_album),
+    ("authors", "autores", "autor", 'author_id', documento_autor),
+)
+
+
+def _documentos_csv(ficheiros):
+    """
+    Gera os documentos de todos os CSV (músicas, álbuns e autores).
+    `ficheiros` é um dicionário {"tracks"/"albums"/"authors": caminho}.
+    Linhas que não seja possível converter são reportadas e ignoradas.
+    """
+    for chave, descricao_ficheiro, descricao, coluna_id, construtor in _FONTES:
+        ficheiro = ficheiros[chave]
+        try:
+            for row in _ler_linhas(ficheiro, descricao_ficheiro):
+                try:
+                    yield construtor(row)
+                except Exception as e:
+                    print(f"Erro ao indexar {descricao} {row.get(coluna_id)}: {e}")
+                    continue
+        except Exception as e:
+            print(f"Erro ao abrir {ficheiro}: {e}")
+
+
+def documentos_catalogo(catalogo):
+    """
+    Gera os documentos de todo o catálogo já carregado em memória
+    (ver crud.obter_catalogo), pela mesma ordem de `_documentos_csv`.
+    Evita voltar a ler os CSV quando o catálogo já foi lido no arranque.
+    """
+    for musica in catalogo.lista_musicas():
+        yield documento_musica(musica)
+    for album_id, dados in catalogo.albuns.items():
+        yield documento_album({'album_id': album_id, **dados})
+    for author_id, dados in catalogo.autores.items():
+        yield documento_autor({'author_id': author_id, **dados})
+
+
+# =========================== Manifesto ===========================
+# O manifesto guarda, para cada CSV, o tamanho, o mtime e o hash do conteúdo
+# no momento em que o índice ficou sincronizado. No arranque, se nada mudou,
+# reaproveitamos o índice em vez de o reconstruir.
+
+def _hash_ficheiro(caminho):
+    """SHA-256 do conteúdo de um ficheiro (lido por blocos)."""
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _assinatura(caminho, anterior=None):
+    """
+    Assinatura de um ficheiro: caminho, tamanho, mtime e hash.
+    Se o tamanho e o mtime forem iguais aos da assinatura anterior,
+    reaproveita o hash em vez de voltar a ler o ficheiro.
+    Devolve None se o ficheiro não existir.
+    """
+    try:
+        st = os.stat(caminho)
+    except OSError:
+        return None
+
+    assinatura = {"caminho": str(caminho), "tamanho": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    if (anterior and anterior.get("caminho") == assinatura["caminho"]
+            and anterior.get("tamanho") == st.st_size
+            and anterior.get("mtime_ns") == st.st_mtime_ns):
+        assinatura["sha256"] = anterior.get("sha256")
+    else:
+        assinatura["sha256"] = _hash_ficheiro(caminho)
+
+    return assinatura
+
+
+def _ler_manifesto():
+    """Lê o manifesto do índice (ou None se não existir ou estiver corrompido)."""
+    try:
+        with open(os.path.join(INDEX_DIR, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _origem_dados():
+    """
+    Origem atual dos dados (ver crud.origem_dados): {"backend": "csv"} ou a base
+    de dados SQLite com a sua geração. O crud importa este módulo, por isso é
+    importado só aqui.
+    """
+    import crud
+    return crud.origem_dados()
+
+
+def _catalogo_atual():
+    """Catálogo partilhado (crud.obter_catalogo), com os dados da origem em uso."""
+    import crud
+    return crud.obter_catalogo()
+
+
+def _gravar_manifesto(ficheiros, origem=None):
+    """
+    Grava o manifesto com a origem dos dados indexados e, se forem os CSV,
+    a assinatura atual dos CSV indicados.
+    """
+    if origem is None:
+        origem = _origem_dados()
+    if origem["backend"] != "csv":
+        # Com SQLite os CSV não são a origem dos dados: a geração da base de dados basta
+        ficheiros = {}
+
+    anterior = (_ler_manifesto() or {}).get("ficheiros", {})
+
+    manifesto = {
+        "campos": NOMES_CAMPOS,
+        "origem": origem,
+        "ficheiros": {
+            chave: _assinatura(caminho, anterior.get(chave))
+            for chave, caminho in ficheiros.items()
+        },
+    }
+
+    with open(os.path.join(INDEX_DIR, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+
+
+def _existe_indice(index_dir):
+    """
+    Verifica se existe um índice Whoosh no diretório sem importar o Whoosh:
+    cada índice tem um ficheiro de índice "_MAIN_<geração>.toc".
+    """
+    try:
+        return any(nome.startswith("_MAIN_") and nome.endswith(".toc") for nome in os.listdir(index_dir))
+    except OSError:
+        return False
+
+
+def indice_atualizado(
+    tracks_file=TRACKS_FILE,
+    albums_file=ALBUMS_FILE,
+    authors_file=AUTHORS_FILE
+):
+    """
+    Verifica se o índice existente corresponde aos dados atuais.
+    O índice tem de ter sido construído a partir da mesma origem (CSV ou a
+    mesma base de dados SQLite, na mesma geração). Com CSV, um ficheiro com
+    tamanho/mtime diferentes mas o mesmo hash conta como inalterado (e o
+    manifesto é atualizado para evitar voltar a ler o ficheiro).
+    """
+    if not _existe_indice(INDEX_DIR):
+        return False
+
+    manifesto = _ler_manifesto()
+    if not manifesto or manifesto.get("campos") != NOMES_CAMPOS:
+        return False
+
+    origem = _origem_dados()
+    if manifesto.get("origem") != origem:
+        return False
+    if origem["backend"] != "csv":
+        return True
+
+    ficheiros = {"tracks": tracks_file, "albums": albums_file, "authors": authors_file}
+    guardados = manifesto.get("ficheiros", {})
+    tocados = False
+
+    for chave, caminho in ficheiros.items():
+        anterior = guardados.get(chave)
+        atual = _assinatura(caminho, anterior)
+
+        if atual is None or anterior is None:
+            if atual != anterior:
+                return False
+            continue
+
+        if atual["caminho"] != anterior.get("caminho") or atual["sha256"] != anterior.get("sha256"):
+            return False
+
+        if atual["mtime_ns"] != anterior.get("mtime_ns"):
+            tocados = True
+
+    # Conteúdo igual mas ficheiros "tocados": atualizamos o manifesto
+    if tocados:
+        _gravar_manifesto(ficheiros, origem)
+
+    return True
+
 
 def build_unified_index(
-    tracks_file="data/raw_tracks.csv",
-    albums_file="data/albums_table.csv",
-    authors_file="data/authors_table.csv"
+    tracks_file=TRACKS_FILE,
+    albums_file=ALBUMS_FILE,
+    authors_file=AUTHORS_FILE,
+    forcar=False,
+    catalogo=None
 ):
     """
     Constrói o índice de pesquisa unificado a partir dos três CSV principais.
@@ -52,153 +388,244 @@ def build_unified_index(
       - cria um novo
       - percorre músicas, álbuns e autores
       - adiciona cada entrada como documento Whoosh
+
+    Se o manifesto do índice existente corresponder aos CSV atuais, o índice
+    é reaproveitado. Usar `forcar=True` para reconstruir sempre.
+
+    Se for passado o `catalogo` já carregado (ver crud.obter_catalogo), os
+    documentos são gerados a partir dele em vez de voltar a ler os CSV.
+    Com SQLite os documentos vêm sempre do catálogo (os CSV podem estar desatualizados).
+
+    Para alterações pontuais usar `atualizar_indice`, que só mexe
+    nos documentos afetados.
     """
 
     print("Inicializando o programa.")
-    
+
+    if not forcar and indice_atualizado(tracks_file, albums_file, authors_file):
+        print("Índice de pesquisa já está atualizado.")
+        print("Programa inicializado com sucesso\n")
+        return
+
     # Se já existir um índice, apagamos tudo para garantir consistência
+    # (o searcher persistente tem de ser fechado antes)
+    _servico.fechar()
     if os.path.exists(INDEX_DIR):
         shutil.rmtree(INDEX_DIR)
     os.makedirs(INDEX_DIR, exist_ok=True)
 
+    from whoosh.index import create_in
+
     # Criação do índice com o schema definido acima
-    ix = create_in(INDEX_DIR, unified_schema)
+    ix = create_in(INDEX_DIR, _schema())
     writer = ix.writer()
 
     total_docs = 0  # contador de documentos indexados
 
-    # =========================== Músicas ===========================
-    # Cada linha do CSV de músicas é indexada como documento do tipo "track".
-    tracks_path = Path(tracks_file)
-    if tracks_path.exists():
-        try:
-            with open(tracks_path, newline='', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f)
-
-                # Verificação básica de integridade do CSV
-                if reader.fieldnames is None:
-                    print(f"Erro: Sem cabeçalho em {tracks_file}")
-                else:
-                    # Remove espaços nos nomes das colunas
-                    reader.fieldnames = [name.strip() for name in reader.fieldnames]
-
-                    for row in reader:
-                        try:
-                            # Alguns CSV podem ter espaços extra nos nomes das colunas
-                            nationality = (row.get('artist_nacionality') or row.get('artist_nacionality ') or '')
-                            price = (row.get('track_price') or row.get('track_price ') or '')
-
-                            # Adiciona documento ao índice
-                            writer.add_document(
-                                doc_type="track",
-                                doc_id=f"track_{row.get('track_id', '')}",
-                                title=(row.get('track_title') or ''),
-                                artist_name=(row.get('artist_name') or ''),
-                                genres=(row.get('track_genres') or ''),
-                                nationality=nationality,
-
-                                album_title=(row.get('album_title') or ''),
-                                track_title=(row.get('track_title') or ''),
-                                track_price=price,
-                            )
-
-                            total_docs += 1
-
-                        except Exception as e:
-                            print(f"Erro ao indexar track {row.get('track_id')}: {e}")
-                            continue
-
-        except Exception as e:
-            print(f"Erro ao abrir {tracks_file}: {e}")
+    ficheiros = {"tracks": tracks_file, "albums": albums_file, "authors": authors_file}
+    origem = _origem_dados()
+    if catalogo is None and origem["backend"] != "csv":
+        catalogo = _catalogo_atual()
 
+    if catalogo is not None:
+        documentos = documentos_catalogo(catalogo)
     else:
-        print(f"Aviso: Ficheiro de tracks não encontrado: {tracks_file}")
+        documentos = _documentos_csv(ficheiros)
 
-    # =========================== Álbuns ===========================
-    # Cada álbum é indexado como documento do tipo "album".
-    albums_path = Path(albums_file)
-    if albums_path.exists():
-        try:
-            with open(albums_path, newline='', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f)
-
-                if reader.fieldnames is None:
-                    print(f"Erro: Sem cabeçalho em {albums_file}")
-                else:
-                    reader.fieldnames = [name.strip() for name in reader.fieldnames]
-
-                    for row in reader:
-                        try:
-                            writer.add_document(
-                                doc_type="album",
-                                doc_id=f"album_{row.get('album_id', '')}",
-                                title=(row.get('album_title') or ''),
-                                artist_name=(row.get('artist_name') or ''),
-                                genres=(row.get('album_genere') or ''),
-                                nationality='',  # álbuns não têm nacionalidade
-
-                                album_title=(row.get('album_title') or ''),
-                                unites_sold=(row.get('unites_sold') or ''),
-                                album_price=(row.get('album_price') or ''),
-                                album_date=(row.get('album_date') or ''),
-                                track_list=(row.get('tracks') or ''),
-                            )
-
-                            total_docs += 1
-
-                        except Exception as e:
-                            print(f"Erro ao indexar álbum {row.get('album_id')}: {e}")
-                            continue
+    for documento in documentos:
+        writer.add_document(**documento)
+        total_docs += 1
 
-        except Exception as e:
-            print(f"Erro ao abrir {albums_file}: {e}")
+    # Finaliza o índice e grava tudo no disco
+    writer.commit()
+    _gravar_manifesto(ficheiros, origem)
+    print(f"Índice de pesquisa construído: {total_docs} documentos.")
+    print("Programa inicializado com sucesso\n")
 
-    else:
-        print(f"Aviso: Ficheiro de álbuns não encontrado: {albums_file}")
 
-    # =========================== Autores ===========================
-    # Cada autor é indexado como documento do tipo "artist".
-    authors_path = Path(authors_file)
-    if authors_path.exists():
-        try:
-            with open(authors_path, newline='', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f)
-
-                if reader.fieldnames is None:
-                    print(f"Erro: Sem cabeçalho em {authors_file}")
-                else:
-                    reader.fieldnames = [name.strip() for name in reader.fieldnames]
-
-                    for row in reader:
-                        try:
-                            writer.add_document(
-                                doc_type="artist",
-                                doc_id=f"artist_{row.get('author_id', '')}",
-                                title=(row.get('artist_name') or ''),
-                                artist_name=(row.get('artist_name') or ''),
-                                genres='',
-                                nationality=(row.get('artist_nacionality') or ''),
-
-                                total_earned=(row.get('total_earned') or ''),
-                                rights_percentage=(row.get('rights_percentage') or ''),
-                                album_list=(row.get('album_title') or ''),
-                            )
-
-                            total_docs += 1
-
-                        except Exception as e:
-                            print(f"Erro ao indexar autor {row.get('author_id')}: {e}")
-                            continue
+# =========================== Atualizações incrementais ===========================
 
-        except Exception as e:
-            print(f"Erro ao abrir {authors_file}: {e}")
+def atualizar_indice(documentos=(), remover=()):
+    """
+    Atualiza o índice só com os documentos afetados por uma alteração.
+      - `documentos`: documentos novos ou alterados (ver documento_*); como
+        doc_id é único, o Whoosh substitui a versão anterior se existir.
+      - `remover`: doc_ids a apagar do índice.
 
-    else:
-        print(f"Aviso: Ficheiro de autores não encontrado: {authors_file}")
+    Tudo é feito num único writer/commit. Se o índice ainda não existir,
+    faz a construção completa a partir do catálogo (que já tem a alteração).
+    """
+
+    documentos = list(documentos)
+    remover = list(remover)
+    if not documentos and not remover:
+        return
+
+    from whoosh.index import exists_in, open_dir
+
+    if not exists_in(INDEX_DIR):
+        build_unified_index(forcar=True, catalogo=_catalogo_atual())
+        return
+
+    ix = open_dir(INDEX_DIR)
+    writer = ix.writer()
+
+    try:
+        # Um único searcher para todas as remoções: delete_by_term e update_document
+        # abrem um por chamada, o que fica muito lento com lotes de milhares de documentos.
+        # Os documentos alterados são apagados aqui e depois acrescentados de novo.
+        with writer.searcher() as searcher:
+            for doc_id in remover + [documento["doc_id"] for documento in documentos]:
+                writer.delete_by_term("doc_id", doc_id, searcher=searcher)
+
+        for documento in documentos:
+            writer.add_document(**documento)
+    except Exception:
+        writer.cancel()
+        raise
 
-    # Finaliza o índice e grava tudo no disco
     writer.commit()
-    print("Programa inicializado com sucesso\n")
+
+    # Os dados (CSV ou SQLite) foram gravados antes desta chamada: o índice volta
+    # a estar sincronizado com a origem em uso
+    _gravar_manifesto({"tracks": TRACKS_FILE, "albums": ALBUMS_FILE, "authors": AUTHORS_FILE})
+
+
+def ler_documentos(
+    tracks_file=TRACKS_FILE,
+    albums_file=ALBUMS_FILE,
+    authors_file=AUTHORS_FILE,
+    catalogo=None
+):
+    """
+    Devolve {doc_id: documento} com o estado atual dos dados: a partir do
+    `catalogo` em memória, se for passado, ou lendo os CSV.
+    """
+    if catalogo is not None:
+        documentos = documentos_catalogo(catalogo)
+    else:
+        ficheiros = {"tracks": tracks_file, "albums": albums_file, "authors": authors_file}
+        documentos = _documentos_csv(ficheiros)
+    return {documento["doc_id"]: documento for documento in documentos}
+
+
+def sincronizar_indice(antes, depois):
+    """
+    Compara dois estados ({doc_id: documento}, ver `ler_documentos`) e aplica
+    ao índice apenas as diferenças (documentos novos, alterados e removidos).
+    """
+    alterados = [doc for doc_id, doc in depois.items() if antes.get(doc_id) != doc]
+    removidos = [doc_id for doc_id in antes if doc_id not in depois]
+
+    atualizar_indice(alterados, removidos)
+    return len(alterados) + len(removidos)
+
+
+# =========================== Pesquisa ===========================
+
+class ServicoPesquisa:
+    """
+    Serviço de pesquisa de longa duração.
+    Mantém o índice, o searcher e o parser abertos entre pesquisas, em vez de
+    os voltar a criar em cada chamada. O searcher só é renovado quando a
+    geração do índice muda (depois de um commit).
+    """
+
+    # Campos onde o parser procura ao mesmo tempo
+    CAMPOS = ["title", "artist_name", "genres", "nationality"]
+
+    def __init__(self, index_dir=INDEX_DIR):
+        self.index_dir = index_dir
+        self._ix = None
+        self._searcher = None
+        self._parser = None
+
+    def _preparar(self):
+        """Abre o índice na primeira utilização e renova o searcher se estiver desatualizado."""
+        if self._ix is None:
+            from whoosh.index import exists_in, open_dir
+            from whoosh.qparser import MultifieldParser
+
+            if not exists_in(self.index_dir):
+                return False
+
+            self._ix = open_dir(self.index_dir)
+            self._searcher = self._ix.searcher()
+            # Parser que permite pesquisar em vários campos ao mesmo tempo
+            self._parser = MultifieldParser(self.CAMPOS, self._ix.schema)
+
+        elif not self._searcher.up_to_date():
+            # refresh() reaproveita os segmentos que não mudaram
+            self._searcher = self._searcher.refresh()
+
+        return True
+
+    def fechar(self):
+        """Fecha o searcher (ex.: antes de apagar o diretório do índice)."""
+        if self._searcher is not None:
+            self._searcher.close()
+        self._ix = None
+        self._searcher = None
+        self._parser = None
+
+    def search(self, query_str, limit=20, filter_type=None):
+        """Pesquisa no índice (ver `search`)."""
+        if not self._preparar():
+            print("Índice não encontrado. Execute build_unified_index() primeiro.")
+            return []
+
+        query = self._parser.parse(query_str)
+
+        # O filtro por tipo (track/album/artist) é aplicado pelo próprio Whoosh,
+        # por isso o limite conta apenas resultados do tipo pedido
+        filtro = _filtro_tipos(filter_type) if filter_type else None
+
+        # Executa a pesquisa
+        results = self._searcher.search(query, limit=limit, filter=filtro)
+
+        # Converte os resultados para dicionários simples
+        return [hit.fields() for hit in results]
+
+    def search_por_tipo(self, query_str, limites):
+        """Pesquisa vários tipos de uma vez (ver `search_por_tipo`)."""
+        agrupados = {tipo: [] for tipo in limites}
+
+        if not limites or not self._preparar():
+            if limites:
+                print("Índice não encontrado. Execute build_unified_index() primeiro.")
+            return agrupados
+
+        query = self._parser.parse(query_str)
+
+        # Uma única pesquisa: o collapse por doc_type guarda no máximo
+        # `collapse_limit` resultados de cada tipo (os mais relevantes)
+        results = self._searcher.search(
+            query,
+            limit=None,
+            filter=_filtro_tipos(limites),
+            collapse="doc_type",
+            collapse_limit=max(limites.values()),
+        )
+
+        for hit in results:
+            lista = agrupados[hit['doc_type']]
+            if len(lista) < limites[hit['doc_type']]:
+                lista.append(hit.fields())
+
+        return agrupados
+
+
+def _filtro_tipos(tipos):
+    """Query que aceita apenas documentos dos tipos indicados (string ou coleção)."""
+    from whoosh.query import Or, Term
+
+    if isinstance(tipos, str):
+        return Term("doc_type", tipos)
+    return Or([Term("doc_type", tipo) for tipo in tipos])
+
+
+# Instância usada por `search` durante toda a execução do programa
+_servico = ServicoPesquisa()
 
 
 def search(query_str, limit=20, filter_type=None):
@@ -209,26 +636,21 @@ def search(query_str, limit=20, filter_type=None):
       - álbuns
       - autores
 
-    O parâmetro filter_type permite filtrar resultados por tipo.
+    O parâmetro filter_type permite filtrar resultados por tipo
+    ("track", "album", "artist" ou uma lista destes). O filtro é aplicado
+    na própria pesquisa, por isso devolve até `limit` resultados do tipo pedido.
     """
 
-    if not exists_in(INDEX_DIR):
-        print("Índice não encontrado. Execute build_unified_index() primeiro.")
-        return []
-
-    ix = open_dir(INDEX_DIR)
+    return _servico.search(query_str, limit=limit, filter_type=filter_type)
 
-    with ix.searcher() as searcher:
-        # Parser que permite pesquisar em vários campos ao mesmo tempo
-        parser = MultifieldParser(["title", "artist_name", "genres", "nationality"], ix.schema)
-        query = parser.parse(query_str)
 
-        # Executa a pesquisa
-        results = searcher.search(query, limit=limit)
+def search_por_tipo(query_str, limites):
+    """
+    Pesquisa vários tipos de documento numa única passagem, com um limite
+    próprio para cada tipo. Exemplo:
+        search_por_tipo("love", {"artist": 5, "album": 5, "track": 10})
 
-        # Se o utilizador quiser filtrar por tipo (track/album/artist)
-        if filter_type:
-            results = [hit for hit in results if hit['doc_type'] == filter_type]
+    Devolve {tipo: [resultados]}.
+    """
 
-        # Converte os resultados para dicionários simples
-        return [hit.fields() for hit in results]
\ No newline at end of file
+    return _servico.search_por_tipo(query_str, limites)
\ No newline at end of file
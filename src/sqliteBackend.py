@@ -0,0 +1,263 @@
+"""
+Armazenamento opcional em SQLite para autores, álbuns e músicas.
+
+Oferece as mesmas funções de carregamento/gravação que `crud` usa com os CSV
+(load_* / save_*), mais `aplicar_delta`, que grava só as linhas alteradas por
+uma operação CRUD numa única transação. A base de dados usa o modo WAL.
+
+As colunas com listas (album_title dos autores, tracks dos álbuns) são guardadas
+no mesmo formato de texto usado nos CSV. Cada música é guardada como JSON
+(a linha completa do CSV), com track_id, album_id e artist_name em colunas próprias.
+
+A tabela `meta` guarda um identificador da base de dados e uma geração dos
+dados, incrementada em cada transação de escrita (ver `versao_dados`): é o
+que o índice de pesquisa usa para saber se está sincronizado com a base de dados.
+"""
+
+import json
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+from BaseDados.parseListas import parse_lista
+from registos import Autor, Album, Musica
+
+# Ficheiro da base de dados
+DB_FILE = Path("data/tocadiscos.db")
+
+# Ligação aberta (uma por processo)
+_ligacao = None
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS autores (
+    author_id INTEGER PRIMARY KEY,
+    artist_name TEXT NOT NULL,
+    artist_nacionality TEXT,
+    album_title TEXT,
+    rights_percentage REAL,
+    total_earned REAL
+);
+CREATE TABLE IF NOT EXISTS albuns (
+    album_id INTEGER PRIMARY KEY,
+    album_title TEXT,
+    artist_name TEXT,
+    album_genere TEXT,
+    album_date TEXT,
+    unites_sold INTEGER,
+    album_price REAL,
+    tracks TEXT
+);
+CREATE TABLE IF NOT EXISTS musicas (
+    track_id INTEGER PRIMARY KEY,
+    album_id TEXT,
+    artist_name TEXT,
+    linha TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_albuns_artista ON albuns (artist_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_musicas_album ON musicas (album_id);
+CREATE INDEX IF NOT EXISTS idx_musicas_artista ON musicas (artist_name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS meta (
+    chave TEXT PRIMARY KEY,
+    valor
+);
+INSERT OR IGNORE INTO meta VALUES ('id', lower(hex(randomblob(16))));
+INSERT OR IGNORE INTO meta VALUES ('geracao', 0);
+"""
+
+
+# ====================== LIGAÇÃO ======================
+
+def ligar():
+    """Abre (uma única vez) a ligação à base de dados e garante que as tabelas existem."""
+    global _ligacao
+
+    if _ligacao is None:
+        DB_FILE.parent.mkdir(parents=True, exist_ok=True)
+        _ligacao = sqlite3.connect(DB_FILE)
+        _ligacao.execute("PRAGMA journal_mode=WAL")
+        _ligacao.execute("PRAGMA synchronous=NORMAL")
+        _ligacao.executescript(_SCHEMA)
+
+    return _ligacao
+
+
+def fechar():
+    """Fecha a ligação (ex.: para mudar de DB_FILE)."""
+    global _ligacao
+
+    if _ligacao is not None:
+        _ligacao.close()
+        _ligacao = None
+
+
+@contextmanager
+def transacao():
+    """
+    Executa o bloco numa transação: commit no fim, rollback se houver erro.
+    Todas as escritas passam por aqui, por isso é também aqui que a geração
+    dos dados é incrementada (na mesma transação).
+    """
+    ligacao = ligar()
+    with ligacao:
+        yield ligacao
+        ligacao.execute("UPDATE meta SET valor = valor + 1 WHERE chave = 'geracao'")
+
+
+def versao_dados():
+    """{"id": identificador da base de dados, "geracao": número de transações de escrita}."""
+    return dict(ligar().execute("SELECT chave, valor FROM meta"))
+
+
+def tem_dados() -> bool:
+    """True se a base de dados já tiver sido preenchida (ex.: por uma importação dos CSV)."""
+    return ligar().execute("SELECT EXISTS (SELECT 1 FROM autores)").fetchone()[0] == 1
+
+
+# ====================== CONVERSÕES ======================
+
+def _lista(texto):
+    """Converte a coluna de texto de volta para lista (como nos CSV)."""
+    return parse_lista(texto)
+
+
+def _linha_autor(author_id, dados):
+    return (
+        author_id,
+        dados['artist_name'],
+        dados['artist_nacionality'],
+        str(dados['album_title']),
+        dados['rights_percentage'],
+        dados['total_earned'],
+    )
+
+
+def _linha_album(album_id, dados):
+    return (
+        album_id,
+        dados['album_title'],
+        dados['artist_name'],
+        dados['album_genere'],
+        dados['album_date'],
+        dados['unites_sold'],
+        dados['album_price'],
+        str(dados['tracks']),
+    )
+
+
+def _linha_musica(musica):
+    return (
+        int(musica['track_id']),
+        str(musica.get('album_id', '')),
+        musica.get('artist_name', ''),
+        json.dumps(dict(musica), ensure_ascii=False, default=str),
+    )
+
+
+_INSERIR = {
+    "autores": "INSERT OR REPLACE INTO autores VALUES (?, ?, ?, ?, ?, ?)",
+    "albuns": "INSERT OR REPLACE INTO albuns VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    "musicas": "INSERT OR REPLACE INTO musicas VALUES (?, ?, ?, ?)",
+}
+
+_APAGAR = {
+    "autores": "DELETE FROM autores WHERE author_id = ?",
+    "albuns": "DELETE FROM albuns WHERE album_id = ?",
+    "musicas": "DELETE FROM musicas WHERE track_id = ?",
+}
+
+
+# ====================== CARREGAMENTO ======================
+
+def load_autores():
+    """Autores no mesmo formato de `crud.load_autores`."""
+    autores = {}
+    for author_id, nome, nacionalidade, albuns, direitos, ganhos in ligar().execute(
+        "SELECT * FROM autores ORDER BY author_id"
+    ):
+        autores[author_id] = Autor(
+            artist_name=nome,
+            artist_nacionality=nacionalidade,
+            album_title=_lista(albuns),
+            rights_percentage=float(direitos or 0),
+            total_earned=float(ganhos or 0.0),
+        )
+    return autores
+
+
+def load_albuns():
+    """Álbuns no mesmo formato de `crud.load_albuns`."""
+    albuns = {}
+    for album_id, titulo, artista, genero, data, unidades, preco, tracks in ligar().execute(
+        "SELECT * FROM albuns ORDER BY album_id"
+    ):
+        albuns[album_id] = Album(
+            album_title=titulo,
+            artist_name=artista,
+            album_genere=genero,
+            album_date=data,
+            unites_sold=int(unidades or 0),
+            album_price=float(preco or 0.0),
+            tracks=_lista(tracks),
+        )
+    return albuns
+
+
+def load_musicas():
+    """Músicas no mesmo formato de `crud.load_musicas` (lista de linhas)."""
+    return [
+        Musica(json.loads(linha))
+        for (linha,) in ligar().execute("SELECT linha FROM musicas ORDER BY track_id")
+    ]
+
+
+# ====================== GRAVAÇÃO ======================
+
+def _substituir(ligacao, tabela, linhas):
+    ligacao.execute(f"DELETE FROM {tabela}")
+    ligacao.executemany(_INSERIR[tabela], linhas)
+
+
+def save_autores(autores):
+    """Substitui todos os autores (mesma semântica de `crud.save_autores`)."""
+    with transacao() as ligacao:
+        _substituir(ligacao, "autores", (_linha_autor(k, v) for k, v in autores.items()))
+
+
+def save_albuns(albuns):
+    """Substitui todos os álbuns."""
+    with transacao() as ligacao:
+        _substituir(ligacao, "albuns", (_linha_album(k, v) for k, v in albuns.items()))
+
+
+def save_musicas(musicas):
+    """Substitui todas as músicas."""
+    with transacao() as ligacao:
+        _substituir(ligacao, "musicas", (_linha_musica(m) for m in musicas))
+
+
+def substituir_tudo(autores, albuns, musicas):
+    """Substitui as três tabelas numa única transação (usado na importação dos CSV)."""
+    with transacao() as ligacao:
+        _substituir(ligacao, "autores", (_linha_autor(k, v) for k, v in autores.items()))
+        _substituir(ligacao, "albuns", (_linha_album(k, v) for k, v in albuns.items()))
+        _substituir(ligacao, "musicas", (_linha_musica(m) for m in musicas))
+
+
+def aplicar_delta(delta):
+    """
+    Grava só as linhas de um delta ({tabela: {id: (antes, depois)}}, ver crud.py)
+    numa única transação: `depois` None apaga a linha, caso contrário insere/substitui.
+    """
+    construtores = {
+        "autores": _linha_autor,
+        "albuns": _linha_album,
+        "musicas": lambda chave, dados: _linha_musica(dados),
+    }
+
+    with transacao() as ligacao:
+        for tabela, construtor in construtores.items():
+            for chave, (_, depois) in delta.get(tabela, {}).items():
+                if depois is None:
+                    ligacao.execute(_APAGAR[tabela], (chave,))
+                else:
+                    ligacao.execute(_INSERIR[tabela], construtor(chave, depois))
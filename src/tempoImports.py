@@ -0,0 +1,114 @@
+"""
+Medição do custo de importação dos módulos (python src/main.py --medir-imports).
+
+Enquanto estiver ativa, cada import que carrega um módulo novo é cronometrado e
+mostrado no ecrã, com o nome completo do módulo: `from BaseDados import
+metadadosAudio` aparece como BaseDados.metadadosAudio, mesmo que o pacote
+BaseDados já estivesse carregado.
+
+Os imports aninhados (feitos por um módulo enquanto está a ser importado) também
+são medidos. Para cada módulo guarda-se o tempo total (inclui os módulos que ele
+importa) e o tempo próprio (sem eles); o total do resumo é a soma dos tempos
+próprios, para não contar nada duas vezes.
+
+Como as dependências pesadas (pandas, pygame, whoosh, tabulate) são importadas
+só quando a funcionalidade é usada pela primeira vez, esses imports também
+aparecem nesse momento, e não no arranque; por isso o resumo é mostrado quando
+o programa termina.
+"""
+
+import atexit
+import builtins
+import sys
+import threading
+import time
+
+_import_original = builtins.__import__
+_local = threading.local()  # pilha dos imports em curso (por thread)
+
+# Tempo de importação por módulo: nome -> [total, próprio] (em segundos)
+tempos = {}
+_medidos = set()  # módulos cujo import já foi contado
+
+
+def _nome_absoluto(name, globals, level):
+    """Nome completo do módulo pedido (resolve os imports relativos)."""
+    if not level:
+        return name
+
+    globals = globals or {}
+    pacote = globals.get("__package__")
+    if pacote is None:
+        modulo = globals.get("__name__", "")
+        pacote = modulo if "__path__" in globals else modulo.rpartition(".")[0]
+
+    # Cada nível acima do primeiro sobe um pacote
+    base = pacote.rsplit(".", level - 1)[0] if level > 1 else pacote
+    return f"{base}.{name}" if name else base
+
+
+def _modulos_pedidos(nome, fromlist):
+    """Módulos que este import pode carregar: o próprio, os pacotes acima e os submódulos do fromlist."""
+    partes = nome.split(".")
+    pedidos = [".".join(partes[:i]) for i in range(1, len(partes) + 1)]
+    pedidos += [f"{nome}.{item}" for item in fromlist or () if item != "*"]
+    return pedidos
+
+
+def _import_medido(name, globals=None, locals=None, fromlist=(), level=0):
+    nome = _nome_absoluto(name, globals, level)
+    novos = [modulo for modulo in _modulos_pedidos(nome, fromlist) if modulo not in sys.modules]
+
+    # Só se mede quando algum dos módulos pedidos ainda não está carregado
+    # (os nomes do fromlist que não são submódulos nunca chegam a sys.modules)
+    if not novos:
+        return _import_original(name, globals, locals, fromlist, level)
+
+    pilha = _local.__dict__.setdefault("pilha", [])
+    pilha.append(0.0)  # tempo dos imports aninhados neste
+    inicio = time.perf_counter()
+    try:
+        return _import_original(name, globals, locals, fromlist, level)
+    finally:
+        total = time.perf_counter() - inicio
+        aninhados = pilha.pop()
+        # Os que foram carregados por um import aninhado já foram contados lá
+        carregados = [modulo for modulo in novos if modulo in sys.modules and modulo not in _medidos]
+
+        if carregados:
+            # "import a.b" carrega a e a.b: o tempo fica no mais específico
+            chave = ", ".join(modulo for modulo in carregados
+                              if not any(outro.startswith(modulo + ".") for outro in carregados))
+            _medidos.update(carregados)
+            proprio = total - aninhados
+            registo = tempos.setdefault(chave, [0.0, 0.0])
+            registo[0] += total
+            registo[1] += proprio
+            print(f"[import] {'  ' * len(pilha) + chave:<45} {total * 1000:8.1f} ms "
+                  f"(próprio {proprio * 1000:.1f} ms)")
+            if pilha:
+                pilha[-1] += total
+        elif pilha:
+            # Nada de novo foi carregado aqui: os imports aninhados contam para o de cima
+            pilha[-1] += aninhados
+
+
+def ativar():
+    """Começa a medir os imports (até `desativar`); o resumo é mostrado à saída do programa."""
+    builtins.__import__ = _import_medido
+    atexit.register(resumo)
+
+
+def desativar():
+    """Repõe o import normal do Python."""
+    builtins.__import__ = _import_original
+    atexit.unregister(resumo)
+
+
+def resumo():
+    """Mostra os módulos medidos, do mais lento para o mais rápido (tempo próprio), e o total."""
+    print("\n=== CUSTO DOS IMPORTS ===")
+    print(f"{'MÓDULO':<45} {'TOTAL':>10} {'PRÓPRIO':>10}")
+    for nome, (total, proprio) in sorted(tempos.items(), key=lambda item: item[1][1], reverse=True):
+        print(f"{nome:<45} {total * 1000:7.1f} ms {proprio * 1000:7.1f} ms")
+    print(f"{'TOTAL':<45} {'':>10} {sum(proprio for _, proprio in tempos.values()) * 1000:7.1f} ms\n")
@@ -0,0 +1,70 @@
+"""
+Configuração comum dos testes.
+
+Cada teste corre numa pasta temporária com uma cópia de data/ e do índice de
+pesquisa (construído uma única vez por sessão), por isso os ficheiros do
+projeto nunca são alterados.
+"""
+
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ / "src"))
+
+import crud
+import searchEngine
+import sqliteBackend
+
+
+def _limpar_estado():
+    """Esquece o estado em memória dos módulos: catálogo, caches, ligação SQLite e searcher."""
+    searchEngine._servico.fechar()
+    sqliteBackend.fechar()
+    crud.descartar_catalogo()
+    crud.invalidar_cache()
+
+
+@pytest.fixture(scope="session")
+def modelo(tmp_path_factory):
+    """Pasta com uma cópia dos dados e o índice de pesquisa já construído."""
+    pasta = tmp_path_factory.mktemp("modelo")
+    shutil.copytree(RAIZ / "data", pasta / "data")
+
+    anterior = os.getcwd()
+    os.chdir(pasta)
+    try:
+        searchEngine.build_unified_index(forcar=True, catalogo=crud.obter_catalogo())
+    finally:
+        _limpar_estado()
+        os.chdir(anterior)
+    return pasta
+
+
+@pytest.fixture(params=["csv", "sqlite"])
+def backend(request, modelo, tmp_path, monkeypatch):
+    """Pasta de trabalho (cópia do modelo) com o armazenamento em CSV ou em SQLite."""
+    shutil.copytree(modelo, tmp_path, dirs_exist_ok=True)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(crud, "BACKEND", "csv")
+    monkeypatch.setattr(sqliteBackend, "DB_FILE", sqliteBackend.DB_FILE)
+    _limpar_estado()
+
+    if request.param == "sqlite":
+        crud.usar_sqlite(tmp_path / "data" / "tocadiscos.db")
+
+    yield request.param
+    _limpar_estado()
+
+
+@pytest.fixture
+def responder(monkeypatch):
+    """Substitui o input(): cada chamada devolve a resposta seguinte da lista dada."""
+    def _responder(*respostas):
+        respostas = iter(respostas)
+        monkeypatch.setattr("builtins.input", lambda mensagem="": next(respostas))
+    return _responder
@@ -0,0 +1,208 @@
+"""
+Testes do desfazer do histórico (history.py).
+
+As ações CRUD registam deltas; desfazê-las (uma a uma, várias de uma vez ou
+até um snapshot completo) tem de repor as tabelas gravadas e os resultados
+da pesquisa. Cada teste corre com CSV e com SQLite (ver conftest.backend).
+"""
+
+import copy
+import json
+import os
+
+import crud
+import history
+from searchEngine import search
+
+NOVO_AUTOR = "Zyxwvu Quintal"
+
+
+def _estado():
+    """Autores, álbuns e músicas tal como estão gravados (lidos de novo)."""
+    crud.descartar_catalogo()
+    crud.invalidar_cache()
+    catalogo = crud.obter_catalogo()
+    # Cópia: as ações seguintes alteram os registos do catálogo partilhado
+    return copy.deepcopy((dict(catalogo.autores), dict(catalogo.albuns), catalogo.lista_musicas()))
+
+
+def _hits(termo, tipo=None):
+    """doc_ids de todos os resultados de uma pesquisa."""
+    return {r["doc_id"] for r in search(termo, limit=None, filter_type=tipo)}
+
+
+def _adicionar_autor(responder):
+    responder(NOVO_AUTOR, "Português", "25")
+    crud.adicionar_autor()
+
+
+def _remover_kurt_vile(responder):
+    responder("s")
+    crud.remover_autor("Kurt Vile")
+
+
+def _desfazer(responder):
+    responder("s")
+    return history.desfazer_ultima_acao()
+
+
+def test_desfazer_adicionar_autor(backend, responder):
+    inicial = _estado()
+    assert not _hits(NOVO_AUTOR, "artist")
+
+    _adicionar_autor(responder)
+    assert _estado() != inicial
+    assert _hits(NOVO_AUTOR, "artist")
+
+    assert _desfazer(responder)
+    assert _estado() == inicial
+    assert not _hits(NOVO_AUTOR, "artist")
+
+
+def test_desfazer_remover_autor_repoe_albuns_e_musicas(backend, responder):
+    inicial = _estado()
+    hits = _hits("Kurt Vile")
+    assert "artist_6" in hits
+
+    _remover_kurt_vile(responder)
+    assert 6 not in _estado()[0]
+    assert not _hits("Kurt Vile") & hits
+
+    assert _desfazer(responder)
+    # As listas (id, título) voltam do JSON do histórico como tuplos, como em load_autores
+    autor = crud.obter_catalogo().autores[6]
+    assert all(isinstance(item, tuple) for item in autor["album_title"])
+    assert _estado() == inicial
+    assert _hits("Kurt Vile") == hits
+
+
+def test_desfazer_autor_com_barra_no_nome(backend, responder):
+    inicial = _estado()
+
+    # O nome da pasta do snapshot vem da ação, que inclui o nome do autor
+    responder("s")
+    crud.remover_autor("Rok/Paper/Disco")
+    snapshots = history._listar_snapshots()
+    assert len(snapshots) == 1
+    assert os.path.isfile(os.path.join(history.HIST_DIR, snapshots[0]["nome"], "meta.json"))
+
+    assert _desfazer(responder)
+    assert _estado() == inicial
+
+
+def test_desfazer_sem_meta_nao_reverte(backend, responder):
+    _remover_kurt_vile(responder)
+    removido = _estado()
+    nome = history._listar_snapshots()[0]["nome"]
+    os.remove(os.path.join(history.HIST_DIR, nome, "meta.json"))
+
+    # Sem o delta não há nada para repor: falha e a ação continua por desfazer
+    assert not _desfazer(responder)
+    assert _estado() == removido
+    assert history._ultimo_snapshot()["nome"] == nome
+
+
+def test_desfazer_varios_deltas_seguidos(backend, responder):
+    estados = [_estado()]
+    hits = [(_hits(NOVO_AUTOR, "artist"), _hits("Kurt Vile"))]
+
+    _adicionar_autor(responder)
+    estados.append(_estado())
+    hits.append((_hits(NOVO_AUTOR, "artist"), _hits("Kurt Vile")))
+
+    crud.atualizar_direitos_autor("AWOL", 44.0)
+    estados.append(_estado())
+    hits.append((_hits(NOVO_AUTOR, "artist"), _hits("Kurt Vile")))
+
+    _remover_kurt_vile(responder)
+    assert _estado() != estados[-1]
+
+    # Cada desfazer volta ao estado anterior à última ação ainda não desfeita
+    for estado, (hits_autor, hits_kurt) in zip(reversed(estados), reversed(hits)):
+        assert _desfazer(responder)
+        assert _estado() == estado
+        assert _hits(NOVO_AUTOR, "artist") == hits_autor
+        assert _hits("Kurt Vile") == hits_kurt
+
+    assert history.desfazer_ultima_acao() is False
+
+
+def test_reverter_varias_acoes_de_uma_vez(backend, responder):
+    inicial = _estado()
+    hits = _hits("Kurt Vile")
+
+    _adicionar_autor(responder)
+    crud.atualizar_direitos_autor("AWOL", 44.0)
+    _remover_kurt_vile(responder)
+
+    primeiro = history._listar_snapshots()[0]["nome"]
+    assert history.reverter_snapshot(primeiro)
+
+    assert _estado() == inicial
+    assert _hits("Kurt Vile") == hits
+    assert not _hits(NOVO_AUTOR, "artist")
+    assert history._ultimo_snapshot() is None
+
+
+def test_reverter_snapshot_completo_entre_deltas(backend, responder):
+    inicial = _estado()
+    hits = _hits("Kurt Vile")
+
+    crud.atualizar_direitos_autor("AWOL", 44.0)
+    antes_do_completo = _estado()
+    history.salvar_snapshot("Snapshot manual")
+    _remover_kurt_vile(responder)
+    _adicionar_autor(responder)
+
+    snapshots = [snap["nome"] for snap in history._listar_snapshots()]
+    assert len(snapshots) == 4
+
+    # Reverter o snapshot completo repõe os ficheiros nele guardados
+    assert history.reverter_snapshot(snapshots[1])
+    assert _estado() == antes_do_completo
+    assert _hits("Kurt Vile") == hits
+    assert not _hits(NOVO_AUTOR, "artist")
+
+    # O delta anterior ao snapshot completo continua a poder ser desfeito
+    assert _desfazer(responder)
+    assert _estado() == inicial
+
+
+def test_reverter_delta_anterior_a_snapshot_completo(backend, responder):
+    inicial = _estado()
+    hits = _hits("Kurt Vile")
+
+    _remover_kurt_vile(responder)
+    history.salvar_snapshot("Snapshot manual")
+    _adicionar_autor(responder)
+    crud.atualizar_direitos_autor("AWOL", 44.0)
+
+    # Completo (repõe o estado sem o Kurt Vile) + o delta mais antigo por cima
+    primeiro = history._listar_snapshots()[0]["nome"]
+    assert history.reverter_snapshot(primeiro)
+    assert _estado() == inicial
+    assert _hits("Kurt Vile") == hits
+    assert not _hits(NOVO_AUTOR, "artist")
+
+
+def test_linha_de_json_repoe_tuplos():
+    autor = {
+        "artist_name": "AWOL",
+        "artist_nacionality": "Americano",
+        "album_title": [(1, "AWOL - A Way Of Life"), (7, "Outro")],
+        "rights_percentage": 39.0,
+        "total_earned": 9553.51,
+    }
+    album = {
+        "album_title": "AWOL - A Way Of Life",
+        "artist_name": "AWOL",
+        "tracks": [(2, "Food"), (3, "Electric Ave")],
+    }
+
+    # Como no meta.json do histórico: os tuplos são gravados como listas
+    autor_json = json.loads(json.dumps(autor))
+    album_json = json.loads(json.dumps(album))
+    assert autor_json["album_title"][0] == [1, "AWOL - A Way Of Life"]
+
+    assert crud._linha_de_json("autores", autor_json)["album_title"] == autor["album_title"]
+    assert crud._linha_de_json("albuns", album_json)["tracks"] == album["tracks"]